@@ -21,6 +21,7 @@ class FilePrefix():
     MIN = 'min'
     VPT2 = 'vpt2'
     LJ = 'lj'
+    MANIFEST = 'manifest'
 
 
 class FileAttributeName():
@@ -51,6 +52,7 @@ class FileAttributeName():
     CENTIF_DIST = 'quartic_centrifugal_dist_consts'
     LJ_EPS = 'lennard_jones_epsilon'
     LJ_SIG = 'lennard_jones_sigma'
+    MANIFEST = 'manifest'
 
 
 class SeriesAttributeName():
@@ -124,11 +126,14 @@ def conformer(prefix):
     inf_dfile = file_.information(FilePrefix.CONF,
                                   function=info.conformer_trunk)
     traj_dfile = file_.trajectory(FilePrefix.CONF)
+    man_dfile = file_.information(FilePrefix.MANIFEST,
+                                  function=info.run_manifest)
     trunk_ds.add_data_files({
         FileAttributeName.VMATRIX: vma_dfile,
         FileAttributeName.INFO: inf_dfile,
         FileAttributeName.ENERGY: min_ene_dfile,
-        FileAttributeName.TRAJ: traj_dfile})
+        FileAttributeName.TRAJ: traj_dfile,
+        FileAttributeName.MANIFEST: man_dfile})
 
     geom_inf_dfile = file_.information(FilePrefix.GEOM, function=info.run)
     grad_inf_dfile = file_.information(FilePrefix.GRAD, function=info.run)
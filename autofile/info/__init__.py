@@ -6,6 +6,8 @@ from autofile.info._info import dict_
 from autofile.info._info import from_string
 from autofile.info._info import matches_function_signature
 from autofile.info._info import Info
+from autofile.info._info import Format
+from autofile.info._info import set_default_format
 
 __all__ = [
     'object_',
@@ -14,4 +16,6 @@ __all__ = [
     'from_string',
     'matches_function_signature',
     'Info',
+    'Format',
+    'set_default_format',
 ]
@@ -1,6 +1,8 @@
 """ implements an class for YAML-style information
 """
+import json
 import numbers
+import datetime
 from types import SimpleNamespace
 try:
     from collections.abc import Collection as _Collection
@@ -8,6 +10,34 @@ except ImportError:
     from collections import Collection as _Collection
 import yaml
 from autofile.info._inspect import function_keys as _function_keys
+try:
+    from yaml import CSafeLoader as _SafeLoader
+    from yaml import CDumper as _Dumper
+except ImportError:
+    from yaml import SafeLoader as _SafeLoader
+    from yaml import Dumper as _Dumper
+
+_DATETIME_KEY = '$datetime'
+
+
+class Format():
+    """ information string formats """
+    YAML = 'yaml'
+    JSON = 'json'
+
+
+_FORMAT = Format.YAML
+
+
+def set_default_format(fmt):
+    """ set the format used by `string()` when none is given
+
+    Either format can be read back by `from_string()`, so trees may mix the
+    two.
+    """
+    global _FORMAT
+    assert fmt in (Format.YAML, Format.JSON)
+    _FORMAT = fmt
 
 
 def object_(inf_dct):
@@ -46,18 +76,41 @@ def dict_(inf_obj):
     return inf_dct
 
 
-def string(inf_obj):
-    """ write an information object to a YAML string
+def string(inf_obj, fmt=None):
+    """ write an information object to a YAML (default) or JSON string
     """
+    fmt = _FORMAT if fmt is None else fmt
     inf_dct = dict(inf_obj)
-    inf_str = yaml.dump(inf_dct, default_flow_style=False)
+    if fmt == Format.JSON:
+        inf_str = json.dumps(inf_dct, separators=(',', ':'), sort_keys=True,
+                             default=_json_encode)
+    else:
+        assert fmt == Format.YAML
+        inf_str = yaml.dump(inf_dct, Dumper=_Dumper, default_flow_style=False)
     return inf_str
 
 
 def from_string(inf_str):
-    """ read an information object from a YAML string
+    """ read an information object from a YAML or JSON string
+
+    The format is chosen by the content: a JSON object is parsed as JSON,
+    anything else as YAML, using the C-accelerated safe loader when it is
+    available. Older files with Python-specific YAML tags fall back to the
+    full loader.
     """
-    inf_dct = yaml.load(inf_str, Loader=yaml.FullLoader)
+    inf_dct = None
+    if inf_str.lstrip().startswith('{'):
+        try:
+            inf_dct = json.loads(inf_str, object_hook=_json_decode)
+        except ValueError:
+            pass
+
+    if inf_dct is None:
+        try:
+            inf_dct = yaml.load(inf_str, Loader=_SafeLoader)
+        except yaml.constructor.ConstructorError:
+            inf_dct = yaml.load(inf_str, Loader=yaml.FullLoader)
+
     inf_obj = object_(inf_dct)
     return inf_obj
 
@@ -113,6 +166,26 @@ class Info(SimpleNamespace):
         object.__setattr__(self, key, value)
 
 
+def _json_encode(obj):
+    """ encode the non-JSON values that YAML information files can hold
+    """
+    if isinstance(obj, datetime.datetime):
+        ret = {_DATETIME_KEY: obj.isoformat()}
+    elif isinstance(obj, numbers.Integral):
+        ret = int(obj)
+    elif isinstance(obj, numbers.Real):
+        ret = float(obj)
+    else:
+        raise TypeError("Cannot write {!r} to JSON".format(obj))
+    return ret
+
+
+def _json_decode(dct):
+    if list(dct.keys()) == [_DATETIME_KEY]:
+        dct = datetime.datetime.fromisoformat(dct[_DATETIME_KEY])
+    return dct
+
+
 def _normalized_nonstring_sequence(seq):
     return [
         int(val) if isinstance(val, numbers.Integral) else
@@ -1,5 +1,6 @@
 """ test the autofile.info module
 """
+import datetime
 import autofile.info
 
 
@@ -16,5 +17,33 @@ def test_():
         {'a': ['b', 'c', 'd', 'e'], 'x': {'y': 1, 'z': 2}})))
 
 
+def test__string():
+    """ test autofile.info.string and autofile.info.from_string
+    """
+    ref_inf_obj = autofile.info.Info(
+        a=['b', 'c'], x=autofile.info.Info(y=1, z=2.5), n=None,
+        t=datetime.datetime(2020, 1, 2, 3, 4, 5, 6))
+
+    yaml_str = autofile.info.string(ref_inf_obj)
+    json_str = autofile.info.string(
+        ref_inf_obj, fmt=autofile.info.Format.JSON)
+    print(yaml_str)
+    print(json_str)
+    assert yaml_str != json_str
+    assert autofile.info.from_string(yaml_str) == ref_inf_obj
+    assert autofile.info.from_string(json_str) == ref_inf_obj
+
+    # YAML flow style is read as YAML, even though it starts like JSON
+    assert (autofile.info.from_string('{a: [b, c], x: {y: 1}}') ==
+            autofile.info.Info(a=['b', 'c'], x=autofile.info.Info(y=1)))
+
+    autofile.info.set_default_format(autofile.info.Format.JSON)
+    try:
+        assert autofile.info.string(ref_inf_obj) == json_str
+    finally:
+        autofile.info.set_default_format(autofile.info.Format.YAML)
+
+
 if __name__ == '__main__':
     test_()
+    test__string()
@@ -4,6 +4,7 @@ from autofile.system import model
 from autofile.system import map_
 from autofile.system import file_
 from autofile.system import dir_
+from autofile.system import index
 from autofile.system.map_ import generate_new_conformer_id
 from autofile.system.map_ import generate_new_tau_id
 from autofile.system.map_ import sort_together
@@ -16,6 +17,7 @@ __all__ = [
     'map_',
     'file_',
     'dir_',
+    'index',
     'generate_new_conformer_id',
     'generate_new_tau_id',
     'sort_together',
@@ -0,0 +1,420 @@
+""" SQLite index over a filesystem prefix
+
+Maps directories to their locators and files to their scalar payloads
+(energies, etc.), so that bulk queries over a save prefix can be answered
+without walking the tree. An index is attached to a prefix with `attach()`;
+from then on DataSeries.create/remove and DataSeries file writes under that
+prefix keep it up to date. Changes made without the index (by a run that did
+not attach it) are caught when a directory is queried: its children are
+compared with the tree, and so are the modification times and sizes of their
+scalar files, and whatever differs is re-read.
+"""
+import os
+import sys
+import glob
+import json
+import numbers
+import sqlite3
+import autofile.info
+import autofile.file
+
+DB_NAME = 'index.sqlite'
+LOC_FILE_NAME = 'dir.yaml'
+SCALAR_EXTENSIONS = (
+    autofile.file.name.Extension.ENERGY,
+    autofile.file.name.Extension.HARMONIC_ZPVE,
+    autofile.file.name.Extension.ANHARMONIC_ZPVE,
+    autofile.file.name.Extension.LJ_EPSILON,
+    autofile.file.name.Extension.LJ_SIGMA,
+    autofile.file.name.Extension.EXTERNAL_SYMMETRY_FACTOR,
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS dirs (
+    path TEXT PRIMARY KEY,
+    parent TEXT NOT NULL,
+    locs TEXT
+);
+CREATE INDEX IF NOT EXISTS dirs_parent ON dirs (parent);
+CREATE TABLE IF NOT EXISTS vals (
+    path TEXT PRIMARY KEY,
+    dir TEXT NOT NULL,
+    name TEXT NOT NULL,
+    value REAL NOT NULL,
+    stamp TEXT
+);
+CREATE INDEX IF NOT EXISTS vals_dir ON vals (dir);
+"""
+
+_INDEXES = {}
+
+
+class Index():
+    """ locator and scalar-value index for the tree under a prefix
+
+    Paths are stored relative to the prefix, so the database moves with the
+    tree.
+    """
+
+    def __init__(self, prefix, db_path=None):
+        """
+        :param prefix: the top directory of the indexed tree
+        :type prefix: str
+        :param db_path: the database file (defaults to `DB_NAME` in `prefix`)
+        :type db_path: str
+        """
+        assert os.path.isdir(prefix)
+        self.prefix = os.path.abspath(prefix)
+        self.db_path = (os.path.join(self.prefix, DB_NAME) if db_path is None
+                        else os.path.abspath(db_path))
+        self._conn = None
+        self._pid = None
+
+    def connection(self):
+        """ the database connection for this process
+
+        (connections are not shared with forked worker processes)
+        """
+        if self._conn is None or self._pid != os.getpid():
+            self._conn = sqlite3.connect(self.db_path, timeout=60.)
+            self._pid = os.getpid()
+            with self._conn:
+                self._conn.executescript(_SCHEMA)
+                # (databases from before the file stamps were kept; their
+                # values are re-read when next queried)
+                cols = [row[1] for row in
+                        self._conn.execute("PRAGMA table_info(vals)")]
+                if 'stamp' not in cols:
+                    self._conn.execute(
+                        "ALTER TABLE vals ADD COLUMN stamp TEXT")
+        return self._conn
+
+    def contains(self, pth):
+        """ is this path inside the indexed tree?
+        """
+        pth = os.path.abspath(pth)
+        return pth == self.prefix or pth.startswith(self.prefix + os.sep)
+
+    def record_dirs(self, pths, locs_dct=None):
+        """ record new directories, the last of which has the given locators
+
+        :param pths: directory paths, in order of creation
+        :param locs_dct: the locator information for the last directory
+        :type locs_dct: dict
+        """
+        rows = [(self._relpath(pth), self._relpath(os.path.dirname(pth)),
+                 None) for pth in pths]
+        if rows and locs_dct is not None:
+            rows[-1] = rows[-1][:2] + (json.dumps(locs_dct, default=str),)
+        with self.connection() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO dirs VALUES (?, ?, ?)", rows)
+
+    def record_value(self, pth, val):
+        """ record the scalar payload of a file (as it is on disk now)
+        """
+        rel_pth = self._relpath(pth)
+        with self.connection() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO vals VALUES (?, ?, ?, ?, ?)",
+                (rel_pth, os.path.dirname(rel_pth), os.path.basename(rel_pth),
+                 float(val), _file_stamp(pth)))
+
+    def remove_dir(self, pth):
+        """ remove a directory and everything below it from the index
+        """
+        rel_pth = self._relpath(pth)
+        sub = rel_pth + '/'
+        with self.connection() as conn:
+            conn.execute(
+                "DELETE FROM dirs WHERE path = ? OR substr(path, 1, ?) = ?",
+                (rel_pth, len(sub), sub))
+            conn.execute(
+                "DELETE FROM vals WHERE dir = ? OR substr(dir, 1, ?) = ?",
+                (rel_pth, len(sub), sub))
+
+    def rebuild(self):
+        """ regenerate the index from the tree
+        """
+        dir_rows = []
+        val_rows = []
+        for dir_pth, dir_names, file_names in os.walk(self.prefix):
+            dir_names.sort()
+            rel_dir = self._relpath(dir_pth)
+            if rel_dir:
+                locs_str = None
+                if LOC_FILE_NAME in file_names:
+                    locs_str = json.dumps(
+                        _read_locators(os.path.join(dir_pth, LOC_FILE_NAME)),
+                        default=str)
+                dir_rows.append(
+                    (rel_dir, os.path.dirname(rel_dir), locs_str))
+            for file_name in file_names:
+                if file_name.endswith(SCALAR_EXTENSIONS):
+                    val_pth = os.path.join(dir_pth, file_name)
+                    val = _read_value(val_pth)
+                    if val is not None:
+                        val_rows.append(
+                            (os.path.join(rel_dir, file_name), rel_dir,
+                             file_name, val, _file_stamp(val_pth)))
+
+        with self.connection() as conn:
+            conn.execute("DELETE FROM dirs")
+            conn.execute("DELETE FROM vals")
+            conn.executemany(
+                "INSERT OR REPLACE INTO dirs VALUES (?, ?, ?)", dir_rows)
+            conn.executemany(
+                "INSERT OR REPLACE INTO vals VALUES (?, ?, ?, ?, ?)", val_rows)
+
+    def sync_dir(self, parent):
+        """ bring the records of the children of `parent` up to date with the
+        tree, if they differ from it
+
+        (the directories, and the scalar files directly inside them, which
+        are re-read if they are new or their modification time or size has
+        changed)
+
+        :returns: whether the records were stale
+        :rtype: bool
+        """
+        pths = sorted(pth for pth in glob.glob(os.path.join(parent, '*'))
+                      if os.path.isdir(pth))
+        rec_pths = self.children(parent)
+        stale = pths != rec_pths
+        for pth in set(rec_pths) - set(pths):
+            self.remove_dir(pth)
+        for pth in set(pths) - set(rec_pths):
+            loc_pth = os.path.join(pth, LOC_FILE_NAME)
+            self.record_dirs(
+                [pth], (_read_locators(loc_pth)
+                        if os.path.isfile(loc_pth) else None))
+
+        rec_stamps = self._value_stamps(parent)
+        stamps = {}
+        for pth in pths:
+            for file_name in os.listdir(pth):
+                if file_name.endswith(SCALAR_EXTENSIONS):
+                    val_pth = os.path.join(pth, file_name)
+                    stamps[val_pth] = _file_stamp(val_pth)
+        for val_pth in set(rec_stamps) - set(stamps):
+            stale = True
+            self._remove_value(val_pth)
+        for val_pth in sorted(stamps):
+            if stamps[val_pth] != rec_stamps.get(val_pth):
+                stale = True
+                val = _read_value(val_pth)
+                if val is None:
+                    self._remove_value(val_pth)
+                else:
+                    self.record_value(val_pth, val)
+        return stale
+
+    # queries
+    def children(self, parent):
+        """ the recorded child directories of `parent`
+
+        :returns: absolute paths, sorted
+        :rtype: list
+        """
+        rows = self.connection().execute(
+            "SELECT path FROM dirs WHERE parent = ?", (self._relpath(parent),))
+        return sorted(self._abspath(row[0]) for row in rows)
+
+    def find(self, parent=None, **loc_vals):
+        """ directories whose locators have the given values
+
+        :param parent: only search the children of this directory
+        :returns: (absolute path, locator dictionary) pairs
+        :rtype: list
+        """
+        if parent is None:
+            rows = self.connection().execute(
+                "SELECT path, locs FROM dirs WHERE locs IS NOT NULL")
+        else:
+            rows = self.connection().execute(
+                "SELECT path, locs FROM dirs "
+                "WHERE locs IS NOT NULL AND parent = ?",
+                (self._relpath(parent),))
+
+        ret = []
+        for rel_pth, locs_str in rows:
+            locs_dct = json.loads(locs_str)
+            if all(key in locs_dct and locs_dct[key] == val
+                   for key, val in loc_vals.items()):
+                ret.append((self._abspath(rel_pth), locs_dct))
+        return sorted(ret, key=lambda x: x[0])
+
+    def value(self, pth):
+        """ the recorded payload of a file, or None
+        """
+        row = self.connection().execute(
+            "SELECT value FROM vals WHERE path = ?",
+            (self._relpath(pth),)).fetchone()
+        return None if row is None else row[0]
+
+    def min_value_child(self, parent, file_name):
+        """ the child directory of `parent` whose file `file_name` holds the
+        smallest value
+
+        The children are first checked against the tree (see `sync_dir()`).
+
+        :returns: (absolute path, value), or None if no child has the file
+        """
+        self.sync_dir(parent)
+        row = self.connection().execute(
+            "SELECT dirs.path, vals.value FROM dirs "
+            "JOIN vals ON vals.dir = dirs.path "
+            "WHERE dirs.parent = ? AND vals.name = ? "
+            "ORDER BY vals.value LIMIT 1",
+            (self._relpath(parent), file_name)).fetchone()
+        return None if row is None else (self._abspath(row[0]), row[1])
+
+    def min_energy_conformers(self, method, basis, orb_restricted,
+                              cnf_trunk_name='CONFS',
+                              ene_file_name='geom.ene'):
+        """ the minimum-energy conformer of every species at a theory level
+
+        :returns: (species locator dictionary, conformer path, energy)
+            triples
+        :rtype: list
+        """
+        ret = []
+        thy_lst = self.find(method=method, basis=basis,
+                            orb_restricted=orb_restricted)
+        for thy_pth, _ in thy_lst:
+            cnf_trunk_pth = os.path.join(thy_pth, cnf_trunk_name)
+            min_cnf = self.min_value_child(cnf_trunk_pth, ene_file_name)
+            if min_cnf is not None:
+                spc_pth = os.path.dirname(thy_pth)
+                row = self.connection().execute(
+                    "SELECT locs FROM dirs WHERE path = ?",
+                    (self._relpath(spc_pth),)).fetchone()
+                spc_locs = (json.loads(row[0]) if row and row[0] is not None
+                            else None)
+                ret.append((spc_locs,) + min_cnf)
+        return ret
+
+    # helpers
+    def _value_stamps(self, parent):
+        """ the recorded stamps of the scalar files of the children of
+        `parent`, by absolute path
+        """
+        rows = self.connection().execute(
+            "SELECT vals.path, vals.stamp FROM dirs "
+            "JOIN vals ON vals.dir = dirs.path WHERE dirs.parent = ?",
+            (self._relpath(parent),))
+        return {self._abspath(rel_pth): stamp for rel_pth, stamp in rows}
+
+    def _remove_value(self, pth):
+        with self.connection() as conn:
+            conn.execute("DELETE FROM vals WHERE path = ?",
+                         (self._relpath(pth),))
+
+    def _relpath(self, pth):
+        pth = os.path.abspath(pth)
+        assert self.contains(pth)
+        return '' if pth == self.prefix else os.path.relpath(pth, self.prefix)
+
+    def _abspath(self, rel_pth):
+        return os.path.join(self.prefix, rel_pth) if rel_pth else self.prefix
+
+
+def attach(prefix, db_path=None, rebuild=None):
+    """ attach an index to a prefix, so that changes below it are recorded
+
+    An existing database is reused; the directories it is queried about are
+    checked against the tree then (see `Index.sync_dir()`).
+
+    :param rebuild: regenerate the index from the tree; by default this is
+        done only when the database does not exist yet
+    :returns: the index
+    :rtype: Index
+    """
+    idx = Index(prefix, db_path=db_path)
+    if rebuild is None:
+        rebuild = not os.path.exists(idx.db_path)
+    if rebuild:
+        idx.rebuild()
+    _INDEXES[idx.prefix] = idx
+    return idx
+
+
+def detach(prefix):
+    """ stop recording changes below a prefix
+    """
+    _INDEXES.pop(os.path.abspath(prefix), None)
+
+
+def lookup(pth):
+    """ the attached index covering a path, or None
+    """
+    ret = None
+    if _INDEXES:
+        for idx in _INDEXES.values():
+            if idx.contains(pth):
+                ret = idx
+                break
+    return ret
+
+
+def record_created_dirs(pths, locs_pth=None):
+    """ record newly created directories with the index covering them, if any
+
+    :param pths: the directories, outermost first
+    :param locs_pth: the locator file of the last directory
+    """
+    if pths:
+        idx = lookup(pths[-1])
+        if idx is not None:
+            locs_dct = None if locs_pth is None else _read_locators(locs_pth)
+            idx.record_dirs(pths, locs_dct)
+
+
+def record_file(pth, val):
+    """ record a file's scalar payload with the index covering it, if any
+    """
+    if (isinstance(val, numbers.Real) and not isinstance(val, bool)
+            and pth.endswith(SCALAR_EXTENSIONS)):
+        idx = lookup(pth)
+        if idx is not None:
+            idx.record_value(pth, val)
+
+
+def record_removed_dir(pth):
+    """ drop a removed directory from the index covering it, if any
+    """
+    idx = lookup(pth)
+    if idx is not None:
+        idx.remove_dir(pth)
+
+
+def _read_locators(pth):
+    """ read a locator file as a dictionary
+    """
+    inf_obj = autofile.info.from_string(autofile.file.read_file(pth))
+    return autofile.info.dict_(inf_obj)
+
+
+def _file_stamp(pth):
+    """ the modification time and size of a file, as a string
+    """
+    stat = os.stat(pth)
+    return '{:d}:{:d}'.format(stat.st_mtime_ns, stat.st_size)
+
+
+def _read_value(pth):
+    """ read a scalar payload file, or None if it cannot be parsed
+    """
+    try:
+        val = float(autofile.file.read_file(pth).strip())
+    except ValueError:
+        val = None
+    return val
+
+
+if __name__ == '__main__':
+    # usage: python -m autofile.system.index rebuild <prefix> [<db_path>]
+    assert len(sys.argv) in (3, 4) and sys.argv[1] == 'rebuild', (
+        "usage: python -m autofile.system.index rebuild <prefix> [<db_path>]")
+    INDEX = attach(*sys.argv[2:], rebuild=True)
+    print("Rebuilt index at {}".format(INDEX.db_path))
@@ -101,6 +101,24 @@ def lennard_jones(potential, nsamp,
     return inf_obj
 
 
+def run_manifest(runs):
+    """ manifest of processed run directories
+
+    :param runs: the status and information-file modification time of each
+        run directory at the time it was processed, by run leaf name
+    :type runs: dict[str: (str, float)]
+    """
+    runs = dict(runs)
+    assert all(isinstance(key, str) and len(rec) == 2
+               and isinstance(rec[0], str) and isinstance(rec[1], numbers.Real)
+               for key, rec in runs.items())
+
+    runs = autofile.info.Info(**runs)
+    inf_obj = autofile.info.Info(runs=runs)
+    assert autofile.info.matches_function_signature(inf_obj, run_manifest)
+    return inf_obj
+
+
 class RunStatus():
     """ run statuses """
     RUNNING = "running"
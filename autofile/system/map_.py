@@ -3,6 +3,7 @@
 import os
 import string
 import numbers
+import functools
 import elstruct
 import automol
 from autofile.system._util import (is_valid_inchi_multiplicity as
@@ -13,6 +14,9 @@ from autofile.system._util import (random_string_identifier as
 from autofile.system._util import (is_random_string_identifier as
                                    _is_random_string_identifier)
 
+# the number of distinct locators whose directory names are remembered
+CACHE_SIZE = 10000
+
 
 # species
 def species_trunk():
@@ -21,8 +25,11 @@ def species_trunk():
     return 'SPC'
 
 
+@functools.lru_cache(maxsize=CACHE_SIZE, typed=True)
 def species_leaf(ich, chg, mul):
     """ species leaf directory name
+
+    (memoized, so the inchi is only validated and hashed once)
     """
     assert automol.inchi.is_standard_form(ich)
     assert automol.inchi.is_complete(ich)
@@ -184,11 +191,13 @@ def reaction_trunk():
 def reaction_leaf(rxn_ichs, rxn_chgs, rxn_muls, ts_mul):
     """ reaction leaf directory name
     """
-    rxn_ichs = tuple(map(tuple, rxn_ichs))
-    rxn_chgs = tuple(map(tuple, rxn_chgs))
-    rxn_muls = tuple(map(tuple, rxn_muls))
+    return _reaction_leaf(*_tuples(rxn_ichs, rxn_chgs, rxn_muls), ts_mul)
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE, typed=True)
+def _reaction_leaf(rxn_ichs, rxn_chgs, rxn_muls, ts_mul):
     assert ((rxn_ichs, rxn_chgs, rxn_muls) ==
-            sort_together(rxn_ichs, rxn_chgs, rxn_muls))
+            _sort_reaction(rxn_ichs, rxn_chgs, rxn_muls))
     ichs1, ichs2 = rxn_ichs
     chgs1, chgs2 = rxn_chgs
     muls1, muls2 = rxn_muls
@@ -200,7 +209,11 @@ def reaction_leaf(rxn_ichs, rxn_chgs, rxn_muls, ts_mul):
 def reaction_is_reversed(rxn_ichs, rxn_chgs, rxn_muls):
     """ sort inchis, chgs, and muliplicities together
     """
+    return _reaction_is_reversed(*_tuples(rxn_ichs, rxn_chgs, rxn_muls))
+
 
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def _reaction_is_reversed(rxn_ichs, rxn_chgs, rxn_muls):
     assert len(rxn_ichs) == len(rxn_chgs) == len(rxn_muls) == 2
 
     ichs1, ichs2 = rxn_ichs
@@ -217,7 +230,11 @@ def reaction_is_reversed(rxn_ichs, rxn_chgs, rxn_muls):
 def sort_together(rxn_ichs, rxn_chgs, rxn_muls):
     """ sort inchis, chgs, and muliplicities together
     """
+    return _sort_reaction(*_tuples(rxn_ichs, rxn_chgs, rxn_muls))
 
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def _sort_reaction(rxn_ichs, rxn_chgs, rxn_muls):
     assert len(rxn_ichs) == len(rxn_chgs) == len(rxn_muls) == 2
 
     ichs1, ichs2 = rxn_ichs
@@ -227,7 +244,7 @@ def sort_together(rxn_ichs, rxn_chgs, rxn_muls):
     ichs1, chgs1, muls1 = _sort_together(ichs1, chgs1, muls1)
     ichs2, chgs2, muls2 = _sort_together(ichs2, chgs2, muls2)
 
-    if reaction_is_reversed(rxn_ichs, rxn_chgs, rxn_muls):
+    if _reaction_is_reversed(rxn_ichs, rxn_chgs, rxn_muls):
         ichs1, ichs2 = ichs2, ichs1
         chgs1, chgs2 = chgs2, chgs1
         muls1, muls2 = muls2, muls1
@@ -235,6 +252,14 @@ def sort_together(rxn_ichs, rxn_chgs, rxn_muls):
     return ((ichs1, ichs2), (chgs1, chgs2), (muls1, muls2))
 
 
+def _tuples(rxn_ichs, rxn_chgs, rxn_muls):
+    """ reactant and product sequences as (hashable) nested tuples
+    """
+    return (tuple(map(tuple, rxn_ichs)),
+            tuple(map(tuple, rxn_chgs)),
+            tuple(map(tuple, rxn_muls)))
+
+
 def _sort_together(ichs, chgs, muls):
     idxs = automol.inchi.argsort(ichs)
     ichs = tuple(ichs[idx] for idx in idxs)
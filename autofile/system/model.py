@@ -1,10 +1,18 @@
 """ defines the filesystem model
 """
 import os
+import copy
 import glob
+import time
 import types
 import shutil
 import autofile.file
+from autofile.system import index
+
+# directory listings and locator files modified more recently than this (in
+# seconds) are not cached, since a coarse filesystem timestamp could miss a
+# change made within the same tick
+RACY_TIME = 2.
 
 
 class DataFile():
@@ -57,12 +65,14 @@ class DataSeries():
     """
 
     def __init__(self, prefix, map_, nlocs, depth, loc_dfile=None,
-                 root_ds=None, removable=False):
+                 root_ds=None, removable=False, cache=True):
         """
         :param map_: maps `nlocs` locators to a segment path consisting of
             `depth` directories
         :param info_map_: maps `nlocs` locators to an information object, to
             be written in the data directory
+        :param cache: cache directory listings and locators between calls to
+            `existing()`, checking them against modification times
         """
         assert os.path.isdir(prefix)
         self.prefix = os.path.abspath(prefix)
@@ -72,7 +82,10 @@ class DataSeries():
         self.loc_dfile = loc_dfile
         self.root = root_ds
         self.removable = removable
+        self.cache = cache
         self.file = types.SimpleNamespace()
+        self._pths_cache = {}
+        self._locs_cache = {}
 
     def add_data_files(self, dfile_dct):
         """ add DataFiles to the DataSeries
@@ -114,6 +127,8 @@ class DataSeries():
             pth = self.path(locs)
             if self.exists(locs):
                 shutil.rmtree(pth)
+                index.record_removed_dir(pth)
+            self.clear_cache()
         else:
             raise ValueError("This data series is not removable")
 
@@ -128,11 +143,18 @@ class DataSeries():
         # create this directory in the chain, if it doesn't already exist
         if not self.exists(locs):
             pth = self.path(locs)
-            os.makedirs(pth)
+            new_pths = _missing_directories(pth)
+            # (another process may be creating it at the same time)
+            os.makedirs(pth, exist_ok=True)
+            self.clear_cache()
 
+            loc_pth = None
             if self.loc_dfile is not None:
                 locs = self._self_locators(locs)
                 self.loc_dfile.write(locs, pth)
+                loc_pth = self.loc_dfile.path(pth)
+
+            index.record_created_dirs(new_pths, loc_pth)
 
     def existing(self, root_locs=(), relative=False):
         """ return the list of locators for existing paths
@@ -142,7 +164,7 @@ class DataSeries():
                              "without a locator DataFile")
 
         pths = self.existing_paths(root_locs)
-        locs_lst = tuple(self.loc_dfile.read(pth) for pth in pths)
+        locs_lst = tuple(self._read_locators(pth) for pth in pths)
         if not relative:
             locs_lst = tuple(map(list(root_locs).__add__, locs_lst))
 
@@ -150,18 +172,55 @@ class DataSeries():
 
     def existing_paths(self, root_locs=()):
         """ existing paths at this prefix/root directory
+
+        Only single-level listings are cached, since their validity can be
+        checked against the modification time of the prefix directory alone.
         """
         if self.root is None:
             prefix = self.prefix
         else:
             prefix = self.root.path(root_locs)
 
+        stamp = None
+        if self.cache and self.depth == 1:
+            stamp = modification_time(prefix)
+            if prefix in self._pths_cache:
+                cached_stamp, pths = self._pths_cache[prefix]
+                if stamp == cached_stamp:
+                    return pths
+
         pth_pattern = os.path.join(prefix, *('*' * self.depth))
         pths = filter(os.path.isdir, glob.glob(pth_pattern))
         pths = tuple(sorted(os.path.join(prefix, pth) for pth in pths))
+
+        if stamp is not None and is_settled(stamp):
+            self._pths_cache[prefix] = (stamp, pths)
         return pths
 
+    def clear_cache(self):
+        """ drop the cached directory listings and locators
+        """
+        self._pths_cache.clear()
+        self._locs_cache.clear()
+
     # helpers
+    def _read_locators(self, pth):
+        """ read the locators from a directory, using the cache if it is valid
+        """
+        if not self.cache:
+            return self.loc_dfile.read(pth)
+
+        stamp = modification_time(self.loc_dfile.path(pth))
+        if pth in self._locs_cache:
+            cached_stamp, locs = self._locs_cache[pth]
+            if stamp == cached_stamp:
+                return copy.deepcopy(locs)
+
+        locs = self.loc_dfile.read(pth)
+        if stamp is not None and is_settled(stamp):
+            self._locs_cache[pth] = (stamp, copy.deepcopy(locs))
+        return locs
+
     def _self_locators(self, locs):
         """ locators for this DataSeriesDir
         """
@@ -221,7 +280,9 @@ class _DataSeriesFile():
     def write(self, val, locs=()):
         """ write data to this file
         """
-        self.file.write(val, self.dir.path(locs))
+        pth = self.dir.path(locs)
+        self.file.write(val, pth)
+        index.record_file(self.file.path(pth), val)
 
     def read(self, locs=()):
         """ read data from this file
@@ -229,6 +290,34 @@ class _DataSeriesFile():
         return self.file.read(self.dir.path(locs))
 
 
+def _missing_directories(pth):
+    """ the directories that creating this path would make, outermost first
+    """
+    pths = []
+    while pth and not os.path.isdir(pth):
+        pths.insert(0, pth)
+        pth = os.path.dirname(pth)
+    return pths
+
+
+def modification_time(pth):
+    """ modification time of a file or directory, in nanoseconds
+
+    (None if it does not exist)
+    """
+    try:
+        stamp = os.stat(pth).st_mtime_ns
+    except FileNotFoundError:
+        stamp = None
+    return stamp
+
+
+def is_settled(stamp):
+    """ was this modification time long enough ago to be trusted for caching?
+    """
+    return time.time() - stamp * 1e-9 > RACY_TIME
+
+
 def _path_is_relative(pth):
     """ is this a relative path?
     """
@@ -1,6 +1,7 @@
 """ test autofile.system
 """
 import os
+import time
 import numbers
 import tempfile
 import numpy
@@ -35,6 +36,115 @@ def root_data_series_directory(prefix):
         loc_dfile=ROOT_SPEC_DFILE,)
 
 
+def test__model__existing_cache():
+    """ test autofile.system.model.DataSeries.existing caching
+    """
+    prefix = os.path.join(PREFIX, 'existing_cache')
+    os.mkdir(prefix)
+
+    def _data_series():
+        return autofile.system.model.DataSeries(
+            prefix,
+            map_=lambda x: str(x[0]),
+            nlocs=1,
+            depth=1,
+            loc_dfile=autofile.system.file_.locator(
+                file_prefix='dir',
+                map_dct_={'loc': lambda locs: locs[0]},
+                loc_keys=['loc']),
+            removable=True)
+
+    ds_ = _data_series()
+    for loc in range(3):
+        ds_.create([loc])
+
+    # age the tree so that the listing and locators are cached
+    old_time = time.time() - 10.
+    for pth in ds_.existing_paths() + (prefix,):
+        os.utime(pth, (old_time, old_time))
+    for pth in ds_.existing_paths():
+        loc_pth = ds_.loc_dfile.path(pth)
+        os.utime(loc_pth, (old_time, old_time))
+    assert sorted(ds_.existing()) == [[0], [1], [2]]
+    assert sorted(ds_.existing()) == [[0], [1], [2]]
+
+    # changes made through this object invalidate the cache
+    ds_.create([3])
+    assert sorted(ds_.existing()) == [[0], [1], [2], [3]]
+    ds_.remove([0])
+    assert sorted(ds_.existing()) == [[1], [2], [3]]
+
+    # changes made elsewhere are picked up from the directory time stamp
+    old_time = time.time() - 10.
+    os.utime(prefix, (old_time, old_time))
+    assert sorted(ds_.existing()) == [[1], [2], [3]]
+    _data_series().create([4])
+    assert sorted(ds_.existing()) == [[1], [2], [3], [4]]
+
+
+def test__index():
+    """ test autofile.system.index
+    """
+    prefix = os.path.join(PREFIX, 'index')
+    os.mkdir(prefix)
+
+    root_ds = root_data_series_directory(prefix)
+    ds_ = autofile.system.dir_.conformer_leaf(prefix, root_ds=root_ds)
+    ds_.add_data_files({
+        'energy': autofile.system.file_.energy('geom')})
+
+    idx = autofile.system.index.attach(prefix)
+    cnf_locs_lst = [
+        [autofile.system.generate_new_conformer_id()] for _ in range(3)]
+    for ene, cnf_locs in zip([-1.5, -2.5, -0.5], cnf_locs_lst):
+        ds_.create([1, 'a'] + cnf_locs)
+        ds_.file.energy.write(ene, [1, 'a'] + cnf_locs)
+
+    cnf_trunk_pth = os.path.dirname(ds_.path([1, 'a'] + cnf_locs_lst[0]))
+    min_pth, min_ene = idx.min_value_child(cnf_trunk_pth, 'geom.ene')
+    assert min_pth == ds_.path([1, 'a'] + cnf_locs_lst[1])
+    assert min_ene == -2.5
+    assert idx.find(loc1=1, loc2='a') == [
+        (root_ds.path([1, 'a']), {'loc1': 1, 'loc2': 'a',
+                                  'other': 'something else'})]
+
+    # a rebuild from the tree gives the same answers
+    idx.rebuild()
+    assert idx.min_value_child(cnf_trunk_pth, 'geom.ene') == (min_pth,
+                                                              min_ene)
+    assert len(idx.find(parent=cnf_trunk_pth)) == 3
+
+    ds_.removable = True
+    ds_.remove([1, 'a'] + cnf_locs_lst[1])
+    assert idx.min_value_child(cnf_trunk_pth, 'geom.ene')[1] == -1.5
+    autofile.system.index.detach(prefix)
+
+    # changes made without the index are picked up when it is reattached
+    new_locs = [autofile.system.generate_new_conformer_id()]
+    ds_.create([1, 'a'] + new_locs)
+    ds_.file.energy.write(-3.5, [1, 'a'] + new_locs)
+    idx = autofile.system.index.attach(prefix)
+    assert idx.min_value_child(cnf_trunk_pth, 'geom.ene') == (
+        ds_.path([1, 'a'] + new_locs), -3.5)
+    autofile.system.index.detach(prefix)
+    ds_.remove([1, 'a'] + new_locs)
+    idx = autofile.system.index.attach(prefix)
+    assert idx.min_value_child(cnf_trunk_pth, 'geom.ene')[1] == -1.5
+    assert len(idx.children(cnf_trunk_pth)) == 2
+
+    # ... and so are scalar files written or rewritten without it
+    new_locs = [autofile.system.generate_new_conformer_id()]
+    ds_.create([1, 'a'] + new_locs)
+    autofile.system.index.detach(prefix)
+    ds_.file.energy.write(-0.25, [1, 'a'] + new_locs)
+    ds_.file.energy.write(-10.25, [1, 'a'] + cnf_locs_lst[2])
+    idx = autofile.system.index.attach(prefix)
+    assert idx.min_value_child(cnf_trunk_pth, 'geom.ene') == (
+        ds_.path([1, 'a'] + cnf_locs_lst[2]), -10.25)
+    assert idx.value(ds_.file.energy.path([1, 'a'] + new_locs)) == -0.25
+    autofile.system.index.detach(prefix)
+
+
 def test__file__input_file():
     """ test autofile.system.file_.input_file
     """
@@ -572,6 +682,29 @@ def test__dir__reaction_leaf():
                 sorted(branch_locs_lst))
 
 
+def test__map__reaction_leaf():
+    """ test map_.reaction_leaf, map_.sort_together
+    """
+    rxn_ichs = [['InChI=1S/CH3/h1H3', 'InChI=1S/HO/h1H'],
+                ['InChI=1S/CH2/h1H2', 'InChI=1S/H2O/h1H2']]
+    rxn_chgs = [[0, 0], [0, 0]]
+    rxn_muls = [[2, 2], [1, 1]]
+
+    sort_rxn = autofile.system.map_.sort_together(rxn_ichs, rxn_chgs, rxn_muls)
+    assert sort_rxn == autofile.system.map_.sort_together(
+        *map(tuple, (rxn_ichs, rxn_chgs, rxn_muls)))
+    assert autofile.system.map_.reaction_is_reversed(
+        rxn_ichs, rxn_chgs, rxn_muls)
+    assert not autofile.system.map_.reaction_is_reversed(*sort_rxn)
+
+    # repeated locators are looked up rather than re-validated
+    dir_name = autofile.system.map_.reaction_leaf(*sort_rxn, 1)
+    hits = autofile.system.map_._reaction_leaf.cache_info().hits
+    assert dir_name == autofile.system.map_.reaction_leaf(
+        *map(lambda x: list(map(list, x)), sort_rxn), 1)
+    assert autofile.system.map_._reaction_leaf.cache_info().hits == hits + 1
+
+
 def test__dir__theory_leaf():
     """ test dir_.theory_leaf
     """
@@ -963,6 +1096,7 @@ if __name__ == '__main__':
     test__dir__species_leaf()
     test__dir__reaction_trunk()
     test__dir__reaction_leaf()
+    test__map__reaction_leaf()
     test__dir__theory_leaf()
     test__dir__conformer_trunk()
     test__dir__conformer_leaf()
@@ -105,6 +105,13 @@ def test__conformer():
     cnf_fs.leaf.create(locs)
     assert cnf_fs.leaf.exists(locs)
 
+    ref_man_obj = autofile.system.info.run_manifest(
+        {locs[0]: (autofile.system.RunStatus.SUCCESS, 1577836800.25)})
+    cnf_fs.trunk.file.manifest.write(ref_man_obj)
+    man_obj = cnf_fs.trunk.file.manifest.read()
+    assert man_obj == ref_man_obj
+    assert dict(man_obj)['runs'][locs[0]][1] == 1577836800.25
+
 
 def test__tau():
     """ test autofile.fs.tau
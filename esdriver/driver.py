@@ -3,6 +3,7 @@
 import os
 import automol.inchi
 import automol.geom
+import elstruct
 import moldr
 import autofile.fs
 import scripts.es
@@ -12,12 +13,31 @@ from submission import substr
 
 KICKOFF_SIZE = 0.1
 KICKOFF_BACKWARD = False
+STATUS_FILE_NAME = 'es_status.txt'
+TS_RUN_DIR_NAME = 'TS_RUNS'
 
 def run(tsk_info_lst, es_dct, rxn_lst, spc_dct, run_prefix, save_prefix,
         vdw_params=[False, False, True],
         pst_params=[1.0, 6],
-        rad_rad_ts='vtst'):
+        rad_rad_ts='vtst', nslots=1, build_graph=None, run_label=None):
     """ driver for all electronic structure tasks
+
+    The tasks for different species are independent, so each species runs
+    through its tasks in order as a chain of jobs, and with nslots > 1 the
+    chains run side by side in that many worker processes. The TS searches
+    wait for all of the tasks before them; the searches for different
+    reactions are also independent and run side by side, each in its own run
+    tree under TS_RUN_DIR_NAME. The state of every (species, task)
+    job is kept in STATUS_FILE_NAME under the run prefix.
+
+    Runs that share a run prefix side by side (e.g. the PESs of a rates run,
+    whose TS names repeat) each need a `run_label`. It prefixes the name of
+    the status board and separates the TS run trees.
+
+    With a build graph (moldr.build.BuildGraph), the (species, level, task)
+    nodes that are complete and current are skipped, unless the task is set
+    to overwrite. A node counts as complete only while its products are in
+    the save filesystem (see `task_products_saved()`).
     """
 
     print("Tasks:\n", tsk_info_lst)
@@ -39,12 +59,26 @@ def run(tsk_info_lst, es_dct, rxn_lst, spc_dct, run_prefix, save_prefix,
         os.makedirs(save_prefix)
     if not os.path.exists(run_prefix):
         os.makedirs(run_prefix)
+    autofile.fs.species(run_prefix).trunk.create()
+    autofile.fs.species(save_prefix).trunk.create()
+
+    #Set up the job slots and the status board
+    executor = moldr.executor.JobExecutor(nslots=nslots) if nslots > 1 else None
+    board = moldr.executor.StatusBoard(
+        os.path.join(run_prefix, _labeled(STATUS_FILE_NAME, run_label)),
+        cols=[_task_label(idx, tsk_info)
+              for idx, tsk_info in enumerate(tsk_info_lst)])
+    jobs = {}
+    prev_cols = {}
+    nodes = {}
+    prev_hashes = {}
 
     #Loop over Tasks
     ts_found = []
-    for tsk_info in tsk_info_lst:
+    for tsk_idx, tsk_info in enumerate(tsk_info_lst):
     
         #Task information
+        col = _task_label(tsk_idx, tsk_info)
         tsk = tsk_info[0]
         es_ini_key = tsk_info[2]
         es_run_key = tsk_info[1]
@@ -57,6 +91,16 @@ def run(tsk_info_lst, es_dct, rxn_lst, spc_dct, run_prefix, save_prefix,
 
         #If task is to find the transition state, find all TSs for your reactionlist
         if tsk in ('find_ts', 'find_vdw'):
+            # the searches need everything before them to be done
+            _run_species_jobs(jobs, executor, board, build_graph, nodes)
+            jobs = {}
+            prev_cols = {}
+            ts_jobs = {}
+            if executor is not None:
+                # filesystem objects do not pickle; rebuilt in the worker
+                job_spc_dct = {name: {key: val for key, val in dct.items()
+                                      if key != 'rxn_fs'}
+                               for name, dct in spc_dct.items()}
             for ts in spc_dct:
                 if 'ts_' in ts:
                     print('Task {} \t for {} \t {}//{} \t {} = {}'.format(
@@ -66,283 +110,538 @@ def run(tsk_info_lst, es_dct, rxn_lst, spc_dct, run_prefix, save_prefix,
                     rxn_class = spc_dct[ts]['class']
                     if not rxn_class:
                         print('skipping reaction because type =', rxn_class)
+                        board.set((ts, col), 'done')
                         continue
                     #elif 'radical radical' in rxn_class and not 'high spin' in rxn_class:
                         #print('skipping reaction because type =', rxn_class)
                        # continue
-                    ts_zma = spc_dct[ts]['original_zma']
-                    dist_info = spc_dct[ts]['dist_info']
-                    grid = spc_dct[ts]['grid']
-                    bkp_data = spc_dct[ts]['bkp_data']
-                    _, _, rxn_run_path, rxn_save_path = spc_dct[ts]['rxn_fs']
                     if 'ts' in tsk:
-                        geo, ts_zma_f, final_dist = scripts.es.find_ts(
-                            spc_dct, spc_dct[ts], ts_info, ts_zma, rxn_class,
-                            dist_info, grid, bkp_data, ini_thy_info, thy_info,
-                            run_prefix, save_prefix, rxn_run_path,
-                            rxn_save_path, overwrite,
-                            pst_params=pst_params,
-                            rad_rad_ts=rad_rad_ts)
-                        spc_dct[ts]['dist_info'][1] = final_dist
-                        angle = None
-                        dist_name = dist_info[0]
-                        if 'abstraction' in rxn_class or 'addition' in rxn_class:
-                            brk_name = dist_info[3]
-                            # print('bond info', dist_name, brk_name)
-                            if dist_name and brk_name:
-                                ts_bnd = automol.zmatrix.bond_idxs(ts_zma, dist_name)
-                                brk_bnd = automol.zmatrix.bond_idxs(ts_zma, brk_name)
-                                # print('ts_zma test:', ts_zma)
-                                # print('brk_bnd test:', brk_bnd)
-                                # print('ts_bnd test:', ts_bnd)
-                                ang_atms = [0, 0, 0]
-                                cent_atm = list(set(brk_bnd) & set(ts_bnd))
-                                if cent_atm:
-                                    ang_atms[1] = cent_atm[0]
-                                    for idx in brk_bnd:
-                                        if idx != ang_atms[1]:
-                                            ang_atms[0] = idx
-                                    for idx in ts_bnd:
-                                        if idx != ang_atms[1]:
-                                            ang_atms[2] = idx
-
-                                #geom = automol.zmatrix.geometry(ts_zma)
-                                # I don't know why ts_zma was not just obtained from the find_ts ret
-                                # if you use ts_zma then angle is not properly determined
-                                geom = automol.zmatrix.geometry(ts_zma_f)
-                                print('geo before conformer: \n', automol.geom.string(geo))
-                                print('geom before conformer: \n', automol.geom.string(geom))
-                                print('ang_atms before calculation:', ang_atms)
-                                angle = automol.geom.central_angle(geom, *ang_atms)
-                                print('calculated angle for ts is:', angle)
-                        spc_dct[ts]['dist_info'].append(angle)
-                        if not isinstance(geo, str):
-                            print('Success, transition state {} added to species queue'.format(ts))
-                            spc_queue.append(ts)
-                            ts_found.append(ts)
+                        if executor is not None:
+                            # each search runs in a run tree of its own
+                            ts_jobs[(ts, col)] = (
+                                find_ts_task,
+                                (job_spc_dct[ts], job_spc_dct, thy_info,
+                                 ini_thy_info,
+                                 os.path.join(run_prefix, TS_RUN_DIR_NAME,
+                                              _labeled(ts, run_label)),
+                                 save_prefix, overwrite, pst_params,
+                                 rad_rad_ts),
+                                [])
+                        else:
+                            ts_jobs[(ts, col)] = (
+                                find_ts_task,
+                                (spc_dct[ts], spc_dct, thy_info, ini_thy_info,
+                                 run_prefix, save_prefix, overwrite,
+                                 pst_params, rad_rad_ts),
+                                [])
                     elif 'vdw' in tsk:
+                        board.set((ts, col), 'running')
                         vdws = scripts.es.find_vdw(
                             ts, spc_dct, thy_info, ini_thy_info, ts_info, vdw_params,
                             es_dct[es_run_key]['mc_nsamp'], run_prefix,
                             save_prefix, KICKOFF_SIZE, KICKOFF_BACKWARD,
                             substr.PROJROT, overwrite)
                         spc_queue.extend(vdws)
+                        board.set((ts, col), 'done')
+
+            # collect the searches, in reaction order
+            rets = _run_species_jobs(ts_jobs, executor, board)
+            for ts, _ in ts_jobs:
+                geo, ts_dct = rets[(ts, col)]
+                spc_dct[ts].update(ts_dct)
+                if not isinstance(geo, str):
+                    print('Success, transition state {} added to species queue'.format(ts))
+                    spc_queue.append(ts)
+                    ts_found.append(ts)
             continue
 
 
         #Loop over all species
         for spc in spc_queue:
-            if 'ts_' in spc: 
-                print('\nTask {} \t {}//{} \t Species {}'.format(
-                    tsk, '/'.join(thy_info), '/'.join(ini_thy_info), spc))
-                spc_run_fs, spc_save_fs, spc_run_path, spc_save_path = spc_dct[spc]['rxn_fs']
-                spc_info = scripts.es.get_spc_info(spc_dct[spc])
+            spc_dct_i = spc_dct[spc]
+            node = (_node_label(spc, spc_dct_i),
+                    '/'.join(map(str, thy_info)) + '//' +
+                    '/'.join(map(str, ini_thy_info)), tsk)
+            inp_hash = moldr.build.input_hash(
+                [tsk, thy_info, ini_thy_info, es_dct[es_run_key],
+                 _node_inputs(spc, spc_dct_i)],
+                prev_hashes.get(spc, ()))
+            prev_hashes[spc] = [inp_hash]
+            product_args = (tsk, spc, spc_dct_i, thy_info, ini_thy_info,
+                            run_prefix, save_prefix)
+            if (build_graph is not None and not overwrite and
+                    build_graph.is_current(node, inp_hash) and
+                    task_products_saved(*product_args)):
+                board.set((spc, col), 'done')
+                continue
+            nodes[(spc, col)] = (node, inp_hash, product_args)
+            if executor is not None:
+                # filesystem objects do not pickle; rebuilt in the worker
+                spc_dct_i = {key: val for key, val in spc_dct_i.items()
+                             if key != 'rxn_fs'}
+            jobs[(spc, col)] = (
+                run_species_task,
+                (tsk, spc, spc_dct_i, es_dct[es_run_key], thy_info,
+                 ini_thy_info, run_prefix, save_prefix, overwrite),
+                [(spc, prev_cols[spc])] if spc in prev_cols else [])
+            prev_cols[spc] = col
+
+    _run_species_jobs(jobs, executor, board, build_graph, nodes)
+    if executor is not None:
+        executor.shutdown()
+    return ts_found
 
-            else:
-                print('\nTask {} \t {}//{} \t Species {}: {}'.format(
-                    tsk, '/'.join(thy_info), '/'.join(ini_thy_info), spc,
-                    automol.inchi.smiles(spc_dct[spc]['ich'])))
-                spc_info = scripts.es.get_spc_info(spc_dct[spc])
-                spc_run_fs = autofile.fs.species(run_prefix)
-                spc_run_fs.leaf.create(spc_info)
-                spc_run_path = spc_run_fs.leaf.path(spc_info)
-
-                spc_save_fs = autofile.fs.species(save_prefix)
-                spc_save_fs.leaf.create(spc_info)
-                spc_save_path = spc_save_fs.leaf.path(spc_info)
-
-            orb_restr = moldr.util.orbital_restriction(
-                spc_info, thy_info)
-            thy_level = thy_info[0:3]
-            thy_level.append(orb_restr)
-
-            thy_run_fs = autofile.fs.theory(spc_run_path)
-            thy_save_fs = autofile.fs.theory(spc_save_path)
-
-            if 'ene' not in tsk and 'hess' not in tsk:
-                if 'ts_' in spc:
-                    thy_run_fs.leaf.create(thy_level[1:4])
-                    thy_run_path = thy_run_fs.leaf.path(thy_level[1:4])
-                    thy_save_fs.leaf.create(thy_level[1:4])
-                    thy_save_path = thy_save_fs.leaf.path(thy_level[1:4])
-
-                    thy_run_fs = autofile.fs.ts(thy_run_path)
-                    thy_run_fs.trunk.create()
-                    thy_run_path = thy_run_fs.trunk.path()
-
-                    thy_save_fs = autofile.fs.ts(thy_save_path)
-                    thy_save_fs.trunk.create()
-                    thy_save_path = thy_save_fs.trunk.path()
 
-                else:
-                    thy_run_fs.leaf.create(thy_level[1:4])
-                    thy_run_path = thy_run_fs.leaf.path(thy_level[1:4])
-                    thy_save_fs.leaf.create(thy_level[1:4])
-                    thy_save_path = thy_save_fs.leaf.path(thy_level[1:4])
-
-                cnf_run_fs = autofile.fs.conformer(thy_run_path)
-                cnf_save_fs = autofile.fs.conformer(thy_save_path)
-                tau_run_fs = autofile.fs.tau(thy_run_path)
-                tau_save_fs = autofile.fs.tau(thy_save_path)
-                min_cnf_locs = moldr.util.min_energy_conformer_locators(cnf_save_fs)
-                if min_cnf_locs:
-                    min_cnf_run_path = cnf_run_fs.leaf.path(min_cnf_locs)
-                    min_cnf_save_path = cnf_save_fs.leaf.path(min_cnf_locs)
-                    # print('min_cnf_paths test in esdriver')
-                    # print(min_cnf_run_path)
-                    # print(min_cnf_save_path)
-                    scn_run_fs = autofile.fs.conformer(min_cnf_run_path)
-                    scn_save_fs = autofile.fs.conformer(min_cnf_save_path)
-                else:
-                    scn_run_fs = None
-                    scn_save_fs = None
-            else:
-                cnf_run_fs = None
-                cnf_save_fs = None
-                tau_run_fs = None
-                tau_save_fs = None
-                scn_run_fs = None
-                scn_save_fs = None
-
-            if ini_thy_info[0] != 'input_geom':
-                orb_restr = moldr.util.orbital_restriction(
-                   spc_info, ini_thy_info)
-                ini_thy_level = ini_thy_info[0:3]
-                ini_thy_level.append(orb_restr)
-
-                ini_thy_run_fs = autofile.fs.theory(spc_run_path)
-                ini_thy_save_fs = autofile.fs.theory(spc_save_path)
-                if 'ts_' in spc:
-                    ini_thy_run_fs.leaf.create(ini_thy_level[1:4])
-                    ini_thy_run_path = ini_thy_run_fs.leaf.path(ini_thy_level[1:4])
-                    ini_thy_save_fs.leaf.create(ini_thy_level[1:4])
-                    ini_thy_save_path = ini_thy_save_fs.leaf.path(ini_thy_level[1:4])
-
-                    ini_thy_run_fs = autofile.fs.ts(ini_thy_run_path)
-                    ini_thy_run_fs.trunk.create()
-                    ini_thy_run_path = ini_thy_run_fs.trunk.path()
-
-                    ini_thy_save_fs = autofile.fs.ts(ini_thy_save_path)
-                    ini_thy_save_fs.trunk.create()
-                    ini_thy_save_path = ini_thy_save_fs.trunk.path()
+def run_species_task(tsk, spc, spc_dct_i, es_dct_i, thy_info, ini_thy_info,
+                     run_prefix, save_prefix, overwrite):
+    """ run one electronic structure task for one species (or TS)
 
-                else:
-                    ini_thy_run_fs.leaf.create(ini_thy_level[1:4])
-                    ini_thy_run_path = ini_thy_run_fs.leaf.path(ini_thy_level[1:4])
-                    ini_thy_save_fs.leaf.create(ini_thy_level[1:4])
-                    ini_thy_save_path = ini_thy_save_fs.leaf.path(ini_thy_level[1:4])
+    (independent of the other species, so this can run in a worker process;
+    the reaction filesystem of a TS is rebuilt here if it was left out of
+    `spc_dct_i`)
 
-                ini_cnf_run_fs = autofile.fs.conformer(ini_thy_run_path)
-                ini_cnf_save_fs = autofile.fs.conformer(ini_thy_save_path)
+    :returns: whether the task was run (False if what it starts from is
+        missing)
+    :rtype: bool
+    """
+    if 'ts_' in spc:
+        print('\nTask {} \t {}//{} \t Species {}'.format(
+            tsk, '/'.join(thy_info), '/'.join(ini_thy_info), spc))
+        if 'rxn_fs' in spc_dct_i:
+            spc_run_fs, spc_save_fs, spc_run_path, spc_save_path = spc_dct_i['rxn_fs']
+        else:
+            spc_run_fs, spc_save_fs, spc_run_path, spc_save_path = scripts.es.get_rxn_fs(
+                run_prefix, save_prefix, spc_dct_i)
+        spc_info = scripts.es.get_spc_info(spc_dct_i)
 
-                ini_tau_run_fs = autofile.fs.tau(ini_thy_run_path)
-                ini_tau_save_fs = autofile.fs.tau(ini_thy_save_path)
-                min_cnf_locs = moldr.util.min_energy_conformer_locators(ini_cnf_save_fs)
-                if min_cnf_locs:
-                    min_cnf_run_path = ini_cnf_run_fs.leaf.path(min_cnf_locs)
-                    min_cnf_save_path = ini_cnf_save_fs.leaf.path(min_cnf_locs)
-                    ini_scn_run_fs = autofile.fs.conformer(min_cnf_run_path)
-                    ini_scn_save_fs = autofile.fs.conformer(min_cnf_save_path)
-                else:
-                    ini_scn_run_fs = None
-                    ini_scn_save_fs = None
+    else:
+        print('\nTask {} \t {}//{} \t Species {}: {}'.format(
+            tsk, '/'.join(thy_info), '/'.join(ini_thy_info), spc,
+            automol.inchi.smiles(spc_dct_i['ich'])))
+        spc_info = scripts.es.get_spc_info(spc_dct_i)
+        spc_run_fs = autofile.fs.species(run_prefix)
+        spc_run_fs.leaf.create(spc_info)
+        spc_run_path = spc_run_fs.leaf.path(spc_info)
+
+        spc_save_fs = autofile.fs.species(save_prefix)
+        spc_save_fs.leaf.create(spc_info)
+        spc_save_path = spc_save_fs.leaf.path(spc_info)
+
+    orb_restr = moldr.util.orbital_restriction(
+        spc_info, thy_info)
+    thy_level = thy_info[0:3]
+    thy_level.append(orb_restr)
+
+    thy_run_fs = autofile.fs.theory(spc_run_path)
+    thy_save_fs = autofile.fs.theory(spc_save_path)
+
+    if 'ene' not in tsk and 'hess' not in tsk:
+        if 'ts_' in spc:
+            thy_run_fs.leaf.create(thy_level[1:4])
+            thy_run_path = thy_run_fs.leaf.path(thy_level[1:4])
+            thy_save_fs.leaf.create(thy_level[1:4])
+            thy_save_path = thy_save_fs.leaf.path(thy_level[1:4])
+
+            thy_run_fs = autofile.fs.ts(thy_run_path)
+            thy_run_fs.trunk.create()
+            thy_run_path = thy_run_fs.trunk.path()
+
+            thy_save_fs = autofile.fs.ts(thy_save_path)
+            thy_save_fs.trunk.create()
+            thy_save_path = thy_save_fs.trunk.path()
+
+        else:
+            thy_run_fs.leaf.create(thy_level[1:4])
+            thy_run_path = thy_run_fs.leaf.path(thy_level[1:4])
+            thy_save_fs.leaf.create(thy_level[1:4])
+            thy_save_path = thy_save_fs.leaf.path(thy_level[1:4])
+
+        cnf_run_fs = autofile.fs.conformer(thy_run_path)
+        cnf_save_fs = autofile.fs.conformer(thy_save_path)
+        tau_run_fs = autofile.fs.tau(thy_run_path)
+        tau_save_fs = autofile.fs.tau(thy_save_path)
+        min_cnf_locs = moldr.util.min_energy_conformer_locators(cnf_save_fs)
+        if min_cnf_locs:
+            min_cnf_run_path = cnf_run_fs.leaf.path(min_cnf_locs)
+            min_cnf_save_path = cnf_save_fs.leaf.path(min_cnf_locs)
+            # print('min_cnf_paths test in esdriver')
+            # print(min_cnf_run_path)
+            # print(min_cnf_save_path)
+            scn_run_fs = autofile.fs.conformer(min_cnf_run_path)
+            scn_save_fs = autofile.fs.conformer(min_cnf_save_path)
+        else:
+            scn_run_fs = None
+            scn_save_fs = None
+    else:
+        cnf_run_fs = None
+        cnf_save_fs = None
+        tau_run_fs = None
+        tau_save_fs = None
+        scn_run_fs = None
+        scn_save_fs = None
+
+    if ini_thy_info[0] != 'input_geom':
+        orb_restr = moldr.util.orbital_restriction(
+           spc_info, ini_thy_info)
+        ini_thy_level = ini_thy_info[0:3]
+        ini_thy_level.append(orb_restr)
+
+        ini_thy_run_fs = autofile.fs.theory(spc_run_path)
+        ini_thy_save_fs = autofile.fs.theory(spc_save_path)
+        if 'ts_' in spc:
+            ini_thy_run_fs.leaf.create(ini_thy_level[1:4])
+            ini_thy_run_path = ini_thy_run_fs.leaf.path(ini_thy_level[1:4])
+            ini_thy_save_fs.leaf.create(ini_thy_level[1:4])
+            ini_thy_save_path = ini_thy_save_fs.leaf.path(ini_thy_level[1:4])
+
+            ini_thy_run_fs = autofile.fs.ts(ini_thy_run_path)
+            ini_thy_run_fs.trunk.create()
+            ini_thy_run_path = ini_thy_run_fs.trunk.path()
+
+            ini_thy_save_fs = autofile.fs.ts(ini_thy_save_path)
+            ini_thy_save_fs.trunk.create()
+            ini_thy_save_path = ini_thy_save_fs.trunk.path()
+
+        else:
+            ini_thy_run_fs.leaf.create(ini_thy_level[1:4])
+            ini_thy_run_path = ini_thy_run_fs.leaf.path(ini_thy_level[1:4])
+            ini_thy_save_fs.leaf.create(ini_thy_level[1:4])
+            ini_thy_save_path = ini_thy_save_fs.leaf.path(ini_thy_level[1:4])
+
+        ini_cnf_run_fs = autofile.fs.conformer(ini_thy_run_path)
+        ini_cnf_save_fs = autofile.fs.conformer(ini_thy_save_path)
+
+        ini_tau_run_fs = autofile.fs.tau(ini_thy_run_path)
+        ini_tau_save_fs = autofile.fs.tau(ini_thy_save_path)
+        min_cnf_locs = moldr.util.min_energy_conformer_locators(ini_cnf_save_fs)
+        if min_cnf_locs:
+            min_cnf_run_path = ini_cnf_run_fs.leaf.path(min_cnf_locs)
+            min_cnf_save_path = ini_cnf_save_fs.leaf.path(min_cnf_locs)
+            ini_scn_run_fs = autofile.fs.conformer(min_cnf_run_path)
+            ini_scn_save_fs = autofile.fs.conformer(min_cnf_save_path)
+        else:
+            ini_scn_run_fs = None
+            ini_scn_save_fs = None
 
+    else:
+        ini_thy_run_fs = None
+        ini_thy_run_path = None
+        ini_thy_save_fs = None
+        ini_thy_save_path = None
+        ini_cnf_run_fs = None
+        ini_cnf_save_fs = None
+        ini_tau_run_fs = None
+        ini_tau_save_fs = None
+        ini_thy_level = ini_thy_info
+        ini_scn_run_fs = None
+        ini_scn_save_fs = None
+
+    run_fs = autofile.fs.run(thy_run_path)
+    run_fs.trunk.create()
+
+    fs = [spc_run_fs, spc_save_fs, thy_run_fs, thy_save_fs,
+          cnf_run_fs, cnf_save_fs, tau_run_fs, tau_save_fs,
+          scn_run_fs, scn_save_fs, run_fs]
+
+    ini_fs = [ini_thy_run_fs, ini_thy_save_fs, ini_cnf_run_fs,
+              ini_cnf_save_fs, ini_tau_run_fs, ini_tau_save_fs,
+              ini_scn_run_fs, ini_scn_save_fs]
+
+    #Run tasks
+    if 'ts_' in spc:
+        if 'samp' in tsk or 'scan' in tsk or 'geom' in tsk:
+            geo = moldr.ts.reference_geometry(
+                spc_dct_i, thy_level, ini_thy_level, fs, ini_fs,
+                spc_dct_i['dist_info'], overwrite)
+            if geo:
+                scripts.es.ts_geometry_generation(
+                    tsk, spc_dct_i, es_dct_i,
+                    thy_level, fs, spc_info, overwrite)
             else:
-                ini_thy_run_fs = None
-                ini_thy_run_path = None
-                ini_thy_save_fs = None
-                ini_thy_save_path = None
-                ini_cnf_run_fs = None
-                ini_cnf_save_fs = None
-                ini_tau_run_fs = None
-                ini_tau_save_fs = None
-                ini_thy_level = ini_thy_info
-                ini_scn_run_fs = None
-                ini_scn_save_fs = None
-
-            run_fs = autofile.fs.run(thy_run_path)
-            run_fs.trunk.create()
-
-            fs = [spc_run_fs, spc_save_fs, thy_run_fs, thy_save_fs,
-                  cnf_run_fs, cnf_save_fs, tau_run_fs, tau_save_fs,
-                  scn_run_fs, scn_save_fs, run_fs]
-
-            ini_fs = [ini_thy_run_fs, ini_thy_save_fs, ini_cnf_run_fs,
-                      ini_cnf_save_fs, ini_tau_run_fs, ini_tau_save_fs,
-                      ini_scn_run_fs, ini_scn_save_fs]
-
-            #Run tasks
-            if 'ts_' in spc:
-                if 'samp' in tsk or 'scan' in tsk or 'geom' in tsk:
-                    geo = moldr.ts.reference_geometry(
-                        spc_dct[spc], thy_level, ini_thy_level, fs, ini_fs,
-                        spc_dct[spc]['dist_info'], overwrite)
-                    if geo:
-                        scripts.es.ts_geometry_generation(
-                            tsk, spc_dct[spc], es_dct[es_run_key],
-                            thy_level, fs, spc_info, overwrite)
+                return False
+        else:
+            selection = 'min'
+            scripts.es.ts_geometry_analysis(
+                tsk, thy_level, ini_fs, selection, spc_info, spc_dct_i, overwrite)
+    else:
+        if 'samp' in tsk or 'scan' in tsk or 'geom' in tsk:
+            geo = moldr.geom.reference_geometry(
+                spc_dct_i, thy_level, ini_thy_level, fs, ini_fs,
+                kickoff_size=KICKOFF_SIZE,
+                kickoff_backward=KICKOFF_BACKWARD,
+                projrot_script_str=substr.PROJROT,
+                overwrite=overwrite)
+            if geo:
+                if not 'vdw_' in spc:
+                    scripts.es.geometry_generation(
+                        tsk, spc_dct_i, es_dct_i, thy_level,
+                        fs, spc_info, overwrite)
                 else:
-                    selection = 'min'
-                    scripts.es.ts_geometry_analysis(
-                        tsk, thy_level, ini_fs, selection, spc_info, spc_dct[spc], overwrite)
+                    scripts.es.fake_geo_gen(
+                        tsk, spc_dct_i, es_dct_i, thy_level,
+                        fs, spc_info, overwrite)
             else:
-                if 'samp' in tsk or 'scan' in tsk or 'geom' in tsk:
-                    geo = moldr.geom.reference_geometry(
-                        spc_dct[spc], thy_level, ini_thy_level, fs, ini_fs,
-                        kickoff_size=KICKOFF_SIZE,
-                        kickoff_backward=KICKOFF_BACKWARD,
-                        projrot_script_str=substr.PROJROT,
-                        overwrite=overwrite)
-                    if geo:
-                        if not 'vdw_' in spc:
-                            scripts.es.geometry_generation(
-                                tsk, spc_dct[spc], es_dct[es_run_key], thy_level,
-                                fs, spc_info, overwrite)
-                        else:
-                            scripts.es.fake_geo_gen(
-                                tsk, spc_dct[spc], es_dct[es_run_key], thy_level,
-                                fs, spc_info, overwrite)
-                else:
-                    selection = 'min'
-                    if 'conf' in tsk:
-                        min_cnf_locs = moldr.util.min_energy_conformer_locators(ini_cnf_save_fs)
-                        if not min_cnf_locs:
-                            print(
-                                'Initial level of theory for conformers must be ',
-                                'run before {} '.format(tsk))
-                            continue
-                        elif not ini_cnf_save_fs.leaf.file.geometry.exists(min_cnf_locs):
-                            print(
-                                'Initial level of theory for conformers must be ',
-                                'run before {} '.format(tsk))
-                            continue
-                    elif 'tau' in tsk:
-                        tau_locs = ini_tau_save_fs.leaf.existing()
-                        if not tau_locs:
-                            print(
-                                'Initial level of theory for tau must be ', 
-                                'run before {} '.format(tsk))
-                            continue
-                        elif not ini_tau_save_fs.leaf.file.geometry.exists([tau_locs[0]]):
-                            print(
-                                'Initial level of theory for tau must be ',
-                                'run before {} '.format(tsk))
-                            continue
-                    elif 'scan' in tsk:
-                        scn_locs = ini_scn_save_fs.leaf.existing()
-                        if not scn_locs:
-                            print(
-                                'Initial level of theory for scn must be run ',
-                                'before {} '.format(tsk))
-                            continue
-                        elif not ini_scn_save_fs.leaf.file.geometry.exists([scn_locs[0]]):
-                            print(
-                                'Initial level of theory for scn must be run ',
-                                'before {} '.format(tsk))
-                            continue
-                    scripts.es.geometry_analysis(tsk, thy_level, ini_fs,
-                            selection, spc_info, overwrite)
-    return ts_found
+                return False
+        else:
+            selection = 'min'
+            if 'conf' in tsk:
+                min_cnf_locs = moldr.util.min_energy_conformer_locators(ini_cnf_save_fs)
+                if not min_cnf_locs:
+                    print(
+                        'Initial level of theory for conformers must be ',
+                        'run before {} '.format(tsk))
+                    return False
+                elif not ini_cnf_save_fs.leaf.file.geometry.exists(min_cnf_locs):
+                    print(
+                        'Initial level of theory for conformers must be ',
+                        'run before {} '.format(tsk))
+                    return False
+            elif 'tau' in tsk:
+                tau_locs = ini_tau_save_fs.leaf.existing()
+                if not tau_locs:
+                    print(
+                        'Initial level of theory for tau must be ', 
+                        'run before {} '.format(tsk))
+                    return False
+                elif not ini_tau_save_fs.leaf.file.geometry.exists([tau_locs[0]]):
+                    print(
+                        'Initial level of theory for tau must be ',
+                        'run before {} '.format(tsk))
+                    return False
+            elif 'scan' in tsk:
+                scn_locs = ini_scn_save_fs.leaf.existing()
+                if not scn_locs:
+                    print(
+                        'Initial level of theory for scn must be run ',
+                        'before {} '.format(tsk))
+                    return False
+                elif not ini_scn_save_fs.leaf.file.geometry.exists([scn_locs[0]]):
+                    print(
+                        'Initial level of theory for scn must be run ',
+                        'before {} '.format(tsk))
+                    return False
+            scripts.es.geometry_analysis(tsk, thy_level, ini_fs,
+                    selection, spc_info, overwrite)
+    return True
+
+
+def find_ts_task(ts_dct, spc_dct, thy_info, ini_thy_info, run_prefix,
+                 save_prefix, overwrite, pst_params, rad_rad_ts):
+    """ find the TS of one reaction
+
+    (independent of the other reactions, so this can run in a worker process;
+    the reaction filesystem is rebuilt here if it was left out of `ts_dct`)
+
+    :returns: the TS geometry (a message string if none was found) and the
+        TS entry, updated with the search results
+    :rtype: tuple
+    """
+    ts_info = (ts_dct['ich'], ts_dct['chg'], ts_dct['mul'])
+    rxn_class = ts_dct['class']
+    ts_zma = ts_dct['original_zma']
+    dist_info = ts_dct['dist_info']
+    grid = ts_dct['grid']
+    bkp_data = ts_dct['bkp_data']
+    if 'rxn_fs' in ts_dct:
+        _, _, rxn_run_path, rxn_save_path = ts_dct['rxn_fs']
+    else:
+        _, _, rxn_run_path, rxn_save_path = scripts.es.get_rxn_fs(
+            run_prefix, save_prefix, ts_dct)
+    geo, ts_zma_f, final_dist = scripts.es.find_ts(
+        spc_dct, ts_dct, ts_info, ts_zma, rxn_class,
+        dist_info, grid, bkp_data, ini_thy_info, thy_info,
+        run_prefix, save_prefix, rxn_run_path,
+        rxn_save_path, overwrite,
+        pst_params=pst_params,
+        rad_rad_ts=rad_rad_ts)
+    ts_dct['dist_info'][1] = final_dist
+    angle = None
+    dist_name = dist_info[0]
+    if 'abstraction' in rxn_class or 'addition' in rxn_class:
+        brk_name = dist_info[3]
+        # print('bond info', dist_name, brk_name)
+        if dist_name and brk_name:
+            ts_bnd = automol.zmatrix.bond_idxs(ts_zma, dist_name)
+            brk_bnd = automol.zmatrix.bond_idxs(ts_zma, brk_name)
+            # print('ts_zma test:', ts_zma)
+            # print('brk_bnd test:', brk_bnd)
+            # print('ts_bnd test:', ts_bnd)
+            ang_atms = [0, 0, 0]
+            cent_atm = list(set(brk_bnd) & set(ts_bnd))
+            if cent_atm:
+                ang_atms[1] = cent_atm[0]
+                for idx in brk_bnd:
+                    if idx != ang_atms[1]:
+                        ang_atms[0] = idx
+                for idx in ts_bnd:
+                    if idx != ang_atms[1]:
+                        ang_atms[2] = idx
+
+            #geom = automol.zmatrix.geometry(ts_zma)
+            # I don't know why ts_zma was not just obtained from the find_ts ret
+            # if you use ts_zma then angle is not properly determined
+            geom = automol.zmatrix.geometry(ts_zma_f)
+            print('geo before conformer: \n', automol.geom.string(geo))
+            print('geom before conformer: \n', automol.geom.string(geom))
+            print('ang_atms before calculation:', ang_atms)
+            angle = automol.geom.central_angle(geom, *ang_atms)
+            print('calculated angle for ts is:', angle)
+    ts_dct['dist_info'].append(angle)
+    return geo, ts_dct
+
+
+def task_products_saved(tsk, spc, spc_dct_i, thy_info, ini_thy_info,
+                        run_prefix, save_prefix):
+    """ are the products of a task in the save filesystem?
+
+    Electronic structure failures do not raise, so this is what tells a task
+    that ran from one that is done. Tasks that are not checked here never
+    count as done.
+
+    :rtype: bool
+    """
+    if tsk in ('conf_energy', 'conf_grad', 'conf_hess', 'conf_vpt2'):
+        # (these run on the minimum-energy conformer of the initial level)
+        lvl_info = ini_thy_info
+    else:
+        lvl_info = thy_info
+    if lvl_info[0] == 'input_geom':
+        return False
+
+    spc_info = scripts.es.get_spc_info(spc_dct_i)
+    if 'ts_' in spc:
+        if 'rxn_fs' in spc_dct_i:
+            _, _, spc_run_path, spc_save_path = spc_dct_i['rxn_fs']
+        else:
+            _, _, spc_run_path, spc_save_path = scripts.es.get_rxn_fs(
+                run_prefix, save_prefix, spc_dct_i)
+    else:
+        spc_run_path = autofile.fs.species(run_prefix).leaf.path(spc_info)
+        spc_save_path = autofile.fs.species(save_prefix).leaf.path(spc_info)
+    thy_level = list(lvl_info[0:3])
+    thy_level.append(moldr.util.orbital_restriction(spc_info, lvl_info))
+    thy_run_path = autofile.fs.theory(spc_run_path).leaf.path(thy_level[1:4])
+    thy_save_fs = autofile.fs.theory(spc_save_path)
+    thy_save_path = thy_save_fs.leaf.path(thy_level[1:4])
+    if 'ts_' in spc:
+        ts_save_fs = autofile.fs.ts(thy_save_path)
+        thy_run_path = autofile.fs.ts(thy_run_path).trunk.path()
+        thy_save_path = ts_save_fs.trunk.path()
+    if not os.path.isdir(thy_save_path):
+        return False
+
+    cnf_run_fs = autofile.fs.conformer(thy_run_path)
+    cnf_save_fs = autofile.fs.conformer(thy_save_path)
+    min_cnf_locs = moldr.util.min_energy_conformer_locators(cnf_save_fs)
+    saved = False
+    if tsk == 'find_geom':
+        if 'ts_' in spc:
+            saved = ts_save_fs.trunk.file.geometry.exists()
+        else:
+            saved = thy_save_fs.leaf.file.geometry.exists(thy_level[1:4])
+    elif tsk == 'tau_samp':
+        saved = bool(autofile.fs.tau(thy_save_path).leaf.existing())
+    elif not min_cnf_locs:
+        saved = False
+    elif tsk == 'conf_samp':
+        saved = cnf_save_fs.leaf.file.energy.exists(min_cnf_locs)
+    elif tsk == 'conf_grad':
+        saved = cnf_save_fs.leaf.file.gradient.exists(min_cnf_locs)
+    elif tsk == 'conf_hess':
+        saved = cnf_save_fs.leaf.file.hessian.exists(min_cnf_locs)
+    elif tsk == 'conf_vpt2':
+        saved = cnf_save_fs.leaf.file.anharmonicity_matrix.exists(
+            min_cnf_locs)
+    elif tsk == 'conf_energy':
+        sp_save_fs = autofile.fs.single_point(
+            cnf_save_fs.leaf.path(min_cnf_locs))
+        sp_level = list(thy_info[0:3])
+        sp_level.append(moldr.util.orbital_restriction(spc_info, thy_info))
+        saved = sp_save_fs.leaf.file.energy.exists(sp_level[1:4])
+    elif tsk == 'hr_scan':
+        # every torsion has saved points, and none of its runs failed
+        scn_run_fs = autofile.fs.scan(cnf_run_fs.leaf.path(min_cnf_locs))
+        scn_save_fs = autofile.fs.scan(cnf_save_fs.leaf.path(min_cnf_locs))
+        if 'ts_' in spc:
+            tors_names = spc_dct_i['tors_names']
+        else:
+            tors_names = automol.geom.zmatrix_torsion_coordinate_names(
+                cnf_save_fs.leaf.file.geometry.read(min_cnf_locs))
+        saved = True
+        for tors_name in tors_names:
+            if not scn_save_fs.leaf.existing([[tors_name]]):
+                saved = False
+            for locs in scn_run_fs.leaf.existing([[tors_name]]):
+                run_fs = autofile.fs.run(scn_run_fs.leaf.path(locs))
+                job = elstruct.Job.OPTIMIZATION
+                if (run_fs.leaf.file.info.exists([job]) and
+                        run_fs.leaf.file.info.read([job]).status ==
+                        autofile.system.RunStatus.FAILURE):
+                    saved = False
+    return saved
+
+
+def _run_species_jobs(jobs, executor, board, build_graph=None, nodes=None):
+    """ run a graph of species task jobs, raising the first failure once the
+    other species are done
+
+    (tasks that ran are recorded in the build graph as they finish, if their
+    products were saved)
+
+    :returns: the job returns, by key
+    :rtype: dict
+    """
+    def _record(key, ran):
+        if build_graph is not None:
+            node, inp_hash, product_args = nodes[key]
+            if ran and task_products_saved(*product_args):
+                build_graph.record(node, inp_hash)
+            else:
+                build_graph.invalidate(node)
+
+    rets, errs = moldr.executor.run_graph(
+        jobs, executor=executor, board=board, on_done=_record)
+    for key in errs:
+        print('Task {} failed for species {}'.format(key[1], key[0]))
+    if errs:
+        if executor is not None:
+            executor.shutdown()
+        raise next(iter(errs.values()))
+    return rets
+
+
+def _node_label(spc, spc_dct_i):
+    """ build graph label for a species, or for a TS by its reaction
+    """
+    if 'ts_' in spc:
+        label = '{}={}_{}'.format(
+            '+'.join(spc_dct_i['rxn_ichs'][0]),
+            '+'.join(spc_dct_i['rxn_ichs'][1]), spc_dct_i['mul'])
+    else:
+        label = '{}_{}_{}'.format(
+            spc_dct_i['ich'], spc_dct_i['chg'], spc_dct_i['mul'])
+    return label
+
+
+def _node_inputs(spc, spc_dct_i):
+    """ the species (or TS) inputs to its build graph nodes
+    """
+    keys = ['ich', 'chg', 'mul', 'hind_inc']
+    if 'ts_' in spc:
+        keys += ['rxn_ichs', 'rxn_chgs', 'rxn_muls', 'class', 'tors_names']
+    return {key: spc_dct_i.get(key) for key in keys}
+
+
+def _task_label(tsk_idx, tsk_info):
+    """ status board label for a task
+    """
+    return '{:d}:{}'.format(tsk_idx+1, tsk_info[0])
+
+
+def _labeled(name, run_label):
+    """ a file or directory name, prefixed with the run label (if any)
+    """
+    return name if run_label is None else '{}_{}'.format(run_label, name)
 
 
 # def create_ts_spec(ts, ts_dct, spcs, charge=0, hind_inc=30.):
@@ -3,11 +3,13 @@
 import os
 import sys
 import collections
+import functools
 import json
 import numpy
 import chemkin_io
 import automol
 from automol import formula
+import autofile
 import moldr
 import thermodriver
 import ktpdriver
@@ -568,6 +570,20 @@ ES_DCT = {
 
 # The logic key in tsk_info_lst is for overwrite
 
+# Keep an index of the save filesystem, for the bulk conformer queries of the
+# partition function and zero-point energy steps
+if PARAMS.SAVE_INDEX:
+    autofile.system.index.attach(PARAMS.SAVE_PREFIX)
+
+# Record what has been built in the save filesystem, so that a rerun only
+# redoes what is missing or stale
+BUILD_GRAPH = None
+if PARAMS.BUILD_GRAPH:
+    if not os.path.exists(PARAMS.SAVE_PREFIX):
+        os.makedirs(PARAMS.SAVE_PREFIX)
+    BUILD_GRAPH = moldr.build.BuildGraph(
+        os.path.join(PARAMS.SAVE_PREFIX, moldr.build.GRAPH_FILE_NAME))
+
 if PARAMS.RUN_THERMO:
     SPC_QUEUE = list(SPC_NAMES)
     # thermodriver.driver.run(
@@ -576,10 +592,14 @@ if PARAMS.RUN_THERMO:
     thermodriver.driver.run(
         PARAMS.TSK_INFO_LST, ES_DCT, SPC_DCT, SPC_QUEUE, PARAMS.REF_MOLS,
         PARAMS.RUN_PREFIX, PARAMS.SAVE_PREFIX,
-        ene_coeff=PARAMS.ENE_COEFF, options=PARAMS.OPTIONS_THERMO)
+        ene_coeff=PARAMS.ENE_COEFF, options=PARAMS.OPTIONS_THERMO,
+        nslots=PARAMS.ES_NSLOTS, build_graph=BUILD_GRAPH)
 
 if PARAMS.RUN_RATES:
 
+    # The PESs to run, each with its own TSs, are collected first
+    PES_RUNS = []
+
     # print all the channels for all the PESs
     for pes_idx, PES in enumerate(PES_LST, start=1):
         print('PES test:', pes_idx, PES)
@@ -743,15 +763,82 @@ if PARAMS.RUN_RATES:
                     # import sys
                     # sys.exit()
                     print('RAD_RAD_TS test:', PARAMS.RAD_RAD_TS)
-                    ktpdriver.driver.run(
-                        PARAMS.TSK_INFO_LST, ES_DCT, SPC_DCT, RCT_NAMES_LST, PRD_NAMES_LST,
-                        PARAMS.RUN_PREFIX, PARAMS.SAVE_PREFIX,
-                        ene_coeff=PARAMS.ENE_COEFF,
-                        options=PARAMS.OPTIONS_RATE,
-                        etrans=etrans_lst,
-                        pst_params=PARAMS.PST_PARAMS,
-                        rad_rad_ts=PARAMS.RAD_RAD_TS)
-                        #'/lcrc/project/PACC/elliott/runhr', '/lcrc/project/PACC/elliott/savehr', options=OPTIONS)
+                    # (the species are shared, the TSs of other PESs left out)
+                    TS_NAMES = ['ts_{:g}'.format(idx) for idx in range(ts_idx)]
+                    PES_SPC_DCT = {
+                        name: SPC_DCT[name] for name in SPC_DCT
+                        if 'ts_' not in name or name in TS_NAMES}
+                    PES_RUNS.append((
+                        'PES{}_{}'.format(str(pes_idx), str(cidx+1)),
+                        PES_SPC_DCT, RCT_NAMES_LST, PRD_NAMES_LST, etrans_lst))
+
+    # Run the species of all the PESs once, before any of the PESs
+    PES_OPTIONS = list(PARAMS.OPTIONS_RATE)
+    if PARAMS.OPTIONS_RATE[0] and PARAMS.OPTIONS_RATE[1]:
+        PES_SPC_QUEUE = []
+        for _, _, RCT_NAMES_LST, PRD_NAMES_LST, _ in PES_RUNS:
+            for spc_names in list(RCT_NAMES_LST) + list(PRD_NAMES_LST):
+                PES_SPC_QUEUE.extend(spc_names)
+        PES_SPC_QUEUE = list(dict.fromkeys(PES_SPC_QUEUE))
+        print('running the {} species of {} PESs'.format(
+            len(PES_SPC_QUEUE), len(PES_RUNS)))
+        ktpdriver.driver.run_species(
+            PARAMS.TSK_INFO_LST, ES_DCT, SPC_DCT, PES_SPC_QUEUE,
+            PARAMS.RUN_PREFIX, PARAMS.SAVE_PREFIX,
+            pst_params=PARAMS.PST_PARAMS, rad_rad_ts=PARAMS.RAD_RAD_TS,
+            nslots=PARAMS.ES_NSLOTS, build_graph=BUILD_GRAPH)
+        PES_OPTIONS[1] = False
+
+    # Then the TS searches and MESS runs of the PESs
+    KTP_RUN = functools.partial(
+        ktpdriver.driver.run,
+        ene_coeff=PARAMS.ENE_COEFF,
+        options=PES_OPTIONS,
+        pst_params=PARAMS.PST_PARAMS,
+        rad_rad_ts=PARAMS.RAD_RAD_TS,
+        build_graph=BUILD_GRAPH)
+    if PARAMS.PES_NSLOTS > 1:
+        # each PES runs whole (with its MESS run and fits) in a worker process,
+        # on its share of the MESS core budget
+        PES_MESS_NCORES = max(1, min(
+            PARAMS.MESS_NCORES,
+            PARAMS.MESS_NCORES_TOT // min(PARAMS.PES_NSLOTS, len(PES_RUNS))))
+        PES_JOBS = {}
+        for PES_LABEL, PES_SPC_DCT, RCT_NAMES_LST, PRD_NAMES_LST, etrans_lst in PES_RUNS:
+            PES_JOBS[(PES_LABEL, 'ktp')] = (
+                functools.partial(
+                    ktpdriver.driver.run_pes, **KTP_RUN.keywords,
+                    etrans=etrans_lst, mess_ncores=PES_MESS_NCORES,
+                    run_label=PES_LABEL),
+                (PARAMS.TSK_INFO_LST, ES_DCT, PES_SPC_DCT, RCT_NAMES_LST,
+                 PRD_NAMES_LST, PARAMS.RUN_PREFIX, PARAMS.SAVE_PREFIX),
+                [])
+        with moldr.executor.JobExecutor(nslots=PARAMS.PES_NSLOTS) as PES_EXECUTOR:
+            _, PES_ERRS = moldr.executor.run_graph(
+                PES_JOBS, executor=PES_EXECUTOR,
+                board=moldr.executor.StatusBoard(
+                    os.path.join(PARAMS.RUN_PREFIX, 'pes_status.txt')))
+        for (PES_LABEL, _), PES_ERR in PES_ERRS.items():
+            print('ktp on {} failed: {}'.format(PES_LABEL, PES_ERR))
+        if PES_ERRS:
+            raise next(iter(PES_ERRS.values()))
+    else:
+        # MESS runs for the PESs share one core budget and are fit as they
+        # finish
+        MESS_EXECUTOR = moldr.executor.from_core_budget(
+            PARAMS.MESS_NCORES_TOT, ncores=PARAMS.MESS_NCORES)
+        PENDING_RATES = []
+        for PES_LABEL, PES_SPC_DCT, RCT_NAMES_LST, PRD_NAMES_LST, etrans_lst in PES_RUNS:
+            print('ktp on {}'.format(PES_LABEL))
+            PENDING_RATES.append(KTP_RUN(
+                PARAMS.TSK_INFO_LST, ES_DCT, PES_SPC_DCT, RCT_NAMES_LST,
+                PRD_NAMES_LST, PARAMS.RUN_PREFIX, PARAMS.SAVE_PREFIX,
+                etrans=etrans_lst, executor=MESS_EXECUTOR,
+                nslots=PARAMS.ES_NSLOTS))
+
+        ktpdriver.driver.fit_pending_rates(
+            PENDING_RATES, build_graph=BUILD_GRAPH)
+        MESS_EXECUTOR.shutdown()
 
 # f. Partition function parameters determined internally
 # TORS_MODEL can take values: 'RIGID', '1DHR', or 'TAU' and eventually 'MDHR'
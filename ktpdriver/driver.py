@@ -7,6 +7,7 @@ import automol.geom
 import chemkin_io
 import scripts.es
 import esdriver.driver
+import moldr
 import autofile.fs
 from datalibs import phycon
 from submission import substr
@@ -30,9 +31,18 @@ def run(tsk_info_lst, es_dct, spc_dct, rct_names_lst, prd_names_lst,
         options=[True, True, True, False],
         etrans=[200.0, 0.85, 15.0, 57.0, 200.0, 3.74, 5.5, 28.0],
         pst_params=[1.0, 6],
-        rad_rad_ts='vtst'):
+        rad_rad_ts='vtst', executor=None, nslots=1, build_graph=None,
+        run_label=None):
     """ main driver for generation of full set of rate constants on a single PES
+
+    With an executor (moldr.executor.JobExecutor), MESS is only submitted:
+    the return value is a pending fit, to be passed (with those of other
+    PESs) to `fit_pending_rates()`. The electronic structure tasks for the
+    species are spread over nslots worker processes. With a build graph
+    (moldr.build.BuildGraph), the tasks and the MESS run that are current are
+    not redone. A run label is passed on to `esdriver.driver.run()`.
     """
+    ret = None
 
     # Prepare prefix filesystem
     if not os.path.exists(save_prefix):
@@ -42,7 +52,7 @@ def run(tsk_info_lst, es_dct, spc_dct, rct_names_lst, prd_names_lst,
 
     # Determine options
     runes = options[0]  # run electronic structure theory (True/False)
-    # runspcfirst = options[1]
+    runspcfirst = options[1]  # run it for the species here (or already done)
     runmess = options[2]  # run mess (True) / only make mess input file (False)
     runrates = options[3]
     if not runmess:
@@ -58,26 +68,16 @@ def run(tsk_info_lst, es_dct, spc_dct, rct_names_lst, prd_names_lst,
             if spc not in spc_queue:
                 spc_queue.append(spc)
 
-    spc_tsk_lst = []
-    ts_tsk_lst = []
-    ts_tsk = False
-    for tsk in tsk_info_lst:
-        if 'find_ts' in tsk[0]:
-            ts_tsk = True
-        if ts_tsk:
-            ts_tsk_lst.append(tsk)
-        else:
-            spc_tsk_lst.append(tsk)
+    _, ts_tsk_lst = split_tasks(tsk_info_lst)
 
-    if runes:
-        runspecies = [{'species': spc_queue, 'reacs': [], 'prods': []}]
+    if runes and runspcfirst:
         # spc_tsk_info = [['find_geom', tsk_info_lst[0][1],
         #                  tsk_info_lst[0][2], tsk_info_lst[0][3]]]
-        esdriver.driver.run(
-            spc_tsk_lst, es_dct, runspecies, spc_dct,
-            run_prefix, save_prefix, vdw_params,
-            pst_params=pst_params,
-            rad_rad_ts=rad_rad_ts)
+        run_species(
+            tsk_info_lst, es_dct, spc_dct, spc_queue, run_prefix, save_prefix,
+            vdw_params=vdw_params, pst_params=pst_params,
+            rad_rad_ts=rad_rad_ts, nslots=nslots, build_graph=build_graph,
+            run_label=run_label)
 
     # Form the reaction list
     rxn_lst = []
@@ -151,7 +151,8 @@ def run(tsk_info_lst, es_dct, spc_dct, rct_names_lst, prd_names_lst,
         #Run ESDriver
         if runes:
             ts_found = esdriver.driver.run(
-                ts_tsk_lst, es_dct, rxn_lst, spc_dct, run_prefix, save_prefix, vdw_params, rad_rad_ts=rad_rad_ts)
+                ts_tsk_lst, es_dct, rxn_lst, spc_dct, run_prefix, save_prefix, vdw_params, rad_rad_ts=rad_rad_ts,
+                nslots=nslots, build_graph=build_graph, run_label=run_label)
             # print('ts_found test:', ts_found)
 
     if runrates:
@@ -341,7 +342,8 @@ def run(tsk_info_lst, es_dct, spc_dct, rct_names_lst, prd_names_lst,
         # run mess to produce rate output
         mess_path = scripts.ktp.run_rates(
             header_str, energy_trans_str, well_str, bim_str, ts_str,
-            spc_dct[tsname_0], geo_thy_info_ref, spc_dct[tsname_0]['rxn_fs'][3])
+            spc_dct[tsname_0], geo_thy_info_ref, spc_dct[tsname_0]['rxn_fs'][3],
+            executor=executor, build_graph=build_graph)
 
         # run_fits = True
         # if run_fits:
@@ -351,121 +353,214 @@ def run(tsk_info_lst, es_dct, spc_dct, rct_names_lst, prd_names_lst,
         chemkin_header_str = ''
         chemkin_header_str = scripts.thermo.run_ckin_header(pf_levels, ref_levels, ts_model)
         chemkin_header_str += '\n'
-        chemkin_poly_str = chemkin_header_str
-        starting_path = os.getcwd()
-        ckin_path = ''.join([starting_path, '/ckin'])
-        if not os.path.exists(ckin_path):
-            os.mkdir(ckin_path)
-        pes_formula_str = automol.formula._formula.string(pes_formula)
-        labels = idx_dct.values()
-        names = idx_dct.keys()
-        err_thresh = 15.
-        a_conv_factor = 1.
-        for lab_i, name_i in zip(labels, names):
-            if 'W' not in lab_i:
-                a_conv_factor = 6.0221e23
+        fit_args = (idx_dct, spc_dct, pes_formula, chemkin_header_str)
+        if executor is None:
+            if build_graph is not None and os.path.exists(
+                    os.path.join(mess_path, 'rate.out')):
+                scripts.ktp.record_rates(mess_path, build_graph)
+            fit_rates(mess_path, *fit_args)
+        else:
+            ret = (mess_path, fit_args)
+
+    return ret
+
+
+def split_tasks(tsk_info_lst):
+    """ split the task list into the species tasks and the TS tasks (from
+    the first find_ts on)
+    """
+    spc_tsk_lst = []
+    ts_tsk_lst = []
+    ts_tsk = False
+    for tsk in tsk_info_lst:
+        if 'find_ts' in tsk[0]:
+            ts_tsk = True
+        if ts_tsk:
+            ts_tsk_lst.append(tsk)
+        else:
+            spc_tsk_lst.append(tsk)
+    return spc_tsk_lst, ts_tsk_lst
+
+
+def run_species(tsk_info_lst, es_dct, spc_dct, spc_queue, run_prefix,
+                save_prefix, vdw_params=[False, False, True],
+                pst_params=[1.0, 6], rad_rad_ts='vtst', nslots=1,
+                build_graph=None, run_label=None):
+    """ run the species tasks for a set of species
+
+    (this is the first stage of `run()`; the species shared by several PESs
+    can instead be run once, for all of them, and `run()` told to skip it)
+    """
+    spc_tsk_lst, _ = split_tasks(tsk_info_lst)
+    runspecies = [{'species': spc_queue, 'reacs': [], 'prods': []}]
+    esdriver.driver.run(
+        spc_tsk_lst, es_dct, runspecies, spc_dct,
+        run_prefix, save_prefix, vdw_params,
+        pst_params=pst_params,
+        rad_rad_ts=rad_rad_ts, nslots=nslots, build_graph=build_graph,
+        run_label=run_label)
+
+
+def run_pes(*args, mess_ncores=1, **kwargs):
+    """ `run()` for one PES, with MESS on a job slot of its own and the rates
+    fit once it finishes
+
+    (for PESs running side by side in worker processes, which cannot share one
+    MESS executor; `mess_ncores` is this PES's share of the MESS cores)
+    """
+    with moldr.executor.JobExecutor(ncores=mess_ncores) as executor:
+        pending = run(*args, executor=executor, **kwargs)
+        fit_pending_rates(
+            [pending], build_graph=kwargs.get('build_graph'))
+
+
+def fit_rates(mess_path, idx_dct, spc_dct, pes_formula, chemkin_header_str):
+    """ fit the rate constants of every channel of a PES from its MESS output
+    and print them in ChemKin format
+
+    The Arrhenius fits of all the channels are done together.
+    """
+    chemkin_poly_str = chemkin_header_str
+    starting_path = os.getcwd()
+    ckin_path = ''.join([starting_path, '/ckin'])
+    if not os.path.exists(ckin_path):
+        os.mkdir(ckin_path)
+    pes_formula_str = automol.formula._formula.string(pes_formula)
+    labels = idx_dct.values()
+    names = idx_dct.keys()
+    err_thresh = 15.
+    a_conv_factor = 1.
+
+    # Read the rate constants of each channel out of the mess outputs
+    chn_lst = []
+    for lab_i, name_i in zip(labels, names):
+        if 'W' not in lab_i:
+            a_conv_factor = 6.0221e23
+        else:
+            a_conv_factor = 1.
+        if 'F' not in lab_i:
+            for lab_j, name_j in zip(labels, names):
+                if 'F' not in lab_j:
+                    ene = 0.
+                    if lab_i != lab_j:
+                        for spc in name_i.split('+'):
+                            ene += scripts.thermo.spc_energy(
+                                spc_dct[spc]['ene'], spc_dct[spc]['zpe'])
+                        for spc in name_j.split('+'):
+                            ene -= scripts.thermo.spc_energy(
+                                spc_dct[spc]['ene'], spc_dct[spc]['zpe'])
+                        if ene:
+                        #if ene > 0.:
+                            ktp_dct = scripts.ktp.read_rates(
+                                lab_i, lab_j, mess_path, ASSESS_PDEP_TEMPS, pdep_low=PLOW, pdep_high=PHIGH,
+                                pdep_tolerance=20, no_pdep_pval=1.0, bimol=numpy.isclose(a_conv_factor, 6.0221e23))
+                            if ktp_dct:
+                                chn_lst.append((name_i, name_j, ktp_dct, a_conv_factor))
+    ktp_dcts = [chn[2] for chn in chn_lst]
+    a_conv_factors = [chn[3] for chn in chn_lst]
+
+    # Fit rate constants to single Arrhenius expressions, and assess the errors
+    sing_fits = scripts.ktp.mod_arr_fits(
+        ktp_dcts, fit_type='single', t_ref=1.0, a_conv_factors=a_conv_factors)
+    sing_fit_err_dcts = scripts.ktp.assess_arr_fit_errs(
+        [fit[0] for fit in sing_fits], ktp_dcts, fit_type='single',
+        t_ref=1.0, a_conv_factors=a_conv_factors)
+
+    # Assess single fitting errors: are they within the threshold at each
+    # pressure (a pressure whose fit failed has nan errors, and is not), and
+    # if not, is a double Arrhenius fit possible
+    sgl_fit_goods = [
+        all(vals[1] < err_thresh for vals in sing_fit_err_dct.values())
+        for sing_fit_err_dct in sing_fit_err_dcts]
+    dbl_fit_posss = [
+        all(len(ktp_dct[p][0]) >= 6 for p in ktp_dct) for ktp_dct in ktp_dcts]
+
+    # Fit rate constants to double Arrhenius expressions where needed
+    dbl_idxs = [idx for idx, (sgl_fit_good, dbl_fit_poss)
+                in enumerate(zip(sgl_fit_goods, dbl_fit_posss))
+                if not sgl_fit_good and dbl_fit_poss]
+    doub_fits = scripts.ktp.mod_arr_fits(
+        [ktp_dcts[idx] for idx in dbl_idxs], fit_type='double', t_ref=1.0,
+        a_conv_factors=[a_conv_factors[idx] for idx in dbl_idxs])
+    doub_fit_err_dcts = scripts.ktp.assess_arr_fit_errs(
+        [fit[0] if fit[2] else {} for fit in doub_fits],
+        [ktp_dcts[idx] for idx in dbl_idxs], fit_type='double', t_ref=1.0,
+        a_conv_factors=[a_conv_factors[idx] for idx in dbl_idxs])
+    doub_fit_dct = dict(zip(dbl_idxs, zip(doub_fits, doub_fit_err_dcts)))
+
+    for idx, (name_i, name_j, ktp_dct, _) in enumerate(chn_lst):
+        reaction = name_i + '=' + name_j
+        sing_params_dct, sing_fit_temp_dct, sing_fit_success = sing_fits[idx]
+        sing_fit_err_dct = sing_fit_err_dcts[idx]
+        sgl_fit_good = sgl_fit_goods[idx]
+        dbl_fit_poss = dbl_fit_posss[idx]
+        if sing_fit_success:
+            print('\nSuccessful fit to Single Arrhenius at all T, P')
+        print('\nFitting Parameters and Errors from Single Fit')
+        for pressure, params in sing_params_dct.items():
+            print(pressure, params)
+        for pressure, errs in sing_fit_err_dct.items():
+            print(pressure, errs)
+
+        # Write chemkin string for single or double fit
+        chemkin_str = ''
+        if sgl_fit_good:
+            print('\nSingle fit errors acceptable: Using single fits')
+            chemkin_str += chemkin_io.writer.reaction.plog(
+                reaction, sing_params_dct,
+                err_dct=sing_fit_err_dct, temp_dct=sing_fit_temp_dct)
+        elif not sgl_fit_good and dbl_fit_poss:
+            print('\nSingle fit errs too large & double fit possible:',
+                  ' Trying double fit')
+            ((doub_params_dct, doub_fit_temp_dct, doub_fit_success),
+             doub_fit_err_dct) = doub_fit_dct[idx]
+            if doub_fit_success:
+                print('\nSuccessful fit to Double Arrhenius at all T, P')
+                chemkin_str += chemkin_io.writer.reaction.plog(
+                    reaction, doub_params_dct,
+                    err_dct=doub_fit_err_dct, temp_dct=doub_fit_temp_dct)
             else:
-                a_conv_factor = 1.
-            if 'F' not in lab_i:
-                for lab_j, name_j in zip(labels, names):
-                    if 'F' not in lab_j:
-                        ene = 0.
-                        if lab_i != lab_j:
-                            for spc in name_i.split('+'):
-                                ene += scripts.thermo.spc_energy(
-                                    spc_dct[spc]['ene'], spc_dct[spc]['zpe'])
-                            for spc in name_j.split('+'):
-                                ene -= scripts.thermo.spc_energy(
-                                    spc_dct[spc]['ene'], spc_dct[spc]['zpe'])
-                            if ene:
-                            #if ene > 0.:
-                                reaction = name_i + '=' + name_j
-
-                                # Read the rate constants out of the mess outputs
-                                ktp_dct = scripts.ktp.read_rates(
-                                    lab_i, lab_j, mess_path, ASSESS_PDEP_TEMPS, pdep_low=PLOW, pdep_high=PHIGH,
-                                    pdep_tolerance=20, no_pdep_pval=1.0, bimol=numpy.isclose(a_conv_factor, 6.0221e23))
-
-                                if ktp_dct:
-
-                                    # Fit rate constants to single Arrhenius expressions
-                                    sing_params_dct, sing_fit_temp_dct, sing_fit_success = scripts.ktp.mod_arr_fit(
-                                        ktp_dct, mess_path, fit_type='single', fit_method='python',
-                                        t_ref=1.0, a_conv_factor=a_conv_factor)
-                                    if sing_fit_success:
-                                        print('\nSuccessful fit to Single Arrhenius at all T, P')
-
-                                    # Assess the errors of the single Arrhenius Fit
-                                    sing_fit_err_dct = scripts.ktp.assess_arr_fit_err(
-                                        sing_params_dct, ktp_dct, fit_type='single',
-                                        t_ref=1.0, a_conv_factor=a_conv_factor)
-                                    print('\nFitting Parameters and Errors from Single Fit')
-                                    for pressure, params in sing_params_dct.items():
-                                        print(pressure, params)
-                                    for pressure, errs in sing_fit_err_dct.items():
-                                        print(pressure, errs)
-
-                                    # Assess single fitting errors:
-                                    # are they within the threshold at each pressure
-                                    sgl_fit_good = max((
-                                        vals[1] for vals in sing_fit_err_dct.values())) < err_thresh
-
-                                    # Assess if a double Arrhenius fit is possible
-                                    dbl_fit_poss = all(len(ktp_dct[p][0]) >= 6 for p in ktp_dct)
-
-                                    # Write chemkin string for single, or perform dbl fit
-                                    # and write string
-                                    chemkin_str = ''
-                                    if sgl_fit_good:
-                                        print('\nSingle fit errors acceptable: Using single fits')
-                                        chemkin_str += chemkin_io.writer.reaction.plog(
-                                            reaction, sing_params_dct,
-                                            err_dct=sing_fit_err_dct, temp_dct=sing_fit_temp_dct)
-                                    elif not sgl_fit_good and dbl_fit_poss:
-                                        print('\nSingle fit errs too large & double fit possible:',
-                                              ' Trying double fit')
-
-                                        # Fit rate constants to double Arrhenius expressions
-                                        doub_params_dct, doub_fit_temp_dct, doub_fit_success = scripts.ktp.mod_arr_fit(
-                                            ktp_dct, mess_path, fit_type='double',
-                                            fit_method='dsarrfit', t_ref=1.0,
-                                            a_conv_factor=a_conv_factor)
-
-                                        if doub_fit_success:
-                                            print('\nSuccessful fit to Double Arrhenius at all T, P')
-                                            # Assess the errors of the single Arrhenius Fit
-                                            doub_fit_err_dct = scripts.ktp.assess_arr_fit_err(
-                                                doub_params_dct, ktp_dct, fit_type='double',
-                                                t_ref=1.0, a_conv_factor=a_conv_factor)
-                                            chemkin_str += chemkin_io.writer.reaction.plog(
-                                                reaction, doub_params_dct,
-                                                err_dct=doub_fit_err_dct, temp_dct=doub_fit_temp_dct)
-                                        else:
-                                            print('\nDouble Arrhenius Fit failed for some reason:',
-                                                  ' Using Single fits')
-                                            chemkin_str += chemkin_io.writer.reaction.plog(
-                                                reaction, sing_params_dct,
-                                                err_dct=sing_fit_err_dct, temp_dct=sing_fit_temp_dct)
-                                    elif not sgl_fit_good and not dbl_fit_poss:
-                                        print('\nNot enough temperatures for a double fit:',
-                                              ' Using single fits')
-                                        chemkin_str += chemkin_io.writer.reaction.plog(
-                                            reaction, sing_params_dct,
-                                            err_dct=sing_fit_err_dct, temp_dct=sing_fit_temp_dct)
-
-                                    chemkin_poly_str += '\n'
-                                    chemkin_poly_str += chemkin_str
-                                    chemkin_str = chemkin_header_str + chemkin_str
-                                    print(chemkin_str)
-                                    # print the results for each channel to a file
-                                    pes_chn_lab = str(pes_formula_str + '_' + name_i + '_' + name_j)
-                                    with open(os.path.join(ckin_path, pes_chn_lab+'.ckin'), 'w') as f:
-                                        f.write(chemkin_str)
-        # print the results for the whole PES to a file
-        with open(os.path.join(ckin_path, pes_formula_str+'.ckin'), 'a') as f:
-            f.write(chemkin_poly_str)
-        #with open(starting_path+'/rates.ckin', 'w') as f:
-            #f.write(chemkin_str)
+                print('\nDouble Arrhenius Fit failed for some reason:',
+                      ' Using Single fits')
+                chemkin_str += chemkin_io.writer.reaction.plog(
+                    reaction, sing_params_dct,
+                    err_dct=sing_fit_err_dct, temp_dct=sing_fit_temp_dct)
+        elif not sgl_fit_good and not dbl_fit_poss:
+            print('\nNot enough temperatures for a double fit:',
+                  ' Using single fits')
+            chemkin_str += chemkin_io.writer.reaction.plog(
+                reaction, sing_params_dct,
+                err_dct=sing_fit_err_dct, temp_dct=sing_fit_temp_dct)
+
+        chemkin_poly_str += '\n'
+        chemkin_poly_str += chemkin_str
+        chemkin_str = chemkin_header_str + chemkin_str
+        print(chemkin_str)
+        # print the results for each channel to a file
+        pes_chn_lab = str(pes_formula_str + '_' + name_i + '_' + name_j)
+        with open(os.path.join(ckin_path, pes_chn_lab+'.ckin'), 'w') as f:
+            f.write(chemkin_str)
+    # print the results for the whole PES to a file
+    with open(os.path.join(ckin_path, pes_formula_str+'.ckin'), 'a') as f:
+        f.write(chemkin_poly_str)
+    #with open(starting_path+'/rates.ckin', 'w') as f:
+        #f.write(chemkin_str)
+
+
+def fit_pending_rates(pending_lst, poll_interval=30., build_graph=None):
+    """ fit the rates of PESs whose MESS runs were submitted by `run()`, in
+    order of completion
+
+    :param pending_lst: the return values of `run()` with an executor
+    :param build_graph: a build graph to record the finished MESS runs in
+    """
+    fit_args_dct = dict(
+        pending for pending in pending_lst if pending is not None)
+    for mess_path, fit_args in scripts.ktp.wait_for_rates(
+            fit_args_dct, poll_interval=poll_interval):
+        if build_graph is not None:
+            scripts.ktp.record_rates(mess_path, build_graph)
+        fit_rates(mess_path, *fit_args)
 
 
 def get_thy_info(es_dct, key):
@@ -1,9 +1,13 @@
 """ moldr modules
 """
+from moldr import build
 from moldr import driver
+from moldr import executor
 from moldr import conformer
 from moldr import geom
+from moldr import hindrot
 from moldr import pf
+from moldr import rrho
 from moldr import scan
 from moldr import sp
 from moldr import tau
@@ -13,10 +17,14 @@ from moldr import runner
 from moldr import util
 
 __all__ = [
+    'build',
     'driver',
+    'executor',
     'pf',
+    'rrho',
     'conformer',
     'geom',
+    'hindrot',
     'pf',
     'scan',
     'sp',
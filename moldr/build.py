@@ -0,0 +1,90 @@
+""" a persistent record of what a run has built, for restarts
+
+Each product of a run (an electronic structure task for a species at a
+theory level, a species partition function, the MESS rates of a PES) is a
+node, recorded once it is complete together with a hash of the inputs it
+was made from. The hash of a node also covers the hashes of the nodes it
+depends on, so a change upstream makes everything downstream stale. On a
+rerun, only the nodes that are missing or stale need to be rebuilt.
+"""
+import os
+import json
+import fcntl
+import hashlib
+
+GRAPH_FILE_NAME = 'build_graph.json'
+
+
+class BuildGraph():
+    """ the complete nodes of a run and their input hashes, kept in a file
+
+    Nodes are named by tuples, e.g. (species, theory level, task). Several
+    processes can share the file: each update replaces the nodes with those
+    in the file under a lock before applying its change, so none of them
+    drops the records of the others or brings back a node they invalidated.
+    """
+
+    def __init__(self, path):
+        """
+        :param path: the record file (read if it exists)
+        :type path: str
+        """
+        self.path = path
+        self.nodes = {}
+        self._reread()
+
+    def is_current(self, node, inp_hash):
+        """ has this node been built from these inputs?
+        """
+        return self.nodes.get(node_name(node)) == inp_hash
+
+    def record(self, node, inp_hash):
+        """ record a node as complete and rewrite the file
+        """
+        with open(self.path + '.lock', 'w') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            self._reread()
+            self.nodes[node_name(node)] = inp_hash
+            self.write()
+
+    def invalidate(self, node):
+        """ forget a node, so that it is rebuilt
+        """
+        with open(self.path + '.lock', 'w') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            self._reread()
+            if self.nodes.pop(node_name(node), None) is not None:
+                self.write()
+
+    def write(self):
+        """ write the record (replacing the file in one step)
+        """
+        tmp_path = '{}.{:d}.tmp'.format(self.path, os.getpid())
+        with open(tmp_path, 'w') as graph_file:
+            json.dump(self.nodes, graph_file, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+    def _reread(self):
+        self.nodes = {}
+        if os.path.exists(self.path):
+            with open(self.path, 'r') as graph_file:
+                self.nodes = json.load(graph_file)
+
+
+def input_hash(inputs, dep_hashes=()):
+    """ a hash of the inputs of a node and of the nodes it depends on
+
+    :param inputs: the inputs, as a JSON-serializable value (anything else
+        is written by its repr)
+    :param dep_hashes: the input hashes of the nodes it depends on
+    :rtype: str
+    """
+    inp_str = json.dumps([inputs, list(dep_hashes)], sort_keys=True,
+                         default=repr)
+    return hashlib.sha256(inp_str.encode()).hexdigest()
+
+
+def node_name(node):
+    """ the record key of a node
+    """
+    return '|'.join(map(str, node))
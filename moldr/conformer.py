@@ -1,6 +1,7 @@
 """ drivers for conformer
 """
 
+import os
 import numpy
 from datalibs import phycon
 import automol
@@ -12,7 +13,8 @@ import moldr
 def conformer_sampling(
         spc_info, thy_level, thy_save_fs, cnf_run_fs, cnf_save_fs, script_str,
         overwrite, saddle=False, nsamp_par=(False, 3, 3, 1, 50, 50),
-        tors_names='', dist_info=[], two_stage=False, rxn_class='', **kwargs):
+        tors_names='', dist_info=[], two_stage=False, rxn_class='',
+        executor=None, **kwargs):
     """ Find the minimum energy conformer by optimizing from nsamp random
     initial torsional states
     """
@@ -60,6 +62,7 @@ def conformer_sampling(
         overwrite=overwrite,
         saddle=saddle,
         two_stage=two_stage,
+        executor=executor,
         **kwargs,
     )
     save_conformers(
@@ -90,8 +93,13 @@ def conformer_sampling(
 def run_conformers(
         zma, spc_info, thy_level, nsamp, tors_range_dct,
         cnf_run_fs, cnf_save_fs, script_str, overwrite, saddle, two_stage,
-        **kwargs):
+        executor=None, **kwargs):
     """ run sampling algorithm to find conformers
+
+    With an executor (moldr.executor.JobExecutor), all remaining samples are
+    generated up front and optimized concurrently; the sample counter in the
+    trunk info files is committed by this process as each job finishes, so an
+    interrupted search restarts from the number of completed samples.
     """
     if not tors_range_dct:
         print("No torsional coordinates. Setting nsamp to 1.")
@@ -107,17 +115,58 @@ def run_conformers(
         print(vma)
         assert vma == existing_vma
     cnf_save_fs.trunk.file.vmatrix.write(vma)
-    idx = 0
     nsamp0 = nsamp
     inf_obj = autofile.system.info.conformer_trunk(0, tors_range_dct)
-    if cnf_save_fs.trunk.file.info.exists():
-        inf_obj_s = cnf_save_fs.trunk.file.info.read()
-        nsampd = inf_obj_s.nsamp
-    elif cnf_run_fs.trunk.file.info.exists():
-        inf_obj_r = cnf_run_fs.trunk.file.info.read()
-        nsampd = inf_obj_r.nsamp
-    else:
-        nsampd = 0
+    nsampd = _read_nsampd(cnf_run_fs, cnf_save_fs)
+
+    tors_names = list(tors_range_dct.keys())
+    opt_kwargs = dict(
+        spc_info=spc_info, thy_level=thy_level, script_str=script_str,
+        overwrite=overwrite, saddle=saddle, two_stage=two_stage,
+        tors_names=tors_names, **kwargs)
+
+    if executor is not None:
+        nsamp = nsamp0 - nsampd
+        if nsamp <= 0:
+            print('Reached requested number of samples. '
+                  'Conformer search complete.')
+            return
+
+        print("    New nsamp requested is {:d}.".format(nsamp))
+        if nsampd > 0:
+            samp_zmas = automol.zmatrix.samples(zma, nsamp, tors_range_dct)
+        else:
+            samp_zmas = ((zma,) +
+                         tuple(automol.zmatrix.samples(
+                             zma, nsamp-1, tors_range_dct)))
+
+        futs = []
+        for samp_zma in samp_zmas:
+            cid = autofile.system.generate_new_conformer_id()
+            locs = [cid]
+            cnf_run_fs.leaf.create(locs)
+            cnf_run_path = cnf_run_fs.leaf.path(locs)
+            print("Submitting conformer run at {}".format(cnf_run_path))
+            futs.append(executor.submit(
+                _optimize_conformer, samp_zma, cnf_run_path, **opt_kwargs))
+
+        errs = []
+        for fut in moldr.executor.as_completed(futs):
+            try:
+                fut.result()
+            except Exception as err:
+                # let the other jobs finish and count them first
+                print('Conformer run failed: {}'.format(err))
+                errs.append(err)
+                continue
+            nsampd = _read_nsampd(cnf_run_fs, cnf_save_fs) + 1
+            print("Run {}/{} complete".format(nsampd, nsamp0))
+            inf_obj.nsamp = nsampd
+            cnf_save_fs.trunk.file.info.write(inf_obj)
+            cnf_run_fs.trunk.file.info.write(inf_obj)
+        if errs:
+            raise errs[0]
+        return
 
     while True:
         nsamp = nsamp0 - nsampd
@@ -140,271 +189,336 @@ def run_conformers(
 
             cnf_run_fs.leaf.create(locs)
             cnf_run_path = cnf_run_fs.leaf.path(locs)
-            run_fs = autofile.fs.run(cnf_run_path)
 
-            idx += 1
             print("Run {}/{}".format(nsampd+1, nsamp0))
-            tors_names = list(tors_range_dct.keys())
-            if two_stage and len(tors_names) > 0:
-                print('Stage one beginning, holding the coordinates constant', tors_names, samp_zma)
-                moldr.driver.run_job(
-                    job=elstruct.Job.OPTIMIZATION,
-                    script_str=script_str,
-                    run_fs=run_fs,
-                    geom=samp_zma,
-                    spc_info=spc_info,
-                    thy_level=thy_level,
-                    overwrite=overwrite,
-                    frozen_coordinates=[tors_names],
-                    saddle=saddle,
-                    **kwargs
-                )
-                print('Stage one success, reading for stage 2')
-                ret = moldr.driver.read_job(job=elstruct.Job.OPTIMIZATION, run_fs=run_fs)
-                if ret:
-                    sinf_obj, inp_str, out_str = ret
-                    prog = sinf_obj.prog
-                    samp_zma = elstruct.reader.opt_zmatrix(prog, out_str)
-                    print('Stage one success beginning stage two on', samp_zma)
-                    moldr.driver.run_job(
-                        job=elstruct.Job.OPTIMIZATION,
-                        script_str=script_str,
-                        run_fs=run_fs,
-                        geom=samp_zma,
-                        spc_info=spc_info,
-                        thy_level=thy_level,
-                        overwrite=overwrite,
-                        saddle=saddle,
-                        **kwargs
-                    )
-            else:
-                moldr.driver.run_job(
-                    job=elstruct.Job.OPTIMIZATION,
-                    script_str=script_str,
-                    run_fs=run_fs,
-                    geom=samp_zma,
-                    spc_info=spc_info,
-                    thy_level=thy_level,
-                    overwrite=overwrite,
-                    saddle=saddle,
-                    **kwargs
-                )
-            #moldr.driver.run_job(
-            #    job=elstruct.Job.OPTIMIZATION,
-            #    script_str=script_str,
-            #    run_fs=run_fs,
-            #    geom=samp_zma,
-            #    spc_info=spc_info,
-            #    thy_level=thy_level,
-            #    overwrite=overwrite,
-            #    **kwargs
-            #)
-
-            if cnf_save_fs.trunk.file.info.exists():
-                inf_obj_s = cnf_save_fs.trunk.file.info.read()
-                nsampd = inf_obj_s.nsamp
-            elif cnf_run_fs.trunk.file.info.exists():
-                inf_obj_r = cnf_run_fs.trunk.file.info.read()
-                nsampd = inf_obj_r.nsamp
+            _optimize_conformer(samp_zma, cnf_run_path, **opt_kwargs)
+
+            nsampd = _read_nsampd(cnf_run_fs, cnf_save_fs)
             nsampd += 1
             inf_obj.nsamp = nsampd
             cnf_save_fs.trunk.file.info.write(inf_obj)
             cnf_run_fs.trunk.file.info.write(inf_obj)
 
 
+def _read_nsampd(cnf_run_fs, cnf_save_fs):
+    """ read the number of samples completed so far from the trunk info
+    """
+    if cnf_save_fs.trunk.file.info.exists():
+        inf_obj_s = cnf_save_fs.trunk.file.info.read()
+        nsampd = inf_obj_s.nsamp
+    elif cnf_run_fs.trunk.file.info.exists():
+        inf_obj_r = cnf_run_fs.trunk.file.info.read()
+        nsampd = inf_obj_r.nsamp
+    else:
+        nsampd = 0
+    return nsampd
+
+
+def _optimize_conformer(
+        samp_zma, cnf_run_path, spc_info, thy_level, script_str, overwrite,
+        saddle, two_stage, tors_names, **kwargs):
+    """ optimize one conformer sample in its run directory
+
+    (takes the run path rather than a filesystem object so that it can be
+    sent to a worker process)
+    """
+    run_fs = autofile.fs.run(cnf_run_path)
+    if two_stage and len(tors_names) > 0:
+        print('Stage one beginning, holding the coordinates constant', tors_names, samp_zma)
+        moldr.driver.run_job(
+            job=elstruct.Job.OPTIMIZATION,
+            script_str=script_str,
+            run_fs=run_fs,
+            geom=samp_zma,
+            spc_info=spc_info,
+            thy_level=thy_level,
+            overwrite=overwrite,
+            frozen_coordinates=[tors_names],
+            saddle=saddle,
+            **kwargs
+        )
+        print('Stage one success, reading for stage 2')
+        ret = moldr.driver.read_job(job=elstruct.Job.OPTIMIZATION, run_fs=run_fs)
+        if ret:
+            sinf_obj, inp_str, out_str = ret
+            prog = sinf_obj.prog
+            samp_zma = elstruct.reader.opt_zmatrix(prog, out_str)
+            print('Stage one success beginning stage two on', samp_zma)
+            moldr.driver.run_job(
+                job=elstruct.Job.OPTIMIZATION,
+                script_str=script_str,
+                run_fs=run_fs,
+                geom=samp_zma,
+                spc_info=spc_info,
+                thy_level=thy_level,
+                overwrite=overwrite,
+                saddle=saddle,
+                **kwargs
+            )
+    else:
+        moldr.driver.run_job(
+            job=elstruct.Job.OPTIMIZATION,
+            script_str=script_str,
+            run_fs=run_fs,
+            geom=samp_zma,
+            spc_info=spc_info,
+            thy_level=thy_level,
+            overwrite=overwrite,
+            saddle=saddle,
+            **kwargs
+        )
+
+
 def save_conformers(cnf_run_fs, cnf_save_fs, saddle=False, dist_info=[], rxn_class=''):
     """ save the conformers that have been found so far
+
+    Run directories processed by a previous call are recorded in a manifest
+    in the save trunk, so only new runs, or runs whose information file has
+    been rewritten since, are read here.
     """
 
+    if not cnf_run_fs.trunk.exists():
+        print("No conformers to save. Skipping...")
+        return
+
+    runs, new_locs_lst = _unprocessed_conformer_runs(cnf_run_fs, cnf_save_fs)
+    if not new_locs_lst:
+        print("No new conformer runs to save. Skipping...")
+        return
+
     locs_lst = cnf_save_fs.leaf.existing()
     seen_geos = [cnf_save_fs.leaf.file.geometry.read(locs)
                  for locs in locs_lst]
     seen_enes = [cnf_save_fs.leaf.file.energy.read(locs)
                  for locs in locs_lst]
-
-    if not cnf_run_fs.trunk.exists():
-        print("No conformers to save. Skipping...")
-    else:
-        #for loc_idx, locs in enumerate(cnf_run_fs.leaf.existing()):
-        for locs in cnf_run_fs.leaf.existing():
-            cnf_run_path = cnf_run_fs.leaf.path(locs)
-            run_fs = autofile.fs.run(cnf_run_path)
-            print("Reading from conformer run at {}".format(cnf_run_path))
-
-            ret = moldr.driver.read_job(job=elstruct.Job.OPTIMIZATION, run_fs=run_fs)
-            if ret:
-                inf_obj, inp_str, out_str = ret
-                prog = inf_obj.prog
-                method = inf_obj.method
-                ene = elstruct.reader.energy(prog, method, out_str)
-                geo = elstruct.reader.opt_geometry(prog, out_str)
-                #print('geo in conformer: \n', automol.geom.string(geo))
-                #if saddle:
-                    #gra = automol.geom.weakly_connected_graph(geo)
-                #else:
-                if not saddle:
-                    gra = automol.geom.graph(geo)
-                    conns = automol.graph.connected_components(gra)
-                    lconns = len(conns)
+    seen_idx = ConformerIndex(seen_geos, seen_enes)
+
+    for locs in new_locs_lst:
+        cnf_run_path = cnf_run_fs.leaf.path(locs)
+        run_fs = autofile.fs.run(cnf_run_path)
+        print("Reading from conformer run at {}".format(cnf_run_path))
+
+        ret = moldr.driver.read_job(job=elstruct.Job.OPTIMIZATION, run_fs=run_fs)
+        if ret:
+            inf_obj, inp_str, out_str = ret
+            prog = inf_obj.prog
+            method = inf_obj.method
+            ene = elstruct.reader.energy(prog, method, out_str)
+            geo = elstruct.reader.opt_geometry(prog, out_str)
+            #print('geo in conformer: \n', automol.geom.string(geo))
+            #if saddle:
+                #gra = automol.geom.weakly_connected_graph(geo)
+            #else:
+            if not saddle:
+                gra = automol.geom.graph(geo)
+                conns = automol.graph.connected_components(gra)
+                lconns = len(conns)
+            else:
+                lconns = 1
+            if lconns > 1:
+                print(" - Geometry is disconnected.. Skipping...")
+            else:
+                if saddle:
+                    zma = elstruct.reader.opt_zmatrix(prog, out_str)
+                    print('zma in conformer: \n', automol.zmatrix.string(zma))
+                    dist_name = dist_info[0]
+                    dist_len = dist_info[1]
+                    ts_bnd = automol.zmatrix.bond_idxs(zma, dist_name)
+                    ts_bnd1 = min(ts_bnd)
+                    ts_bnd2 = max(ts_bnd)
+                    conf_dist_len = automol.zmatrix.values(zma)[dist_name]
+                    brk_name = dist_info[3]
+                    cent_atm = None
+                    ldist = len(dist_info)
+                    print('ldist test:', ldist, dist_info)
+                    if dist_name and brk_name and ldist > 4:
+                        angle = dist_info[4]
+                        brk_bnd = automol.zmatrix.bond_idxs(zma, brk_name)
+                        ang_atms = [0, 0, 0]
+                        cent_atm = list(set(brk_bnd) & set(ts_bnd))
+                        if cent_atm:
+                            ang_atms[1] = cent_atm[0] 
+                            for idx in brk_bnd:
+                                if idx != ang_atms[1]:
+                                    ang_atms[0] = idx
+                            for idx in ts_bnd:
+                                if idx != ang_atms[1]:
+                                    ang_atms[2] = idx
+                            geom = automol.zmatrix.geometry(zma)
+                            # print('geom in conformer: \n', automol.geom.string(geom))
+                            # print('ang_atms test:', ang_atms)
+                            conf_ang = automol.geom.central_angle(geom, *ang_atms)
+                            #if loc_idx = 0:
+                                #angle = conf_ang
+                    max_disp = 0.6
+                    if 'addition' in rxn_class:
+                        max_disp = 0.8
+                    if 'abstraction' in rxn_class:
+                        max_disp = 1.4
+
+                    # check if forming bond angle is similar to that in initil configuration
+                    if cent_atm and angle and 'elimination' not in rxn_class:
+                        print('rxn_class test in conformer selection:', rxn_class)
+                        print('angle test in conformer selection:', angle, conf_ang)
+                        #if abs(conf_ang - angle) > 0.44:
+                        if abs(conf_ang - angle) > 0.2:
+                            print(" - Transition State conformer has diverged from original",
+                                  "structure of angle {:.3f} with angle {:.3f}".format(
+                                      angle, conf_ang))
+                            continue
+                    print('rxn_class test in conformer selection:', rxn_class)
+                    print('distance test in conformer selection:', dist_len, conf_dist_len)
+                    # check if radical atom is closer to some atom other than the bonding atom
+                    if 'addition' in rxn_class or 'abstraction' in rxn_class:
+                        print('it is an addition or an abstraction:')
+                        if not is_atom_closest_to_bond_atom(zma, ts_bnd2, conf_dist_len):
+                            print(" - Transition State conformer has diverged from original",
+                                  "structure of dist {:.3f} with dist {:.3f}".format(
+                                      dist_len, conf_dist_len))
+                            print("The radical atom now has a new nearest neighbor")
+                            print('geom test:', automol.geom.string(automol.zmatrix.geometry(zma)))
+                            print('ts_bnd2 test:', ts_bnd2)
+                            continue
+                        if abs(conf_dist_len - dist_len) > max_disp:
+                            print(" - Transition State conformer has diverged from original",
+                                  "structure of dist {:.3f} with dist {:.3f}".format(
+                                      dist_len, conf_dist_len))
+                            continue
+                        # check if radical atom has collapsed to the equilibrium bond length
+                        # this presumes the radical is the second group
+                        symbols = automol.zmatrix.symbols(zma)
+                        equi_bnd = 0.
+                        if symbols[ts_bnd2] == 'H':
+                            if symbols[ts_bnd1] == 'H':
+                                equi_bnd = 0.75 * phycon.ANG2BOHR
+                            if symbols[ts_bnd1] == 'C':
+                                equi_bnd = 1.09 * phycon.ANG2BOHR
+                            elif symbols[ts_bnd1] == 'N':
+                                equi_bnd = 1.01
+                            elif symbols[ts_bnd1] == 'O':
+                                equi_bnd = 0.96 * phycon.ANG2BOHR
+                        if symbols[ts_bnd2] == 'C':
+                            if symbols[ts_bnd1] == 'H':
+                                equi_bnd = 1.09 * phycon.ANG2BOHR
+                            if symbols[ts_bnd1] == 'C':
+                                equi_bnd = 1.5 * phycon.ANG2BOHR
+                            elif symbols[ts_bnd1] == 'N':
+                                equi_bnd = 1.45 * phycon.ANG2BOHR
+                            elif symbols[ts_bnd1] == 'O':
+                                equi_bnd = 1.4 * phycon.ANG2BOHR
+                        if symbols[ts_bnd2] == 'N':
+                            if symbols[ts_bnd1] == 'H':
+                                equi_bnd = 1.01 * phycon.ANG2BOHR
+                            if symbols[ts_bnd1] == 'C':
+                                equi_bnd = 1.45 * phycon.ANG2BOHR
+                            elif symbols[ts_bnd1] == 'N':
+                                equi_bnd = 1.4 * phycon.ANG2BOHR
+                            elif symbols[ts_bnd1] == 'O':
+                                equi_bnd = 1.35 * phycon.ANG2BOHR
+                        if symbols[ts_bnd2] == 'O':
+                            if symbols[ts_bnd1] == 'H':
+                                equi_bnd = 0.96 * phycon.ANG2BOHR
+                            if symbols[ts_bnd1] == 'C':
+                                equi_bnd = 1.4 * phycon.ANG2BOHR
+                            elif symbols[ts_bnd1] == 'N':
+                                equi_bnd = 1.35 * phycon.ANG2BOHR
+                            elif symbols[ts_bnd1] == 'O':
+                                equi_bnd = 1.3 * phycon.ANG2BOHR
+                        displace_from_equi = conf_dist_len - equi_bnd
+                        print('distance_from_equi test:', conf_dist_len, equi_bnd, dist_len)
+                        print('bnd atoms:', ts_bnd1, ts_bnd2, symbols[ts_bnd1], symbols[ts_bnd2])
+                        print('symbols:', symbols[ts_bnd1], symbols[ts_bnd2])
+                        if abs(conf_dist_len - dist_len) > 0.2 and displace_from_equi < 0.2:
+                            print(" - Transition State conformer has converged to an",
+                                  "equilibrium structure with dist",
+                                  " {:.3f} compared with equilibriumt {:.3f}".format(
+                                      conf_dist_len, equi_bnd))
+                            continue
+                    else:
+                        if abs(conf_dist_len - dist_len) > 0.4:
+                            print(" - Transition State conformer has diverged from original",
+                                  "structure of dist {:.3f} with dist {:.3f}".format(
+                                      dist_len, conf_dist_len))
+                            continue
                 else:
-                    lconns = 1
-                if lconns > 1:
-                    print(" - Geometry is disconnected.. Skipping...")
+                    zma = automol.geom.zmatrix(geo)
+                unique = seen_idx.is_unique_tors_dist_mat_energy(geo, ene, saddle)
+
+                if not unique:
+                    print(" - Geometry is not unique. Skipping...")
                 else:
-                    if saddle:
-                        zma = elstruct.reader.opt_zmatrix(prog, out_str)
-                        print('zma in conformer: \n', automol.zmatrix.string(zma))
-                        dist_name = dist_info[0]
-                        dist_len = dist_info[1]
-                        ts_bnd = automol.zmatrix.bond_idxs(zma, dist_name)
-                        ts_bnd1 = min(ts_bnd)
-                        ts_bnd2 = max(ts_bnd)
-                        conf_dist_len = automol.zmatrix.values(zma)[dist_name]
-                        brk_name = dist_info[3]
-                        cent_atm = None
-                        ldist = len(dist_info)
-                        print('ldist test:', ldist, dist_info)
-                        if dist_name and brk_name and ldist > 4:
-                            angle = dist_info[4]
-                            brk_bnd = automol.zmatrix.bond_idxs(zma, brk_name)
-                            ang_atms = [0, 0, 0]
-                            cent_atm = list(set(brk_bnd) & set(ts_bnd))
-                            if cent_atm:
-                                ang_atms[1] = cent_atm[0] 
-                                for idx in brk_bnd:
-                                    if idx != ang_atms[1]:
-                                        ang_atms[0] = idx
-                                for idx in ts_bnd:
-                                    if idx != ang_atms[1]:
-                                        ang_atms[2] = idx
-                                geom = automol.zmatrix.geometry(zma)
-                                # print('geom in conformer: \n', automol.geom.string(geom))
-                                # print('ang_atms test:', ang_atms)
-                                conf_ang = automol.geom.central_angle(geom, *ang_atms)
-                                #if loc_idx = 0:
-                                    #angle = conf_ang
-                        max_disp = 0.6
-                        if 'addition' in rxn_class:
-                            max_disp = 0.8
-                        if 'abstraction' in rxn_class:
-                            max_disp = 1.4
-
-                        # check if forming bond angle is similar to that in initil configuration
-                        if cent_atm and angle and 'elimination' not in rxn_class:
-                            print('rxn_class test in conformer selection:', rxn_class)
-                            print('angle test in conformer selection:', angle, conf_ang)
-                            #if abs(conf_ang - angle) > 0.44:
-                            if abs(conf_ang - angle) > 0.2:
-                                print(" - Transition State conformer has diverged from original",
-                                      "structure of angle {:.3f} with angle {:.3f}".format(
-                                          angle, conf_ang))
-                                continue
-                        print('rxn_class test in conformer selection:', rxn_class)
-                        print('distance test in conformer selection:', dist_len, conf_dist_len)
-                        # check if radical atom is closer to some atom other than the bonding atom
-                        if 'addition' in rxn_class or 'abstraction' in rxn_class:
-                            print('it is an addition or an abstraction:')
-                            if not is_atom_closest_to_bond_atom(zma, ts_bnd2, conf_dist_len):
-                                print(" - Transition State conformer has diverged from original",
-                                      "structure of dist {:.3f} with dist {:.3f}".format(
-                                          dist_len, conf_dist_len))
-                                print("The radical atom now has a new nearest neighbor")
-                                print('geom test:', automol.geom.string(automol.zmatrix.geometry(zma)))
-                                print('ts_bnd2 test:', ts_bnd2)
-                                continue
-                            if abs(conf_dist_len - dist_len) > max_disp:
-                                print(" - Transition State conformer has diverged from original",
-                                      "structure of dist {:.3f} with dist {:.3f}".format(
-                                          dist_len, conf_dist_len))
-                                continue
-                            # check if radical atom has collapsed to the equilibrium bond length
-                            # this presumes the radical is the second group
-                            symbols = automol.zmatrix.symbols(zma)
-                            equi_bnd = 0.
-                            if symbols[ts_bnd2] == 'H':
-                                if symbols[ts_bnd1] == 'H':
-                                    equi_bnd = 0.75 * phycon.ANG2BOHR
-                                if symbols[ts_bnd1] == 'C':
-                                    equi_bnd = 1.09 * phycon.ANG2BOHR
-                                elif symbols[ts_bnd1] == 'N':
-                                    equi_bnd = 1.01
-                                elif symbols[ts_bnd1] == 'O':
-                                    equi_bnd = 0.96 * phycon.ANG2BOHR
-                            if symbols[ts_bnd2] == 'C':
-                                if symbols[ts_bnd1] == 'H':
-                                    equi_bnd = 1.09 * phycon.ANG2BOHR
-                                if symbols[ts_bnd1] == 'C':
-                                    equi_bnd = 1.5 * phycon.ANG2BOHR
-                                elif symbols[ts_bnd1] == 'N':
-                                    equi_bnd = 1.45 * phycon.ANG2BOHR
-                                elif symbols[ts_bnd1] == 'O':
-                                    equi_bnd = 1.4 * phycon.ANG2BOHR
-                            if symbols[ts_bnd2] == 'N':
-                                if symbols[ts_bnd1] == 'H':
-                                    equi_bnd = 1.01 * phycon.ANG2BOHR
-                                if symbols[ts_bnd1] == 'C':
-                                    equi_bnd = 1.45 * phycon.ANG2BOHR
-                                elif symbols[ts_bnd1] == 'N':
-                                    equi_bnd = 1.4 * phycon.ANG2BOHR
-                                elif symbols[ts_bnd1] == 'O':
-                                    equi_bnd = 1.35 * phycon.ANG2BOHR
-                            if symbols[ts_bnd2] == 'O':
-                                if symbols[ts_bnd1] == 'H':
-                                    equi_bnd = 0.96 * phycon.ANG2BOHR
-                                if symbols[ts_bnd1] == 'C':
-                                    equi_bnd = 1.4 * phycon.ANG2BOHR
-                                elif symbols[ts_bnd1] == 'N':
-                                    equi_bnd = 1.35 * phycon.ANG2BOHR
-                                elif symbols[ts_bnd1] == 'O':
-                                    equi_bnd = 1.3 * phycon.ANG2BOHR
-                            displace_from_equi = conf_dist_len - equi_bnd
-                            print('distance_from_equi test:', conf_dist_len, equi_bnd, dist_len)
-                            print('bnd atoms:', ts_bnd1, ts_bnd2, symbols[ts_bnd1], symbols[ts_bnd2])
-                            print('symbols:', symbols[ts_bnd1], symbols[ts_bnd2])
-                            if abs(conf_dist_len - dist_len) > 0.2 and displace_from_equi < 0.2:
-                                print(" - Transition State conformer has converged to an",
-                                      "equilibrium structure with dist",
-                                      " {:.3f} compared with equilibriumt {:.3f}".format(
-                                          conf_dist_len, equi_bnd))
-                                continue
+                    vma = automol.zmatrix.var_(zma)
+                    if cnf_save_fs.trunk.file.vmatrix.exists():
+                        existing_vma = cnf_save_fs.trunk.file.vmatrix.read()
+                        if vma != existing_vma:
+                            print(" - Isomer is not the same as starting isomer. Skipping...")
                         else:
-                            if abs(conf_dist_len - dist_len) > 0.4:
-                                print(" - Transition State conformer has diverged from original",
-                                      "structure of dist {:.3f} with dist {:.3f}".format(
-                                          dist_len, conf_dist_len))
-                                continue
-                    else:
-                        zma = automol.geom.zmatrix(geo)
-                    unique = is_unique_tors_dist_mat_energy(geo, ene, seen_geos, seen_enes, saddle)
+                            save_path = cnf_save_fs.leaf.path(locs)
+                            print(" - Geometry is unique. Saving...")
+                            print(" - Save path: {}".format(save_path))
 
-                    if not unique:
-                        print(" - Geometry is not unique. Skipping...")
-                    else:
-                        vma = automol.zmatrix.var_(zma)
-                        if cnf_save_fs.trunk.file.vmatrix.exists():
-                            existing_vma = cnf_save_fs.trunk.file.vmatrix.read()
-                            if vma != existing_vma:
-                                print(" - Isomer is not the same as starting isomer. Skipping...")
-                            else:
-                                save_path = cnf_save_fs.leaf.path(locs)
-                                print(" - Geometry is unique. Saving...")
-                                print(" - Save path: {}".format(save_path))
-
-                                cnf_save_fs.leaf.create(locs)
-                                cnf_save_fs.leaf.file.geometry_info.write(
-                                    inf_obj, locs)
-                                cnf_save_fs.leaf.file.geometry_input.write(
-                                    inp_str, locs)
-                                cnf_save_fs.leaf.file.energy.write(ene, locs)
-                                cnf_save_fs.leaf.file.geometry.write(geo, locs)
-                                cnf_save_fs.leaf.file.zmatrix.write(zma, locs)
-                                #cnf_save_fs.trunk.file.info.write(inf_obj)
-
-                    seen_geos.append(geo)
-                    seen_enes.append(ene)
-
-        # update the conformer trajectory file
-        moldr.util.traj_sort(cnf_save_fs)
+                            cnf_save_fs.leaf.create(locs)
+                            cnf_save_fs.leaf.file.geometry_info.write(
+                                inf_obj, locs)
+                            cnf_save_fs.leaf.file.geometry_input.write(
+                                inp_str, locs)
+                            cnf_save_fs.leaf.file.energy.write(ene, locs)
+                            cnf_save_fs.leaf.file.geometry.write(geo, locs)
+                            cnf_save_fs.leaf.file.zmatrix.write(zma, locs)
+                            #cnf_save_fs.trunk.file.info.write(inf_obj)
+
+                seen_idx.add(geo, ene)
+
+    # update the conformer trajectory file
+    moldr.util.traj_sort(cnf_save_fs)
+
+    cnf_save_fs.trunk.create()
+    cnf_save_fs.trunk.file.manifest.write(
+        autofile.system.info.run_manifest(runs))
+
+
+def _unprocessed_conformer_runs(cnf_run_fs, cnf_save_fs):
+    """ locators for the conformer runs that have not been saved yet
+
+    A run counts as processed once its optimization has finished (succeeded
+    or failed) and the modification time of its run information file matches
+    the one recorded in the manifest. Runs that are still in flight are left
+    out until their status changes.
+
+    :returns: the updated manifest records, by conformer id, and the list of
+        locators to process
+    """
+    job = elstruct.Job.OPTIMIZATION
+    done_statuses = (autofile.system.RunStatus.SUCCESS,
+                     autofile.system.RunStatus.FAILURE)
+
+    runs = {}
+    if cnf_save_fs.trunk.file.manifest.exists():
+        runs = dict(cnf_save_fs.trunk.file.manifest.read())['runs']
+
+    new_locs_lst = []
+    for locs in cnf_run_fs.leaf.existing():
+        cid = locs[0]
+        run_fs = autofile.fs.run(cnf_run_fs.leaf.path(locs))
+        inf_path = run_fs.leaf.file.info.path([job])
+        if not os.path.isfile(inf_path):
+            # not started yet
+            runs.pop(cid, None)
+            continue
+
+        mtime = os.path.getmtime(inf_path)
+        if cid in runs and runs[cid][1] == mtime:
+            continue
+
+        status = run_fs.leaf.file.info.read([job]).status
+        if status not in done_statuses:
+            # still running; picked up once its status changes
+            runs.pop(cid, None)
+            continue
+        runs[cid] = (status, mtime)
+        new_locs_lst.append(locs)
+
+    return runs, new_locs_lst
 
 
 def is_atom_closest_to_bond_atom(zma, idx_rad, bond_dist):
@@ -426,30 +540,16 @@ def is_unique_coulomb_energy(geo, ene, geo_list, ene_list):
     """ compare given geo with list of geos all to see if any have the same
     coulomb spectrum and energy
     """
-    unique = True
-    for idx, geoi in enumerate(geo_list):
-        enei = ene_list[idx]
-        etol = 2.e-5
-        if abs(ene-enei) < etol:
-            if automol.geom.almost_equal_coulomb_spectrum(
-                    geo, geoi, rtol=1e-2):
-                unique = False
-    return unique
+    cnf_idx = ConformerIndex(geo_list, ene_list)
+    return cnf_idx.is_unique_coulomb_energy(geo, ene)
 
 
 def is_unique_dist_mat_energy(geo, ene, geo_list, ene_list):
     """ compare given geo with list of geos all to see if any have the same
     distance matrix and energy
     """
-    unique = True
-    for idx, geoi in enumerate(geo_list):
-        enei = ene_list[idx]
-        etol = 2.e-5
-        if abs(ene-enei) < etol:
-            if automol.geom.almost_equal_dist_mat(
-                    geo, geoi, thresh=1e-1):
-                unique = False
-    return unique
+    cnf_idx = ConformerIndex(geo_list, ene_list)
+    return cnf_idx.is_unique_dist_mat_energy(geo, ene)
 
 
 def int_sym_num_from_sampling(
@@ -593,18 +693,128 @@ def is_unique_tors_dist_mat_energy(geo, ene, geo_list, ene_list, saddle):
     """ compare given geo with list of geos all to see if any have the same
     coulomb spectrum and energy and stereo specific inchi
     """
-    unique = True
-    etol = 2.e-5
-    for idx, geoi in enumerate(geo_list):
-        enei = ene_list[idx]
-        # check energy
-        if abs(ene-enei) < etol:
-            # check distance matrix
-            if automol.geom.almost_equal_dist_mat(
-                    geo, geoi, thresh=3e-1):
-                # check dihedrals
-                if saddle:
-                    unique = False
-                elif are_torsions_same(geo, geoi):
-                    unique = False
-    return unique
+    cnf_idx = ConformerIndex(geo_list, ene_list)
+    return cnf_idx.is_unique_tors_dist_mat_energy(geo, ene, saddle)
+
+
+class ConformerIndex():
+    """ fingerprints of the conformers seen so far, for uniqueness checks
+
+    Energies are kept sorted, so only the conformers within `etol` of a new
+    energy are compared against; their distance matrices and coulomb spectra
+    are stacked and compared in one array operation.
+    """
+    ETOL = 2.e-5
+
+    def __init__(self, geo_list=(), ene_list=()):
+        assert len(geo_list) == len(ene_list)
+        self.geos = []
+        self._enes = numpy.empty(0)
+        self._order = numpy.empty(0, dtype=int)
+        self._dmats = None
+        self._specs = None
+        self._nspecs = 0
+        for geo, ene in zip(geo_list, ene_list):
+            self.add(geo, ene)
+
+    def __len__(self):
+        return len(self.geos)
+
+    def add(self, geo, ene):
+        """ add a conformer to the index
+        """
+        pos = numpy.searchsorted(self._enes, ene)
+        self._enes = numpy.insert(self._enes, pos, ene)
+        self._order = numpy.insert(self._order, pos, len(self.geos))
+        self.geos.append(geo)
+        self._dmats = _append_row(self._dmats, _distance_matrix(geo),
+                                  len(self.geos))
+
+    def candidates(self, ene, etol=ETOL):
+        """ indices of the conformers with energies within `etol` of `ene`
+        """
+        start = numpy.searchsorted(self._enes, ene - etol, side='right')
+        stop = numpy.searchsorted(self._enes, ene + etol, side='left')
+        return numpy.sort(self._order[start:stop])
+
+    def dist_mat_matches(self, geo, ene, thresh, etol=ETOL):
+        """ indices of the conformers with the same energy and distance matrix
+        """
+        idxs = self.candidates(ene, etol)
+        if idxs.size:
+            dmat = _distance_matrix(geo)
+            dmats = self._dmats[idxs]
+            if dmats.shape[1:] != dmat.shape:
+                idxs = idxs[:0]
+            else:
+                diffs = numpy.abs(dmats - dmat)
+                idxs = idxs[numpy.all(diffs < thresh, axis=(1, 2))]
+        return idxs
+
+    def coulomb_matches(self, geo, ene, rtol, etol=ETOL):
+        """ indices of the conformers with the same energy and coulomb spectrum
+        """
+        idxs = self.candidates(ene, etol)
+        if idxs.size:
+            # coulomb spectra are only computed once they are asked for
+            for geoi in self.geos[self._nspecs:]:
+                self._nspecs += 1
+                self._specs = _append_row(
+                    self._specs,
+                    numpy.array(automol.geom.coulomb_spectrum(geoi)),
+                    self._nspecs)
+            spec = numpy.array(automol.geom.coulomb_spectrum(geo))
+            specs = self._specs[idxs]
+            if specs.shape[1:] != spec.shape:
+                idxs = idxs[:0]
+            else:
+                close = (numpy.abs(spec - specs) <=
+                         1e-8 + rtol * numpy.abs(specs))
+                idxs = idxs[numpy.all(close, axis=1)]
+        return idxs
+
+    def is_unique_coulomb_energy(self, geo, ene):
+        """ is there no conformer with the same coulomb spectrum and energy?
+        """
+        return not self.coulomb_matches(geo, ene, rtol=1e-2).size
+
+    def is_unique_dist_mat_energy(self, geo, ene):
+        """ is there no conformer with the same distance matrix and energy?
+        """
+        return not self.dist_mat_matches(geo, ene, thresh=1e-1).size
+
+    def is_unique_tors_dist_mat_energy(self, geo, ene, saddle):
+        """ is there no conformer with the same distance matrix, energy, and
+        (for minima) torsional angles?
+        """
+        idxs = self.dist_mat_matches(geo, ene, thresh=3e-1)
+        if saddle:
+            unique = not idxs.size
+        else:
+            unique = not any(are_torsions_same(geo, self.geos[idx])
+                             for idx in idxs)
+        return unique
+
+
+def _distance_matrix(geo):
+    """ interatomic distance matrix for a geometry
+    """
+    xyzs = numpy.array(automol.geom.coordinates(geo), dtype=float)
+    return numpy.linalg.norm(xyzs[:, None, :] - xyzs[None, :, :], axis=-1)
+
+
+def _append_row(arr, row, nrows):
+    """ append a row to a stacked array, doubling its capacity as needed
+
+    (rows of a different shape than the stack cannot be compared against it,
+    so they are stored as NaN and never match)
+    """
+    if arr is None:
+        arr = numpy.empty((4,) + row.shape)
+    elif nrows > len(arr):
+        arr = numpy.concatenate([arr, numpy.empty_like(arr)])
+    if arr.shape[1:] == row.shape:
+        arr[nrows-1] = row
+    else:
+        arr[nrows-1] = numpy.nan
+    return arr
@@ -3,6 +3,7 @@
 import functools
 import elstruct
 import autofile
+import moldr.executor
 from moldr import runner
 
 JOB_ERROR_DCT = {
@@ -43,9 +44,14 @@ def run_job(
         geom, spc_info, thy_level,
         errors=(), options_mat=(), retry_failed=True, feedback=False,
         frozen_coordinates=(), freeze_dummy_atoms=True, overwrite=False,
-        irc_direction=None,
+        irc_direction=None, executor=None,
         **kwargs):
     """ run an elstruct job by name
+
+    If a `moldr.executor.JobExecutor` is passed in, the job is submitted to
+    it and a future is returned; the RUNNING status written to the run info
+    file before submission marks the job as taken for any later pass.
+    Otherwise the job runs here and None is returned.
     """
     assert job in JOB_RUNNER_DCT
     assert job in JOB_ERROR_DCT
@@ -79,6 +85,7 @@ def run_job(
                           .format(job, run_path))
                     print(" - Skipping...")
 
+    ret = None
     if do_run:
         # create the run directory
         status = autofile.system.RunStatus.RUNNING
@@ -90,6 +97,41 @@ def run_job(
         inf_obj.utc_start_time = autofile.system.info.utc_time()
         run_fs.leaf.file.info.write(inf_obj, [job])
 
+        run_args = (job, script_str, run_fs.trunk.prefix, geom, spc_info,
+                    thy_level, inf_obj)
+        run_kwargs = dict(
+            errors=errors, options_mat=options_mat, feedback=feedback,
+            frozen_coordinates=frozen_coordinates,
+            freeze_dummy_atoms=freeze_dummy_atoms,
+            irc_direction=irc_direction, **kwargs)
+        if executor is not None:
+            print(" - Submitting {} job at {}".format(job, run_path))
+            ret = executor.submit(execute_job, *run_args, **run_kwargs)
+        else:
+            execute_job(*run_args, **run_kwargs)
+    elif executor is not None:
+        ret = moldr.executor.completed_future()
+
+    return ret
+
+
+def execute_job(
+        job, script_str, run_prefix,
+        geom, spc_info, thy_level, inf_obj,
+        errors=(), options_mat=(), feedback=False,
+        frozen_coordinates=(), freeze_dummy_atoms=True,
+        irc_direction=None,
+        **kwargs):
+    """ execute an elstruct job whose RUNNING status has already been written
+
+    The run filesystem is rebuilt from its prefix so that this can be sent to
+    a worker process. Any exception leaves a FAILURE status behind rather than
+    a stale RUNNING one.
+    """
+    run_fs = autofile.fs.run(run_prefix)
+    run_path = run_fs.leaf.path([job])
+
+    try:
         # Set the job runner based on requested by user; set special options as needed
         runner = JOB_RUNNER_DCT[job]
 
@@ -108,22 +150,27 @@ def run_job(
             orb_restricted=thy_level[3], prog=thy_level[0],
             errors=errors, options_mat=options_mat, **kwargs
         )
-
+    except Exception:
         inf_obj.utc_end_time = autofile.system.info.utc_time()
-        prog = inf_obj.prog
-        if is_successful_output(out_str, job, prog):
-            run_fs.leaf.file.output.write(out_str, [job])
-            print(" - Run succeeded.")
-            status = autofile.system.RunStatus.SUCCESS
-        else:
-            print(" - Run failed.")
-            status = autofile.system.RunStatus.FAILURE
-        version = elstruct.reader.program_version(prog, out_str)
-        inf_obj.version = version
-        inf_obj.status = status
+        inf_obj.status = autofile.system.RunStatus.FAILURE
         run_fs.leaf.file.info.write(inf_obj, [job])
-        run_fs.leaf.file.input.write(inp_str, [job])
-        print('finished run_job')
+        raise
+
+    inf_obj.utc_end_time = autofile.system.info.utc_time()
+    prog = inf_obj.prog
+    if is_successful_output(out_str, job, prog):
+        run_fs.leaf.file.output.write(out_str, [job])
+        print(" - Run succeeded.")
+        status = autofile.system.RunStatus.SUCCESS
+    else:
+        print(" - Run failed.")
+        status = autofile.system.RunStatus.FAILURE
+    version = elstruct.reader.program_version(prog, out_str)
+    inf_obj.version = version
+    inf_obj.status = status
+    run_fs.leaf.file.info.write(inf_obj, [job])
+    run_fs.leaf.file.input.write(inp_str, [job])
+    print('finished run_job')
 
 
 def read_job(job, run_fs):
@@ -0,0 +1,261 @@
+""" bounded pool of job slots for running jobs concurrently
+"""
+import os
+import concurrent.futures
+
+
+class JobExecutor():
+    """ runs jobs concurrently on a fixed number of slots
+
+    Each slot is a separate worker process, so jobs that change the working
+    directory (elstruct.run.direct, moldr.util.run_script) cannot interfere
+    with one another. Submitted functions and their arguments must therefore
+    be picklable -- pass paths rather than filesystem objects.
+    """
+
+    def __init__(self, nslots=1, ncores=1):
+        """
+        :param nslots: the maximum number of jobs running at once
+        :type nslots: int
+        :param ncores: the number of cores budgeted to each job, exported to
+            the worker environment as OMP_NUM_THREADS
+        :type ncores: int
+        """
+        assert isinstance(nslots, int) and nslots >= 1
+        assert isinstance(ncores, int) and ncores >= 1
+        self.nslots = nslots
+        self.ncores = ncores
+        self._pool = concurrent.futures.ProcessPoolExecutor(
+            max_workers=nslots, initializer=_set_core_budget,
+            initargs=(ncores,))
+
+    def submit(self, function, *args, **kwargs):
+        """ submit a job to the pool
+
+        :returns: a future for the job's return value
+        :rtype: concurrent.futures.Future
+        """
+        return self._pool.submit(function, *args, **kwargs)
+
+    def shutdown(self, wait=True):
+        """ release the worker processes
+        """
+        self._pool.shutdown(wait=wait)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, _exc_type, _exc_value, _traceback):
+        self.shutdown(wait=True)
+
+
+def from_core_budget(ncores_tot, ncores=1):
+    """ build an executor that splits a total core budget into job slots
+
+    :param ncores_tot: the total number of cores available
+    :type ncores_tot: int
+    :param ncores: the number of cores budgeted to each job
+    :type ncores: int
+    """
+    nslots = max(1, ncores_tot // ncores)
+    return JobExecutor(nslots=nslots, ncores=ncores)
+
+
+def completed_future(result=None):
+    """ a future that has already resolved to `result`
+
+    (for returning skipped jobs through the same interface as submitted ones)
+    """
+    fut = concurrent.futures.Future()
+    fut.set_result(result)
+    return fut
+
+
+def as_completed(futs):
+    """ iterate over a sequence of futures as they finish
+    """
+    return concurrent.futures.as_completed(list(futs))
+
+
+def first_completed(futs):
+    """ wait for at least one of a collection of futures to finish
+
+    :returns: the futures that have finished
+    :rtype: set
+    """
+    done, _ = concurrent.futures.wait(
+        list(futs), return_when=concurrent.futures.FIRST_COMPLETED)
+    return done
+
+
+def gather(futs):
+    """ wait for a sequence of futures and return their results in order
+
+    Exceptions raised by a job are re-raised here.
+    """
+    futs = list(futs)
+    concurrent.futures.wait(futs)
+    return [fut.result() for fut in futs]
+
+
+def map_jobs(function, args_lst, nslots=1, ncores=1):
+    """ apply a function to each set of arguments, concurrently if there is
+    more than one slot
+
+    :param args_lst: the positional arguments for each call
+    :returns: the results, in order
+    :rtype: list
+    """
+    args_lst = list(args_lst)
+    if nslots > 1 and len(args_lst) > 1:
+        nslots = min(nslots, len(args_lst))
+        with JobExecutor(nslots=nslots, ncores=ncores) as executor:
+            ret = gather(executor.submit(function, *args)
+                         for args in args_lst)
+    else:
+        ret = [function(*args) for args in args_lst]
+    return ret
+
+
+def run_graph(jobs, executor=None, board=None, on_done=None):
+    """ run a graph of jobs, each one as soon as the jobs it depends on are done
+
+    Without an executor the jobs run here, one at a time, in the order of
+    `jobs` as far as the dependencies allow. A job whose dependency failed is
+    not run, and is counted as failed as well.
+
+    :param jobs: (function, args, dependencies) triples, keyed by job name;
+        dependencies must come before the jobs that depend on them
+    :type jobs: dict
+    :param executor: the job slots to run on
+    :type executor: JobExecutor
+    :param board: a status board to keep up to date, keyed by job name
+    :type board: StatusBoard
+    :param on_done: called here with the name and result of each job that
+        succeeds, as it does
+    :returns: the results of the jobs that succeeded and the exceptions of
+        those that failed, keyed by job name
+    :rtype: (dict, dict)
+    """
+    nslots = 1 if executor is None else executor.nslots
+    rets = {}
+    errs = {}
+    pending = dict(jobs)
+    running = {}
+    for key in pending:
+        _set_state(board, key, 'pending')
+
+    while pending or running:
+        # fail the jobs downstream of a failure (in order, so this cascades)
+        for key, (_, _, deps) in list(pending.items()):
+            assert all(dep in jobs for dep in deps)
+            failed_deps = [dep for dep in deps if dep in errs]
+            if failed_deps:
+                errs[key] = RuntimeError(
+                    'dependency {} failed'.format(failed_deps[0]))
+                del pending[key]
+                _set_state(board, key, 'failed')
+
+        # start what is ready, up to the number of slots
+        ready = [key for key, (_, _, deps) in pending.items()
+                 if all(dep in rets for dep in deps)]
+        for key in ready[:nslots-len(running)]:
+            function, args, _ = pending.pop(key)
+            _set_state(board, key, 'running')
+            if executor is None:
+                try:
+                    rets[key] = function(*args)
+                except Exception as err:
+                    errs[key] = err
+                _finish(key, rets, errs, board, on_done)
+            else:
+                running[executor.submit(function, *args)] = key
+
+        if running:
+            for fut in first_completed(running):
+                key = running.pop(fut)
+                if fut.exception() is None:
+                    rets[key] = fut.result()
+                else:
+                    errs[key] = fut.exception()
+                _finish(key, rets, errs, board, on_done)
+
+    return rets, errs
+
+
+class StatusBoard():
+    """ the states of a table of jobs (species by task, say), rewritten to a
+    file whenever one of them changes
+
+    Jobs are keyed by (row, column) pairs and each is pending, running, done
+    or failed.
+    """
+
+    STATES = ('pending', 'running', 'done', 'failed')
+
+    def __init__(self, path, cols=()):
+        """
+        :param path: the file to write the board to
+        :type path: str
+        :param cols: the column names, in order (others are added as they
+            come)
+        :type cols: tuple
+        """
+        self.path = path
+        self.cols = list(cols)
+        self.rows = []
+        self.states = {}
+
+    def set(self, key, state):
+        """ set the state of a job and rewrite the board
+        """
+        assert state in self.STATES
+        row, col = key
+        if row not in self.rows:
+            self.rows.append(row)
+        if col not in self.cols:
+            self.cols.append(col)
+        self.states[key] = state
+        self.write()
+
+    def string(self):
+        """ the board, as a table
+        """
+        counts = [list(self.states.values()).count(state)
+                  for state in self.STATES]
+        table = [[''] + list(map(str, self.cols))]
+        for row in self.rows:
+            table.append([str(row)] + [self.states.get((row, col), '-')
+                                       for col in self.cols])
+        widths = [max(map(len, col)) for col in zip(*table)]
+        lines = [', '.join('{:d} {}'.format(count, state)
+                           for count, state in zip(counts, self.STATES))]
+        lines += ['  '.join(val.ljust(width) for val, width
+                            in zip(vals, widths)).rstrip() for vals in table]
+        return '\n'.join(lines) + '\n'
+
+    def write(self):
+        """ write the board (replacing the file in one step, so that it can
+        be read at any time)
+        """
+        tmp_path = '{}.{:d}.tmp'.format(self.path, os.getpid())
+        with open(tmp_path, 'w') as board_file:
+            board_file.write(self.string())
+        os.replace(tmp_path, self.path)
+
+
+def _finish(key, rets, errs, board, on_done):
+    _set_state(board, key, 'failed' if key in errs else 'done')
+    if on_done is not None and key in rets:
+        on_done(key, rets[key])
+
+
+def _set_state(board, key, state):
+    if board is not None:
+        board.set(key, state)
+
+
+def _set_core_budget(ncores):
+    """ worker initializer: limit threaded libraries to the job core budget
+    """
+    os.environ['OMP_NUM_THREADS'] = str(ncores)
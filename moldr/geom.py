@@ -1,6 +1,5 @@
 """ drivers for initial geometry optimization
 """
-import os
 import numpy
 import automol
 import elstruct
@@ -357,20 +356,15 @@ def projrot_frequencies(geo, hess, thy_level, thy_run_fs, projrot_script_str='RP
     bld_run_fs.leaf.create(bld_locs)
     projrot_path = bld_run_fs.leaf.path(bld_locs)
 
-    proj_file_path = os.path.join(projrot_path, 'RPHt_input_data.dat')
-    with open(proj_file_path, 'w') as proj_file:
-        proj_file.write(projrot_inp_str)
-
-    moldr.util.run_script(projrot_script_str, projrot_path)
+    rtproj_out, hrproj_out = moldr.util.run_projrot(
+        projrot_script_str, projrot_inp_str, projrot_path)
 
     imag_freq = ''
-    if os.path.exists(projrot_path+'/hrproj_freq.dat'):
-        rthrproj_freqs, imag_freq = projrot_io.reader.rpht_output(
-            projrot_path+'/hrproj_freq.dat')
+    if hrproj_out is not None:
+        rthrproj_freqs, imag_freq = hrproj_out
         proj_freqs = rthrproj_freqs
     else:
-        rtproj_freqs, imag_freq = projrot_io.reader.rpht_output(
-            projrot_path+'/RTproj_freq.dat')
+        rtproj_freqs, imag_freq = rtproj_out
         proj_freqs = rtproj_freqs
     print(proj_freqs)
     return proj_freqs, imag_freq
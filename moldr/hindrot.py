@@ -0,0 +1,168 @@
+""" one-dimensional hindered rotors, solved in a Fourier basis
+
+Replaces the messpf runs that were made only to read off torsional
+frequencies and zero-point energies. A rotor is given by its potential (in
+kcal/mol, on an even grid over one symmetric period, as written into a
+MESS rotor_hindered block), its symmetry number and its reduced moment of
+inertia. Levels are cached by rotor, and the rotors that are not cached yet
+are diagonalized together.
+
+The reduced moment here is the simple I_1 I_2 / (I_1 + I_2) of the two
+fragments about the bond axis. MESS computes its own rotor moment (with the
+coupling to the overall rotation), so the torsional frequencies and ZPEs
+from this module come from a slightly different rotor model than the
+partition functions of the MESS runs that use the same rotor blocks.
+"""
+import numpy
+from qcelemental import periodictable as ptab
+import automol
+from datalibs import phycon
+import moldr
+
+# h / (8 pi^2 c), for rotational constants in 1/cm from moments in amu ang^2
+ROT_CONST = 16.857629206
+BOHR2ANG = 1. / phycon.ANG2BOHR
+KCAL2WAVEN = 1. / phycon.WAVEN2KCAL
+
+# the basis covers energies up to this far above the barrier (1/cm)
+ENE_CUT = 10000.
+NBASIS_MIN = 20
+NBASIS_MAX = 500
+NBASIS_STEP = 10
+
+_LEVELS_CACHE = {}
+
+
+def reduced_moment(geo, group, axis, remdummy=None):
+    """ the reduced moment of inertia of a rotor (amu angstrom^2)
+
+    The moments of the rotating group and of the rest of the molecule are
+    taken about the rotor axis and combined as I_1 I_2 / (I_1 + I_2). (This
+    is not the rotor moment MESS uses; see the module docstring.)
+
+    :param geo: the (cartesian) geometry
+    :param group: the (1-indexed) atoms of the rotating group
+    :param axis: the (1-indexed) atoms of the rotor axis
+    :param remdummy: dummy atom offsets for the z-matrix indices, as passed
+        to mess_io.writer.rotor_hindered
+    """
+    if remdummy is None:
+        remdummy = numpy.zeros(max(list(group) + list(axis)))
+    group = [int(idx - remdummy[idx-1]) - 1 for idx in group]
+    axis = [int(idx - remdummy[idx-1]) - 1 for idx in axis]
+
+    syms = automol.geom.symbols(geo)
+    xyzs = numpy.array(automol.geom.coordinates(geo)) * BOHR2ANG
+    masses = numpy.array([ptab.to_mass(sym) for sym in syms])
+
+    # squared distances from the axis line
+    vec = xyzs[axis[1]] - xyzs[axis[0]]
+    vec /= numpy.linalg.norm(vec)
+    rel = xyzs - xyzs[axis[0]]
+    dist2 = numpy.sum(rel**2, axis=1) - (rel @ vec)**2
+
+    in_group = numpy.zeros(len(syms), dtype=bool)
+    in_group[group] = True
+    mom1 = numpy.sum(masses[in_group] * dist2[in_group])
+    mom2 = numpy.sum(masses[~in_group] * dist2[~in_group])
+    return mom1 * mom2 / (mom1 + mom2)
+
+
+def levels(rotors):
+    """ the energy levels of a set of rotors (1/cm, from the potential zero)
+
+    :param rotors: (potential, symmetry number, reduced moment) triples
+    :returns: one array of levels per rotor
+    :rtype: list
+    """
+    keys = [_key(*rotor) for rotor in rotors]
+
+    # solve the new rotors, stacked by basis size
+    new_keys = [key for key in set(keys) if key not in _LEVELS_CACHE]
+    hams_dct = {}
+    for key in new_keys:
+        ham = _hamiltonian(*key)
+        hams_dct.setdefault(len(ham), []).append((key, ham))
+    for key_ham_lst in hams_dct.values():
+        enes_arr = numpy.linalg.eigvalsh(
+            numpy.array([ham for _, ham in key_ham_lst]))
+        for (key, _), enes in zip(key_ham_lst, enes_arr):
+            _LEVELS_CACHE[key] = enes
+
+    return [_LEVELS_CACHE[key] for key in keys]
+
+
+def zero_point_energies(rotors):
+    """ torsional zero-point energies (kcal/mol)
+    """
+    return [float(enes[0]) * phycon.WAVEN2KCAL for enes in levels(rotors)]
+
+
+def harmonic_frequencies(rotors):
+    """ the harmonic frequencies at the bottom of the rotor wells (1/cm)
+    """
+    freqs = []
+    for pot, sym_num, red_mom in rotors:
+        angs, coeffs = _potential_fourier(pot, sym_num)
+        grid = numpy.linspace(0., 2. * numpy.pi, 3600, endpoint=False)
+        phases = numpy.exp(1j * numpy.outer(grid, angs))
+        pot_vals = (phases @ coeffs).real
+        curv = (phases[numpy.argmin(pot_vals)] @ (-angs**2 * coeffs)).real
+        bval = ROT_CONST / red_mom
+        freqs.append(float(numpy.sqrt(2. * bval * curv)) if curv > 0. else 0.)
+    return freqs
+
+
+def partition_functions(temps, rotors):
+    """ quantum hindered-rotor partition functions, from the ground level
+
+    :param temps: temperatures (K)
+    :returns: an array of shape (number of rotors, number of temperatures)
+    """
+    temps = numpy.asarray(temps, dtype=float)
+    pfs = []
+    for (_, sym_num, _), enes in zip(rotors, levels(rotors)):
+        boltz = numpy.exp(-numpy.outer(enes - enes[0], 1. / temps) *
+                          moldr.rrho.WAVEN2K)
+        pfs.append(boltz.sum(axis=0) / sym_num)
+    return numpy.array(pfs)
+
+
+def _key(pot, sym_num, red_mom):
+    """ the cache key of a rotor
+    """
+    return (tuple(numpy.round(numpy.asarray(pot, dtype=float), 8)),
+            int(sym_num), round(float(red_mom), 8))
+
+
+def _potential_fourier(pot, sym_num):
+    """ the trigonometric interpolant of a potential (in 1/cm), as
+    wavenumbers over the full turn and the matching coefficients
+    """
+    pot = numpy.asarray(pot, dtype=float) * KCAL2WAVEN
+    npot = len(pot)
+    coeffs = numpy.fft.fft(pot) / npot
+    ords = numpy.arange(-(npot // 2), npot // 2 + 1)
+    coeffs = coeffs[ords % npot]
+    if npot % 2 == 0:
+        coeffs[0] /= 2.
+        coeffs[-1] /= 2.
+    return ords * sym_num, coeffs
+
+
+def _hamiltonian(pot, sym_num, red_mom):
+    """ the rotor hamiltonian in the basis exp(i m phi), |m| <= mmax (1/cm)
+    """
+    angs, coeffs = _potential_fourier(pot, sym_num)
+    bval = ROT_CONST / red_mom
+    mmax = numpy.sqrt((max(max(pot) * KCAL2WAVEN, 0.) + ENE_CUT) / bval)
+    mmax = int(NBASIS_STEP * numpy.ceil(mmax / NBASIS_STEP))
+    mmax = min(max(mmax, NBASIS_MIN), NBASIS_MAX)
+
+    mvals = numpy.arange(-mmax, mmax + 1)
+    ham = numpy.zeros((len(mvals), len(mvals)), dtype=complex)
+    diffs = mvals[:, None] - mvals[None, :]
+    for ang, coeff in zip(angs, coeffs):
+        ham[diffs == ang] += coeff
+    ham += numpy.diag(bval * mvals**2)
+    return ham
@@ -13,6 +13,8 @@ import mess_io
 from submission import substr
 from datalibs import phycon
 
+_HRPOT_CACHE = {}
+
 
 def species_block(
         spc, spc_dct_i, spc_info, spc_model, pf_levels, projrot_script_str,
@@ -26,42 +28,23 @@ def species_block(
     tors_model, vib_model, sym_model = spc_model
 
     # prepare the four sets of file systems
-    orb_restr = moldr.util.orbital_restriction(
-        spc_info, har_level)
-    har_levelp = har_level[0:3]
-    har_levelp.append(orb_restr)
-    thy_save_fs = autofile.fs.theory(save_prefix)
-
-    # thy_save_fs.leaf.create(har_levelp[1:4])
-    har_save_path = thy_save_fs.leaf.path(har_levelp[1:4])
     saddle = False
     dist_names = []
     tors_names = []
     if 'ts_' in spc:
-        har_save_fs = autofile.fs.ts(har_save_path)
-        har_save_fs.trunk.create()
-        har_save_path = har_save_fs.trunk.path()
         saddle = True
         tors_names = spc_dct_i['tors_names']
         if 'migration' in spc_dct_i['class'] or 'elimination' in spc_dct_i['class']:
             dist_names.append(spc_dct_i['dist_info'][0])
             dist_names.append(spc_dct_i['dist_info'][3])
-    har_cnf_save_fs = autofile.fs.conformer(har_save_path)
-    har_min_cnf_locs = moldr.util.min_energy_conformer_locators(har_cnf_save_fs)
+    har_snap = moldr.util.level_snapshot(
+        spc_info, har_level, save_prefix, saddle=saddle)
+    har_min_cnf_locs = har_snap.min_cnf_locs
     if sym_level:
-        orb_restr = moldr.util.orbital_restriction(
-            spc_info, sym_level)
-        sym_levelp = sym_level[0:3]
-        sym_levelp.append(orb_restr)
-
-        sym_save_path = thy_save_fs.leaf.path(sym_levelp[1:4])
-        if 'ts_' in spc:
-            sym_save_fs = autofile.fs.ts(sym_save_path)
-            sym_save_fs.trunk.create()
-            sym_save_path = sym_save_fs.trunk.path()
-
-        sym_cnf_save_fs = autofile.fs.conformer(sym_save_path)
-        sym_min_cnf_locs = moldr.util.min_energy_conformer_locators(sym_cnf_save_fs)
+        sym_snap = moldr.util.level_snapshot(
+            spc_info, sym_level, save_prefix, saddle=saddle)
+        sym_cnf_save_fs = sym_snap.cnf_save_fs
+        sym_min_cnf_locs = sym_snap.min_cnf_locs
 
     # Set boolean to account for a radical radical reaction (not supported by vtst)
     rad_rad_ts = False
@@ -75,36 +58,16 @@ def species_block(
         print(spc_dct_i['class'])
 
     if tors_level and not rad_rad_ts_ls:
-            orb_restr = moldr.util.orbital_restriction(
-                spc_info, tors_level)
-            tors_levelp = tors_level[0:3]
-            tors_levelp.append(orb_restr)
-
-            tors_save_path = thy_save_fs.leaf.path(tors_levelp[1:4])
-            if 'ts_' in spc:
-                tors_save_fs = autofile.fs.ts(tors_save_path)
-                tors_save_fs.trunk.create()
-                tors_save_path = tors_save_fs.trunk.path()
-            tors_cnf_save_fs = autofile.fs.conformer(tors_save_path)
-            tors_min_cnf_locs = moldr.util.min_energy_conformer_locators(tors_cnf_save_fs)
-            if tors_min_cnf_locs:
-                tors_cnf_save_path = tors_cnf_save_fs.leaf.path(tors_min_cnf_locs)
+            tors_snap = moldr.util.level_snapshot(
+                spc_info, tors_level, save_prefix, saddle=saddle)
+            tors_save_path = tors_snap.save_path
+            tors_cnf_save_fs = tors_snap.cnf_save_fs
+            tors_min_cnf_locs = tors_snap.min_cnf_locs
 
     if vpt2_level:
-        orb_restr = moldr.util.orbital_restriction(
-            spc_info, vpt2_level)
-        vpt2_levelp = vpt2_level[0:3]
-        vpt2_levelp.append(orb_restr)
-
-        anh_save_path = thy_save_fs.leaf.path(vpt2_levelp[1:4])
-        if 'ts_' in spc:
-            anh_save_fs = autofile.fs.ts(anh_save_path)
-            anh_save_fs.trunk.create()
-            anh_save_path = anh_save_fs.trunk.path()
-
-        anh_cnf_save_fs = autofile.fs.conformer(anh_save_path)
-        anh_min_cnf_locs = moldr.util.min_energy_conformer_locators(anh_cnf_save_fs)
-        # anh_cnf_save_path = anh_cnf_save_fs.leaf.path(anh_min_cnf_locs)
+        anh_snap = moldr.util.level_snapshot(
+            spc_info, vpt2_level, save_prefix, saddle=saddle)
+        anh_min_cnf_locs = anh_snap.min_cnf_locs
 
     # atom case - do as first step in each of other cases
     # pure harmonic case
@@ -131,10 +94,10 @@ def species_block(
                 sym_factor = 1
                 #return '', 0.
             else:
-                sym_geo = sym_cnf_save_fs.leaf.file.geometry.read(sym_min_cnf_locs)
-                sym_ene = sym_cnf_save_fs.leaf.file.energy.read(sym_min_cnf_locs)
+                sym_geo = sym_snap.geometry()
+                sym_ene = sym_snap.energy()
                 if dist_names:
-                    zma = tors_cnf_save_fs.leaf.file.zmatrix.read(tors_min_cnf_locs)
+                    zma = tors_snap.zmatrix()
                     form_coords = list(automol.zmatrix.bond_idxs(zma, dist_names[0]))
                     form_coords.extend(list(dist_names[1]))
                 sym_factor = moldr.conformer.symmetry_factor(
@@ -148,15 +111,15 @@ def species_block(
 
     if (vib_model == 'HARM' and tors_model == 'RIGID') or rad_rad_ts_ls:
         if har_min_cnf_locs is not None:
-            har_geo = har_cnf_save_fs.leaf.file.geometry.read(har_min_cnf_locs)
-            min_ene = har_cnf_save_fs.leaf.file.energy.read(har_min_cnf_locs)
+            har_geo = har_snap.geometry()
+            min_ene = har_snap.energy()
             if automol.geom.is_atom(har_geo):
                 print('This is an atom')
                 mass = ptab.to_mass(har_geo[0][0])
                 spc_str = mess_io.writer.atom(
                     mass, elec_levels)
             else:
-                hess = har_cnf_save_fs.leaf.file.hessian.read(har_min_cnf_locs)
+                hess = har_snap.hessian()
                 freqs = elstruct.util.harmonic_frequencies(har_geo, hess, project=False)
                 mode_start = 6
                 if 'ts_' in spc:
@@ -181,15 +144,15 @@ def species_block(
 
     elif vib_model == 'HARM' and tors_model == '1DHR':
         if har_min_cnf_locs is not None:
-            har_geo = har_cnf_save_fs.leaf.file.geometry.read(har_min_cnf_locs)
-            min_ene = har_cnf_save_fs.leaf.file.energy.read(har_min_cnf_locs)
+            har_geo = har_snap.geometry()
+            min_ene = har_snap.energy()
             if automol.geom.is_atom(har_geo):
                 # print('This is an atom')
                 mass = ptab.to_mass(har_geo[0][0])
                 spc_str = mess_io.writer.atom(
                     mass, elec_levels)
             else:
-                hess = har_cnf_save_fs.leaf.file.hessian.read(har_min_cnf_locs)
+                hess = har_snap.hessian()
                 freqs = elstruct.util.harmonic_frequencies(har_geo, hess, project=False)
                 hind_rot_str = ""
                 proj_rotors_str = ""
@@ -205,14 +168,13 @@ def species_block(
                     else:
                         print('No inf obj to identify torsional angles')
                         tors_names = []
-                    zma = tors_cnf_save_fs.leaf.file.zmatrix.read(tors_min_cnf_locs)
+                    zma = tors_snap.zmatrix()
 
-                    tors_geo = tors_cnf_save_fs.leaf.file.geometry.read(tors_min_cnf_locs)
+                    tors_geo = tors_snap.geometry()
                     gra = automol.zmatrix.graph(zma, remove_stereo=True)
                     coo_dct = automol.zmatrix.coordinates(zma, multi=False)
 
                     # prepare axis, group, and projection info
-                    scn_save_fs = autofile.fs.scan(tors_cnf_save_path)
                     ts_bnd = None
                     if saddle:
                         dist_name = spc_dct_i['dist_info'][0]
@@ -234,25 +196,12 @@ def species_block(
                     tors_sym_nums = list(automol.zmatrix.torsional_symmetry_numbers(
                         zma, tors_names, frm_bnd_key=frm_bnd_key, brk_bnd_key=brk_bnd_key))
                     idx = 0
-                    for tors_name, tors_grid, sym_num in zip(tors_names, tors_grids, tors_sym_nums):
-                        locs_lst = []
-                        enes = []
-                        for grid_val in tors_grid:
-                            locs_lst.append([[tors_name], [grid_val]])
-                        for locs in locs_lst:
-                            if scn_save_fs.leaf.exists(locs):
-                                enes.append(scn_save_fs.leaf.file.energy.read(locs))
-                            else:
-                                enes.append(10.)
-                                print('ERROR: missing grid value for torsional potential of {}'.format(spc_info[0]))
-
-                        enes = numpy.subtract(enes, min_ene)
-                        pot = list(enes*phycon.EH2KCAL)
-
-                        # Build a potential list from only successful calculations
-                        # print('pot in species block:', enes, pot)
-                        pot = _hrpot_spline_fitter(pot)
-
+                    rotors = []
+                    tors_pots = _tors_potentials(
+                        tors_names, tors_grids, tors_snap.scan_energy, min_ene,
+                        spc_info[0])
+                    for tors_name, sym_num, pot in zip(
+                            tors_names, tors_sym_nums, tors_pots):
                         axis = coo_dct[tors_name][1:3]
 
                         atm_key = axis[1]
@@ -349,51 +298,16 @@ def species_block(
                         #print('projrot 1 test:')
                         proj_rotors_str += projrot_io.writer.rotors(
                             axis, group, remdummy=remdummy)
+                        rotors.append((
+                            pot, sym_num, moldr.hindrot.reduced_moment(
+                                tors_geo, group, axis, remdummy=remdummy)))
                         sym_factor /= sym_num
                         idx += 1
 
-                    # create a messpf input file and run messpf to get tors_freqs and tors_zpes
+                    # solve the rotors for tors_freqs and tors_zpes
                     if saddle and tors_names is not None:
-                        dummy_freqs = [1000.]
-                        dummy_zpe = 0.0
-                        core = mess_io.writer.core_rigidrotor(tors_geo, sym_factor)
-                        spc_str = mess_io.writer.molecule(
-                            core, dummy_freqs, elec_levels,
-                            hind_rot=hind_rot_str,
-                            )
-                        temp_step = 100.
-                        ntemps = 5
-                        zpe_str = '{0:<8.2f}\n'.format(dummy_zpe)
-                        zpe_str = ' ZeroEnergy[kcal/mol] ' + zpe_str
-                        zpe_str += 'End\n'
-                        global_pf_str = mess_io.writer.global_pf(
-                            [], temp_step, ntemps, rel_temp_inc=0.001,
-                            atom_dist_min=0.6)
-                        spc_head_str = 'Species ' + ' Tmp'
-                        pf_inp_str = '\n'.join(
-                            [global_pf_str, spc_head_str,
-                             spc_str, zpe_str])
-
-                        bld_locs = ['PF', 0]
-                        bld_save_fs = autofile.fs.build(tors_save_path)
-                        bld_save_fs.leaf.create(bld_locs)
-                        pf_path = bld_save_fs.leaf.path(bld_locs)
-
-                        # run messpf
-                        with open(os.path.join(pf_path, 'pf.inp'), 'w') as pf_file:
-                            pf_file.write(pf_inp_str)
-                        pf_script_str = ("#!/usr/bin/env bash\n"
-                                         "export OMP_NUM_THREADS=10\n"
-                                         "messpf pf.inp pf.out >> stdout.log &> stderr.log")
-
-                        moldr.util.run_script(pf_script_str, pf_path)
-
-                        with open(os.path.join(pf_path, 'pf.log'), 'r') as mess_file:
-                            output_string = mess_file.read()
-
-                        # Read the freqs and zpes
-                        tors_freqs = mess_io.reader.tors.freqs(output_string)
-                        tors_zpes = mess_io.reader.tors.zpves(output_string)
+                        tors_freqs = moldr.hindrot.harmonic_frequencies(rotors)
+                        tors_zpes = moldr.hindrot.zero_point_energies(rotors)
                     else:
                         tors_freqs = []
                         tors_zpes = []
@@ -417,22 +331,17 @@ def species_block(
                     path = bld_save_fs.leaf.path(bld_locs)
                     print('Build Path for Partition Functions in species block')
                     print(path)
-                    proj_file_path = os.path.join(path, 'RPHt_input_data.dat')
-                    with open(proj_file_path, 'w') as proj_file:
-                        proj_file.write(projrot_inp_str)
-
-                    moldr.util.run_script(projrot_script_str, path)
+                    rtproj_out, hrproj_out = moldr.util.run_projrot(
+                        projrot_script_str, projrot_inp_str, path)
 
                     freqs = []
                     zpe_har_no_tors = 0.
                     har_zpe = 0.
                     if pot:
-                        rthrproj_freqs, _ = projrot_io.reader.rpht_output(
-                            path+'/hrproj_freq.dat')
+                        rthrproj_freqs, _ = hrproj_out
                         freqs = rthrproj_freqs
                         zpe_har_no_tors = sum(freqs)*phycon.WAVEN2KCAL/2.
-                    rtproj_freqs, imag_freq = projrot_io.reader.rpht_output(
-                        path+'/RTproj_freq.dat')
+                    rtproj_freqs, imag_freq = rtproj_out
                     har_zpe = sum(rtproj_freqs)*phycon.WAVEN2KCAL/2.
                     if not freqs:
                         freqs = rtproj_freqs
@@ -446,16 +355,15 @@ def species_block(
                     # now run the other version of ProjRot
                     projrot_script_str2 = ("#!/usr/bin/env bash\n"
                     "RPHt.exe >& /dev/null")
-                    moldr.util.run_script(projrot_script_str2, path)
+                    rtproj_out, hrproj_out = moldr.util.run_projrot(
+                        projrot_script_str2, projrot_inp_str, path)
                     zpe_har_no_tors_2 = 0.0
                     freqs_2 = []
                     if pot:
-                        rthrproj_freqs_2, _ = projrot_io.reader.rpht_output(
-                            path+'/hrproj_freq.dat')
+                        rthrproj_freqs_2, _ = hrproj_out
                         freqs_2 = rthrproj_freqs_2
                         zpe_har_no_tors_2 = sum(freqs_2)*phycon.WAVEN2KCAL/2.
-                    rtproj_freqs, imag_freq_2 = projrot_io.reader.rpht_output(
-                        path+'/RTproj_freq.dat')
+                    rtproj_freqs, imag_freq_2 = rtproj_out
                     har_zpe = sum(rtproj_freqs)*phycon.WAVEN2KCAL/2.
                     if not freqs_2:
                         freqs_2 = rtproj_freqs
@@ -506,15 +414,15 @@ def species_block(
         )
     elif vib_model == 'VPT2' and tors_model == 'RIGID':
         if anh_min_cnf_locs is not None:
-            anh_geo = anh_cnf_save_fs.leaf.file.geometry.read(anh_min_cnf_locs)
-            min_ene = anh_cnf_save_fs.leaf.file.energy.read(anh_min_cnf_locs)
+            anh_geo = anh_snap.geometry()
+            min_ene = anh_snap.energy()
             if automol.geom.is_atom(anh_geo):
                 # print('This is an atom')
                 mass = ptab.to_mass(anh_geo[0][0])
                 spc_str = mess_io.writer.atom(
                     mass, elec_levels)
             else:
-                hess = anh_cnf_save_fs.leaf.file.hessian.read(anh_min_cnf_locs)
+                hess = anh_snap.hessian()
                 freqs = elstruct.util.harmonic_frequencies(anh_geo, hess, project=True)
                 mode_start = 6
                 if 'ts_' in spc:
@@ -648,19 +556,14 @@ def vtst_with_no_saddle_block(
             path = bld_save_fs.leaf.path(bld_locs)
             print('Build Path for Partition Functions')
             print(path)
-            proj_file_path = os.path.join(path, 'RPHt_input_data.dat')
-            with open(proj_file_path, 'w') as proj_file:
-                proj_file.write(projrot_inp_str)
-
-            moldr.util.run_script(projrot_script_str, path)
+            rtproj_out, hrproj_out = moldr.util.run_projrot(
+                projrot_script_str, projrot_inp_str, path)
 
             freqs = []
             if len(pot) > 0:
-                rthrproj_freqs, _ = projrot_io.reader.rpht_output(
-                    path+'/hrproj_freq.dat')
+                rthrproj_freqs, _ = hrproj_out
                 freqs = rthrproj_freqs
-            rtproj_freqs, imag_freq = projrot_io.reader.rpht_output(
-                path+'/RTproj_freq.dat')
+            rtproj_freqs, imag_freq = rtproj_out
             if not freqs:
                 freqs = rtproj_freqs
                 if not imag_freq:
@@ -994,24 +897,11 @@ def pst_block(
                         for name, linspace in zip(tors_names, tors_linspaces)]
                     tors_sym_nums = list(automol.zmatrix.torsional_symmetry_numbers(
                         zma, tors_names))
-                    for tors_name, tors_grid, sym_num in zip(tors_names, tors_grids, tors_sym_nums):
-                        locs_lst = []
-                        enes = []
-                        for grid_val in tors_grid:
-                            locs_lst.append([[tors_name], [grid_val]])
-                        for locs in locs_lst:
-                            if scn_save_fs.leaf.exists(locs):
-                                enes.append(scn_save_fs.leaf.file.energy.read(locs))
-                            else:
-                                enes.append(10.)
-                                print('ERROR: missing grid value for torsional potential of {}'
-                                      .format(spc_info_i[0]))
-                        enes = numpy.subtract(enes, min_ene_i)
-                        pot = list(enes*phycon.EH2KCAL)
-
-                        # Build a potential list from only successful calculations
-                        pot = _hrpot_spline_fitter(pot)
-
+                    tors_pots = _tors_potentials(
+                        tors_names, tors_grids, _scan_energy_reader(scn_save_fs),
+                        min_ene_i, spc_info_i[0])
+                    for tors_name, sym_num, pot in zip(
+                            tors_names, tors_sym_nums, tors_pots):
                         axis = coo_dct[tors_name][1:3]
 
                         atm_key = axis[1]
@@ -1072,20 +962,15 @@ def pst_block(
                     path = bld_save_fs.leaf.path(bld_locs)
                     print('Build Path for Partition Functions')
                     print(path)
-                    proj_file_path = os.path.join(path, 'RPHt_input_data.dat')
-                    with open(proj_file_path, 'w') as proj_file:
-                        proj_file.write(projrot_inp_str)
-
-                    moldr.util.run_script(projrot_script_str, path)
+                    rtproj_out, hrproj_out = moldr.util.run_projrot(
+                        projrot_script_str, projrot_inp_str, path)
 
                     freqs_i = []
                     if pot:
-                        rthrproj_freqs, _ = projrot_io.reader.rpht_output(
-                            path+'/hrproj_freq.dat')
+                        rthrproj_freqs, _ = hrproj_out
                         freqs_i = rthrproj_freqs
                     if not freqs_i:
-                        rtproj_freqs, _ = projrot_io.reader.rpht_output(
-                            path+'/RTproj_freq.dat')
+                        rtproj_freqs, _ = rtproj_out
                         freqs_i = rtproj_freqs
 
                 proj_rotors_str = ""
@@ -1119,24 +1004,11 @@ def pst_block(
                         for name, linspace in zip(tors_names, tors_linspaces)]
                     tors_sym_nums = list(automol.zmatrix.torsional_symmetry_numbers(
                         zma, tors_names))
-                    for tors_name, tors_grid, sym_num in zip(tors_names, tors_grids, tors_sym_nums):
-                        locs_lst = []
-                        enes = []
-                        for grid_val in tors_grid:
-                            locs_lst.append([[tors_name], [grid_val]])
-                        for locs in locs_lst:
-                            if scn_save_fs.leaf.exists(locs):
-                                enes.append(scn_save_fs.leaf.file.energy.read(locs))
-                            else:
-                                enes.append(10.)
-                                print('ERROR: missing grid value for torsional potential of {}'
-                                      .format(spc_info_j[0]))
-                        enes = numpy.subtract(enes, min_ene_j)
-                        pot = list(enes*phycon.EH2KCAL)
-
-                        # Build a potential list from only successful calculations
-                        pot = _hrpot_spline_fitter(pot)
-
+                    tors_pots = _tors_potentials(
+                        tors_names, tors_grids, _scan_energy_reader(scn_save_fs),
+                        min_ene_j, spc_info_j[0])
+                    for tors_name, sym_num, pot in zip(
+                            tors_names, tors_sym_nums, tors_pots):
                         axis = coo_dct[tors_name][1:3]
 
                         atm_key = axis[1]
@@ -1190,20 +1062,15 @@ def pst_block(
                     path = bld_save_fs.leaf.path(bld_locs)
                     print('Build Path for Partition Functions')
                     print(path)
-                    proj_file_path = os.path.join(path, 'RPHt_input_data.dat')
-                    with open(proj_file_path, 'w') as proj_file:
-                        proj_file.write(projrot_inp_str)
-
-                    moldr.util.run_script(projrot_script_str, path)
+                    rtproj_out, hrproj_out = moldr.util.run_projrot(
+                        projrot_script_str, projrot_inp_str, path)
 
                     freqs_j = []
                     if pot:
-                        rthrproj_freqs, _ = projrot_io.reader.rpht_output(
-                            path+'/hrproj_freq.dat')
+                        rthrproj_freqs, _ = hrproj_out
                         freqs_j = rthrproj_freqs
                     if not freqs_j:
-                        rtproj_freqs, imag_freq = projrot_io.reader.rpht_output(
-                            path+'/RTproj_freq.dat')
+                        rtproj_freqs, imag_freq = rtproj_out
                         freqs_j = rtproj_freqs
 
                 freqs = list(freqs_i) + list(freqs_j)
@@ -1238,62 +1105,35 @@ def fake_species_block(
     tors_model, vib_model, sym_model = spc_model
 
     # prepare the four sets of file systems
-    orb_restr = moldr.util.orbital_restriction(
-        spc_info_i, har_level)
-    har_levelp_i = har_level[0:3]
-    har_levelp_i.append(orb_restr)
-    thy_save_fs_i = autofile.fs.theory(save_prefix_i)
-    orb_restr = moldr.util.orbital_restriction(
-        spc_info_j, har_level)
-    har_levelp_j = har_level[0:3]
-    har_levelp_j.append(orb_restr)
-    thy_save_fs_j = autofile.fs.theory(save_prefix_j)
-
-    # thy_save_fs.leaf.create(har_levelp[1:4])
-    har_save_path_i = thy_save_fs_i.leaf.path(har_levelp_i[1:4])
-    har_save_path_j = thy_save_fs_j.leaf.path(har_levelp_j[1:4])
-    har_cnf_save_fs_i = autofile.fs.conformer(har_save_path_i)
-    har_cnf_save_fs_j = autofile.fs.conformer(har_save_path_j)
-    har_min_cnf_locs_i = moldr.util.min_energy_conformer_locators(har_cnf_save_fs_i)
-    har_min_cnf_locs_j = moldr.util.min_energy_conformer_locators(har_cnf_save_fs_j)
+    har_snap_i = moldr.util.level_snapshot(
+        spc_info_i, har_level, save_prefix_i)
+    har_snap_j = moldr.util.level_snapshot(
+        spc_info_j, har_level, save_prefix_j)
+    har_cnf_save_fs_i = har_snap_i.cnf_save_fs
+    har_cnf_save_fs_j = har_snap_j.cnf_save_fs
+    har_min_cnf_locs_i = har_snap_i.min_cnf_locs
+    har_min_cnf_locs_j = har_snap_j.min_cnf_locs
 
     if sym_level:
-        orb_restr = moldr.util.orbital_restriction(
-            spc_info_i, sym_level)
-        sym_levelp_i = sym_level[0:3]
-        sym_levelp_i.append(orb_restr)
-        sym_save_path_i = thy_save_fs_i.leaf.path(sym_levelp_i[1:4])
-        sym_cnf_save_fs_i = autofile.fs.conformer(sym_save_path_i)
-        sym_min_cnf_locs_i = moldr.util.min_energy_conformer_locators(sym_cnf_save_fs_i)
+        sym_snap_i = moldr.util.level_snapshot(
+            spc_info_i, sym_level, save_prefix_i)
+        sym_cnf_save_fs_i = sym_snap_i.cnf_save_fs
 
-        orb_restr = moldr.util.orbital_restriction(
-            spc_info_j, sym_level)
-        sym_levelp_j = sym_level[0:3]
-        sym_levelp_j.append(orb_restr)
-        sym_save_path_j = thy_save_fs_j.leaf.path(sym_levelp_j[1:4])
-        sym_cnf_save_fs_j = autofile.fs.conformer(sym_save_path_j)
-        sym_min_cnf_locs_j = moldr.util.min_energy_conformer_locators(sym_cnf_save_fs_j)
+        sym_snap_j = moldr.util.level_snapshot(
+            spc_info_j, sym_level, save_prefix_j)
+        sym_cnf_save_fs_j = sym_snap_j.cnf_save_fs
 
     tors_names = []
     if tors_level:
-        orb_restr = moldr.util.orbital_restriction(
-            spc_info_i, tors_level)
-        tors_levelp_i = tors_level[0:3]
-        tors_levelp_i.append(orb_restr)
-        orb_restr = moldr.util.orbital_restriction(
-            spc_info_j, tors_level)
-        tors_levelp_j = tors_level[0:3]
-        tors_levelp_j.append(orb_restr)
+        tors_snap_i = moldr.util.level_snapshot(
+            spc_info_i, tors_level, save_prefix_i)
+        tors_save_path_i = tors_snap_i.save_path
+        tors_min_cnf_locs_i = tors_snap_i.min_cnf_locs
 
-        tors_save_path_i = thy_save_fs_i.leaf.path(tors_levelp_i[1:4])
-        tors_cnf_save_fs_i = autofile.fs.conformer(tors_save_path_i)
-        tors_min_cnf_locs_i = moldr.util.min_energy_conformer_locators(tors_cnf_save_fs_i)
-        tors_cnf_save_path_i = tors_cnf_save_fs_i.leaf.path(tors_min_cnf_locs_i)
-
-        tors_save_path_j = thy_save_fs_j.leaf.path(tors_levelp_j[1:4])
-        tors_cnf_save_fs_j = autofile.fs.conformer(tors_save_path_j)
-        tors_min_cnf_locs_j = moldr.util.min_energy_conformer_locators(tors_cnf_save_fs_j)
-        tors_cnf_save_path_j = tors_cnf_save_fs_j.leaf.path(tors_min_cnf_locs_j)
+        tors_snap_j = moldr.util.level_snapshot(
+            spc_info_j, tors_level, save_prefix_j)
+        tors_save_path_j = tors_snap_j.save_path
+        tors_min_cnf_locs_j = tors_snap_j.min_cnf_locs
 
     spc_str = ''
     if 'elec_levs' in spc_dct_i:
@@ -1334,8 +1174,8 @@ def fake_species_block(
         sym_factor_i = spc_dct_i['sym']
     else:
         if sym_model == 'SAMPLING':
-            sym_geo_i = sym_cnf_save_fs_i.leaf.file.geometry.read(sym_min_cnf_locs_i)
-            sym_ene_i = sym_cnf_save_fs_i.leaf.file.energy.read(sym_min_cnf_locs_i)
+            sym_geo_i = sym_snap_i.geometry()
+            sym_ene_i = sym_snap_i.energy()
             sym_factor_i = moldr.conformer.symmetry_factor(sym_geo_i, sym_ene_i, sym_cnf_save_fs_i)
         if sym_model == '1DHR':
             # Warning: the 1DHR based symmetry number has not yet been set up
@@ -1344,8 +1184,8 @@ def fake_species_block(
         sym_factor_j = spc_dct_j['sym']
     else:
         if sym_model == 'SAMPLING':
-            sym_geo_j = sym_cnf_save_fs_j.leaf.file.geometry.read(sym_min_cnf_locs_j)
-            sym_ene_j = sym_cnf_save_fs_j.leaf.file.energy.read(sym_min_cnf_locs_j)
+            sym_geo_j = sym_snap_j.geometry()
+            sym_ene_j = sym_snap_j.energy()
             sym_factor_j = moldr.conformer.symmetry_factor(sym_geo_j, sym_ene_j, sym_cnf_save_fs_j)
         if sym_model == '1DHR':
             # Warning: the 1DHR based symmetry number has not yet been set up
@@ -1354,9 +1194,9 @@ def fake_species_block(
 
     if vib_model == 'HARM' and tors_model == 'RIGID':
         if har_min_cnf_locs_i is not None:
-            har_geo_i = har_cnf_save_fs_i.leaf.file.geometry.read(har_min_cnf_locs_i)
+            har_geo_i = har_snap_i.geometry()
             if har_min_cnf_locs_j is not None:
-                har_geo_j = har_cnf_save_fs_j.leaf.file.geometry.read(har_min_cnf_locs_j)
+                har_geo_j = har_snap_j.geometry()
 
                 freqs = [30, 50, 70, 100, 200]
                 ntrans = 5
@@ -1376,14 +1216,14 @@ def fake_species_block(
                     ntrans = 0
                 freqs = freqs[0:ntrans]
                 if not is_atom_i:
-                    hess_i = har_cnf_save_fs_i.leaf.file.hessian.read(har_min_cnf_locs_i)
+                    hess_i = har_snap_i.hessian()
                     freqs_i = elstruct.util.harmonic_frequencies(har_geo_i, hess_i, project=False)
                     mode_start = 6
                     if automol.geom.is_linear(har_geo_i):
                         mode_start = mode_start - 1
                     freqs += freqs_i[mode_start:]
                 if not is_atom_j:
-                    hess_j = har_cnf_save_fs_j.leaf.file.hessian.read(har_min_cnf_locs_j)
+                    hess_j = har_snap_j.hessian()
                     freqs_j = elstruct.util.harmonic_frequencies(har_geo_j, hess_j, project=False)
                     mode_start = 6
                     if automol.geom.is_linear(har_geo_j):
@@ -1408,11 +1248,11 @@ def fake_species_block(
 
     if vib_model == 'HARM' and tors_model == '1DHR':
         if har_min_cnf_locs_i is not None:
-            har_geo_i = har_cnf_save_fs_i.leaf.file.geometry.read(har_min_cnf_locs_i)
-            min_ene_i = har_cnf_save_fs_i.leaf.file.energy.read(har_min_cnf_locs_i)
+            har_geo_i = har_snap_i.geometry()
+            min_ene_i = har_snap_i.energy()
             if har_min_cnf_locs_j is not None:
-                har_geo_j = har_cnf_save_fs_j.leaf.file.geometry.read(har_min_cnf_locs_j)
-                min_ene_j = har_cnf_save_fs_j.leaf.file.energy.read(har_min_cnf_locs_j)
+                har_geo_j = har_snap_j.geometry()
+                min_ene_j = har_snap_j.energy()
                 har_geo_js = har_geo_j
 
                 freqs_trans = [30, 50, 70, 100, 200]
@@ -1435,14 +1275,14 @@ def fake_species_block(
                 freqs_i = []
                 freqs_j = []
                 if not is_atom_i:
-                    hess_i = har_cnf_save_fs_i.leaf.file.hessian.read(har_min_cnf_locs_i)
+                    hess_i = har_snap_i.hessian()
                     freqs_i = elstruct.util.harmonic_frequencies(har_geo_i, hess_i, project=False)
                     mode_start = 6
                     if automol.geom.is_linear(har_geo_i):
                         mode_start = mode_start - 1
                     freqs_i = freqs_i[mode_start:]
                 if not is_atom_j:
-                    hess_j = har_cnf_save_fs_j.leaf.file.hessian.read(har_min_cnf_locs_j)
+                    hess_j = har_snap_j.hessian()
                     freqs_j = elstruct.util.harmonic_frequencies(har_geo_j, hess_j, project=False)
                     mode_start = 6
                     if automol.geom.is_linear(har_geo_j):
@@ -1468,14 +1308,13 @@ def fake_species_block(
                     else:
                         print('No inf obj to identify torsional angles')
                         tors_names = []
-                    zma = tors_cnf_save_fs_i.leaf.file.zmatrix.read(tors_min_cnf_locs_i)
+                    zma = tors_snap_i.zmatrix()
 
-                    tors_geo = tors_cnf_save_fs_i.leaf.file.geometry.read(tors_min_cnf_locs_i)
+                    tors_geo = tors_snap_i.geometry()
                     gra = automol.zmatrix.graph(zma, remove_stereo=True)
                     coo_dct = automol.zmatrix.coordinates(zma, multi=False)
 
                     # prepare axis, group, and projection info
-                    scn_save_fs = autofile.fs.scan(tors_cnf_save_path_i)
                     pot = []
                     if 'hind_inc' in spc_dct_i:
                         scan_increment = spc_dct_i['hind_inc']
@@ -1490,23 +1329,11 @@ def fake_species_block(
                     tors_sym_nums = list(automol.zmatrix.torsional_symmetry_numbers(
                         zma, tors_names))
                     #print('fb tors_names test:', tors_names)
-                    for tors_name, tors_grid, sym_num in zip(tors_names, tors_grids, tors_sym_nums):
-                        locs_lst = []
-                        enes = []
-                        for grid_val in tors_grid:
-                            locs_lst.append([[tors_name], [grid_val]])
-                        for locs in locs_lst:
-                            if scn_save_fs.leaf.exists(locs):
-                                enes.append(scn_save_fs.leaf.file.energy.read(locs))
-                            else:
-                                enes.append(10.)
-                                print('ERROR: missing grid value for torsional potential of {}'
-                                      .format(spc_info_i[0]))
-                        enes = numpy.subtract(enes, min_ene_i)
-                        pot = list(enes*phycon.EH2KCAL)
-
-                        # Build a potential list from only successful calculations
-                        pot = _hrpot_spline_fitter(pot)
+                    tors_pots = _tors_potentials(
+                        tors_names, tors_grids, tors_snap_i.scan_energy, min_ene_i,
+                        spc_info_i[0])
+                    for tors_name, sym_num, pot in zip(
+                            tors_names, tors_sym_nums, tors_pots):
                         # print('fb pot test:', pot)
 
                         axis = coo_dct[tors_name][1:3]
@@ -1569,20 +1396,15 @@ def fake_species_block(
                     path = bld_save_fs.leaf.path(bld_locs)
                     print('Build Path for Partition Functions')
                     print(path)
-                    proj_file_path = os.path.join(path, 'RPHt_input_data.dat')
-                    with open(proj_file_path, 'w') as proj_file:
-                        proj_file.write(projrot_inp_str)
-
-                    moldr.util.run_script(projrot_script_str, path)
+                    rtproj_out, hrproj_out = moldr.util.run_projrot(
+                        projrot_script_str, projrot_inp_str, path)
 
                     freqs_i = []
                     if pot:
-                        rthrproj_freqs, _ = projrot_io.reader.rpht_output(
-                            path+'/hrproj_freq.dat')
+                        rthrproj_freqs, _ = hrproj_out
                         freqs_i = rthrproj_freqs
                     if not freqs_i:
-                        rtproj_freqs, _ = projrot_io.reader.rpht_output(
-                            path+'/RTproj_freq.dat')
+                        rtproj_freqs, _ = rtproj_out
                         freqs_i = rtproj_freqs
 
                 proj_rotors_str = ""
@@ -1595,14 +1417,13 @@ def fake_species_block(
                     else:
                         print('No inf obj to identify torsional angles')
                         tors_names = []
-                    zma = tors_cnf_save_fs_j.leaf.file.zmatrix.read(tors_min_cnf_locs_j)
+                    zma = tors_snap_j.zmatrix()
 
-                    tors_geo = tors_cnf_save_fs_j.leaf.file.geometry.read(tors_min_cnf_locs_j)
+                    tors_geo = tors_snap_j.geometry()
                     gra = automol.zmatrix.graph(zma, remove_stereo=True)
                     coo_dct = automol.zmatrix.coordinates(zma, multi=False)
 
                     # prepare axis, group, and projection info
-                    scn_save_fs = autofile.fs.scan(tors_cnf_save_path_j)
                     pot = []
                     if 'hind_inc' in spc_dct_j:
                         scan_increment = spc_dct_j['hind_inc']
@@ -1616,24 +1437,11 @@ def fake_species_block(
                         for name, linspace in zip(tors_names, tors_linspaces)]
                     tors_sym_nums = list(automol.zmatrix.torsional_symmetry_numbers(
                         zma, tors_names))
-                    for tors_name, tors_grid, sym_num in zip(tors_names, tors_grids, tors_sym_nums):
-                        locs_lst = []
-                        enes = []
-                        for grid_val in tors_grid:
-                            locs_lst.append([[tors_name], [grid_val]])
-                        for locs in locs_lst:
-                            if scn_save_fs.leaf.exists(locs):
-                                enes.append(scn_save_fs.leaf.file.energy.read(locs))
-                            else:
-                                enes.append(10.)
-                                print('ERROR: missing grid value for torsional potential of {}'
-                                      .format(spc_info_j[0]))
-                        enes = numpy.subtract(enes, min_ene_j)
-                        pot = list(enes*phycon.EH2KCAL)
-
-                        # Build a potential list from only successful calculations
-                        pot = _hrpot_spline_fitter(pot)
-
+                    tors_pots = _tors_potentials(
+                        tors_names, tors_grids, tors_snap_j.scan_energy, min_ene_j,
+                        spc_info_j[0])
+                    for tors_name, sym_num, pot in zip(
+                            tors_names, tors_sym_nums, tors_pots):
                         axis = coo_dct[tors_name][1:3]
 
                         atm_key = axis[1]
@@ -1687,20 +1495,15 @@ def fake_species_block(
                     path = bld_save_fs.leaf.path(bld_locs)
                     print('Build Path for Partition Functions')
                     print(path)
-                    proj_file_path = os.path.join(path, 'RPHt_input_data.dat')
-                    with open(proj_file_path, 'w') as proj_file:
-                        proj_file.write(projrot_inp_str)
-
-                    moldr.util.run_script(projrot_script_str, path)
+                    rtproj_out, hrproj_out = moldr.util.run_projrot(
+                        projrot_script_str, projrot_inp_str, path)
 
                     freqs_j = []
                     if pot:
-                        rthrproj_freqs, _ = projrot_io.reader.rpht_output(
-                            path+'/hrproj_freq.dat')
+                        rthrproj_freqs, _ = hrproj_out
                         freqs_j = rthrproj_freqs
                     if not freqs_j:
-                        rtproj_freqs, imag_freq = projrot_io.reader.rpht_output(
-                            path+'/RTproj_freq.dat')
+                        rtproj_freqs, imag_freq = rtproj_out
                         freqs_j = rtproj_freqs
 
                 #print('freq_trans test:', freqs_trans)
@@ -1778,25 +1581,15 @@ def get_zero_point_energy(
     har_level, tors_level, vpt2_level, _ = pf_levels
     tors_model, vib_model, _ = spc_model
 
-    thy_save_fs = autofile.fs.theory(save_prefix)
-
-    orb_restr = moldr.util.orbital_restriction(
-        spc_info, har_level)
-    har_levelp = har_level[0:3]
-    har_levelp.append(orb_restr)
-
-    har_save_path = thy_save_fs.leaf.path(har_levelp[1:4])
     saddle = False
     if 'ts_' in spc:
-        har_save_fs = autofile.fs.ts(har_save_path)
-        har_save_fs.trunk.create()
-        har_save_path = har_save_fs.trunk.path()
         saddle = True
 
     # print('inside zpe saddle is:', saddle)
-    har_cnf_save_fs = autofile.fs.conformer(har_save_path)
-    har_min_cnf_locs = moldr.util.min_energy_conformer_locators(har_cnf_save_fs)
-    
+    har_snap = moldr.util.level_snapshot(
+        spc_info, har_level, save_prefix, saddle=saddle)
+    har_min_cnf_locs = har_snap.min_cnf_locs
+
     # Set boolean to account for a radical radical reaction (not supported by vtst)
     rad_rad_ts = False
     rad_rad_ts_ls = False
@@ -1807,39 +1600,16 @@ def get_zero_point_energy(
                 rad_rad_ts_ls = True
 
     if tors_level and not rad_rad_ts_ls:
-        orb_restr = moldr.util.orbital_restriction(
-            spc_info, tors_level)
-        tors_levelp = tors_level[0:3]
-        tors_levelp.append(orb_restr)
-
-        # thy_save_fs.leaf.create(tors_levelp[1:4])
-        tors_save_path = thy_save_fs.leaf.path(tors_levelp[1:4])
-        if 'ts_' in spc:
-            tors_save_fs = autofile.fs.ts(tors_save_path)
-            tors_save_fs.trunk.create()
-            tors_save_path = tors_save_fs.trunk.path()
-
-        tors_cnf_save_fs = autofile.fs.conformer(tors_save_path)
-        tors_min_cnf_locs = moldr.util.min_energy_conformer_locators(tors_cnf_save_fs)
-        # print('tors_save_path test:', tors_save_path)
-        # print('tors_min_cnf_locs test:', tors_min_cnf_locs)
-        if tors_min_cnf_locs:
-            tors_cnf_save_path = tors_cnf_save_fs.leaf.path(tors_min_cnf_locs)
+        tors_snap = moldr.util.level_snapshot(
+            spc_info, tors_level, save_prefix, saddle=saddle)
+        tors_save_path = tors_snap.save_path
+        tors_cnf_save_fs = tors_snap.cnf_save_fs
+        tors_min_cnf_locs = tors_snap.min_cnf_locs
 
     if vpt2_level:
-        orb_restr = moldr.util.orbital_restriction(
-            spc_info, vpt2_level)
-        vpt2_levelp = vpt2_level[0:3]
-        vpt2_levelp.append(orb_restr)
-
-        anh_save_path = thy_save_fs.leaf.path(vpt2_levelp[1:4])
-        if 'ts_' in spc:
-            anh_save_fs = autofile.fs.ts(anh_save_path)
-            anh_save_fs.trunk.create()
-            anh_save_path = anh_save_fs.trunk.path()
-
-        anh_cnf_save_fs = autofile.fs.conformer(anh_save_path)
-        anh_min_cnf_locs = moldr.util.min_energy_conformer_locators(anh_cnf_save_fs)
+        anh_snap = moldr.util.level_snapshot(
+            spc_info, vpt2_level, save_prefix, saddle=saddle)
+        anh_min_cnf_locs = anh_snap.min_cnf_locs
 
     if saddle:
         frm_bnd_key = spc_dct_i['frm_bnd_key']
@@ -1854,14 +1624,14 @@ def get_zero_point_energy(
     if not har_min_cnf_locs:
         print('ERROR: No harmonic reference geometry for this species {}'.format(spc_info[0]))
         return har_zpe, is_atom, ncons
-    har_geo = har_cnf_save_fs.leaf.file.geometry.read(har_min_cnf_locs)
+    har_geo = har_snap.geometry()
     if automol.geom.is_atom(har_geo):
         har_zpe = 0.0
         is_atom = True
         ncons = 0
 
     else:
-        hess = har_cnf_save_fs.leaf.file.hessian.read(har_min_cnf_locs)
+        hess = har_snap.hessian()
         freqs = elstruct.util.harmonic_frequencies(har_geo, hess, project=False)
 
         mode_start = 6
@@ -1890,13 +1660,12 @@ def get_zero_point_energy(
         # modify har_zpe
 
         zpe = har_zpe
-        hind_rot_str = ""
         proj_rotors_str = ""
         # print('tors_min_cnf_locs:', tors_min_cnf_locs)
         tors_names = []
         if tors_min_cnf_locs is not None:
             if tors_cnf_save_fs.trunk.file.info.exists():
-                inf_obj_s = har_cnf_save_fs.trunk.file.info.read()
+                inf_obj_s = tors_cnf_save_fs.trunk.file.info.read()
                 tors_ranges = inf_obj_s.tors_ranges
                 tors_ranges = autofile.info.dict_(tors_ranges)
                 #print(tors_ranges)
@@ -1905,14 +1674,13 @@ def get_zero_point_energy(
             else:
                 print('No inf obj to identify torsional angles')
 
-            min_ene = tors_cnf_save_fs.leaf.file.energy.read(tors_min_cnf_locs)
-            tors_geo = tors_cnf_save_fs.leaf.file.geometry.read(tors_min_cnf_locs)
-            zma = tors_cnf_save_fs.leaf.file.zmatrix.read(tors_min_cnf_locs)
+            min_ene = tors_snap.energy()
+            tors_geo = tors_snap.geometry()
+            zma = tors_snap.zmatrix()
             gra = automol.zmatrix.graph(zma, remove_stereo=True)
             tors_zpe_cor = 0.0
             coo_dct = automol.zmatrix.coordinates(zma, multi=False)
             # prepare axis, group, info
-            scn_save_fs = autofile.fs.scan(tors_cnf_save_path)
             ts_bnd = None
             if saddle:
                 dist_name = spc_dct_i['dist_info'][0]
@@ -1933,25 +1701,12 @@ def get_zero_point_energy(
                 zma, tors_names, frm_bnd_key=frm_bnd_key, brk_bnd_key=brk_bnd_key))
             # print('tors_names:', tors_names)
             if tors_names:
-                for tors_name, tors_grid, sym_num in zip(tors_names, tors_grids, tors_sym_nums):
-                    locs_lst = []
-                    enes = []
-                    for grid_val in tors_grid:
-                        locs_lst.append([[tors_name], [grid_val]])
-                    for locs in locs_lst:
-                        if scn_save_fs.leaf.exists(locs):
-                            enes.append(scn_save_fs.leaf.file.energy.read(locs))
-                        else:
-                            enes.append(10.)
-                            print('ERROR: missing grid value for torsional potential of {}'.
-                                  format(spc_info[0]))
-                    enes = numpy.subtract(enes, min_ene)
-                    pot = list(enes*phycon.EH2KCAL)
-
-                    # Build a potential list from only successful calculations
-                    # print('pot test in zpe:', pot)
-                    pot = _hrpot_spline_fitter(pot)
-
+                rotors = []
+                tors_pots = _tors_potentials(
+                    tors_names, tors_grids, tors_snap.scan_energy, min_ene,
+                    spc_info[0])
+                for tors_name, sym_num, pot in zip(
+                        tors_names, tors_sym_nums, tors_pots):
                     axis = coo_dct[tors_name][1:3]
                     atm_key = axis[1]
                     if ts_bnd:
@@ -2043,12 +1798,12 @@ def get_zero_point_energy(
                             if dummy < idx:
                                 remdummy[idx] += 1
 
-                    hind_rot_str += mess_io.writer.rotor_hindered(
-                        group, axis, sym_num, pot, remdummy=remdummy)
-
                     #print('projrot 1 test:')
                     proj_rotors_str += projrot_io.writer.rotors(
                         axis, group, remdummy=remdummy)
+                    rotors.append((
+                        pot, sym_num, moldr.hindrot.reduced_moment(
+                            tors_geo, group, axis, remdummy=remdummy)))
                     sym_factor /= sym_num
 
                 # Write the string for the ProjRot input
@@ -2065,69 +1820,30 @@ def get_zero_point_energy(
                 path = bld_save_fs.leaf.path(bld_locs)
                 print('Build Path for Partition Functions')
                 print(path)
-                proj_file_path = os.path.join(path, 'RPHt_input_data.dat')
-                with open(proj_file_path, 'w') as proj_file:
-                    proj_file.write(projrot_inp_str)
-
-                moldr.util.run_script(projrot_script_str, path)
+                _, hrproj_out = moldr.util.run_projrot(
+                    projrot_script_str, projrot_inp_str, path)
 
                 zpe_har_no_tors = har_zpe
                 if pot:
-                    rthrproj_freqs, _ = projrot_io.reader.rpht_output(
-                        path+'/hrproj_freq.dat')
+                    rthrproj_freqs, _ = hrproj_out
                     freqs = rthrproj_freqs
                     zpe_har_no_tors = sum(freqs)*phycon.WAVEN2KCAL/2.
 
                 # now try again with the other projrot parameters
                 projrot_script_str2 = ("#!/usr/bin/env bash\n"
                 "RPHt.exe >& /dev/null")
-                moldr.util.run_script(projrot_script_str2, path)
+                _, hrproj_out = moldr.util.run_projrot(
+                    projrot_script_str2, projrot_inp_str, path)
                 zpe_har_no_tors_2 = har_zpe
                 freqs_2 = []
                 if pot:
-                    rthrproj_freqs_2, _ = projrot_io.reader.rpht_output(
-                        path+'/hrproj_freq.dat')
+                    rthrproj_freqs_2, _ = hrproj_out
                     freqs_2 = rthrproj_freqs_2
                     zpe_har_no_tors_2 = sum(freqs_2)*phycon.WAVEN2KCAL/2.
 
-                dummy_freqs = [1000.]
-                dummy_zpe = 0.0
-                core = mess_io.writer.core_rigidrotor(tors_geo, sym_factor)
-                spc_str = mess_io.writer.molecule(
-                    core, dummy_freqs, elec_levels,
-                    hind_rot=hind_rot_str,
-                    )
-
-                # create a messpf input file
-                temp_step = 100.
-                ntemps = 5
-                zpe_str = '{0:<8.2f}\n'.format(dummy_zpe)
-                zpe_str = ' ZeroEnergy[kcal/mol] ' + zpe_str
-                zpe_str += 'End\n'
-                global_pf_str = mess_io.writer.global_pf(
-                    [], temp_step, ntemps, rel_temp_inc=0.001,
-                    atom_dist_min=0.6)
-                spc_head_str = 'Species ' + ' Tmp'
-                pf_inp_str = '\n'.join(
-                    [global_pf_str, spc_head_str,
-                     spc_str, zpe_str])
-
-                bld_locs = ['PF', 0]
-                bld_save_fs = autofile.fs.build(tors_save_path)
-                bld_save_fs.leaf.create(bld_locs)
-                pf_path = bld_save_fs.leaf.path(bld_locs)
-
-                # run messpf
-                with open(os.path.join(pf_path, 'pf.inp'), 'w') as pf_file:
-                    pf_file.write(pf_inp_str)
-                moldr.util.run_script(pf_script_str, pf_path)
-
-                with open(os.path.join(pf_path, 'pf.log'), 'r') as mess_file:
-                    output_string = mess_file.read()
-
-                # Read the freqs and zpes
-                tors_freqs = mess_io.reader.tors.freqs(output_string)
-                tors_zpes = mess_io.reader.tors.zpves(output_string)
+                # solve the rotors for the torsional freqs and zpes
+                tors_freqs = moldr.hindrot.harmonic_frequencies(rotors)
+                tors_zpes = moldr.hindrot.zero_point_energies(rotors)
                 tors_zpe_cor = 0.0
                 tors_zpe = 0.0
                 for (tors_freq, tors_1dhr_zpe) in zip(tors_freqs, tors_zpes):
@@ -2165,15 +1881,10 @@ def get_zero_point_energy(
 
     elif vib_model == 'VPT2' and tors_model == 'RIGID':
         if anh_min_cnf_locs is not None:
-            anh_geo = anh_cnf_save_fs.leaf.file.geometry.read(anh_min_cnf_locs)
-            min_ene = anh_cnf_save_fs.leaf.file.energy.read(anh_min_cnf_locs)
-            if automol.geom.is_atom(anh_geo):
-                # print('This is an atom')
-                mass = ptab.to_mass(anh_geo[0][0])
-                spc_str = mess_io.writer.atom(
-                    mass, elec_levels)
-            else:
-                hess = anh_cnf_save_fs.leaf.file.hessian.read(anh_min_cnf_locs)
+            anh_geo = anh_snap.geometry()
+            min_ene = anh_snap.energy()
+            if not automol.geom.is_atom(anh_geo):
+                hess = anh_snap.hessian()
                 freqs = elstruct.util.harmonic_frequencies(anh_geo, hess, project=True)
                 if automol.geom.is_linear(anh_geo):
                     proj_freqs = freqs[5:]
@@ -2181,15 +1892,6 @@ def get_zero_point_energy(
                     proj_freqs = freqs[6:]
 
                 zpe = sum(proj_freqs)*phycon.WAVEN2KCAL/2.
-                hind_rot_str = ""
-
-                core = mess_io.writer.core_rigidrotor(anh_geo, sym_factor)
-                spc_str = mess_io.writer.molecule(
-                    core, proj_freqs, elec_levels,
-                    hind_rot=hind_rot_str,
-                    )
-        else:
-            spc_str = ''
         print('VPT2 and RIGID combination is not yet properly implemented')
 
     elif vib_model == 'VPT2' and tors_model == '1DHR':
@@ -2263,74 +1965,101 @@ def tau_pf_write(
             print(sumq/float(idx), sigma, 100.*sigma*float(idx)/sumq, idx)
 
 
-def _hrpot_spline_fitter(pot, thresh=-0.05):
-    """ Get a physical hindered rotor potential via a series of spline fits
+def _tors_potentials(tors_names, tors_grids, scan_energy, min_ene, ich):
+    """ the hindered rotor potentials (kcal/mol) of all torsions of a species
+
+    The scan energies are read with `scan_energy(locs)` (None for a missing
+    point), and the splines of all of the rotors are fit in one call.
     """
+    pots = []
+    for tors_name, tors_grid in zip(tors_names, tors_grids):
+        enes = []
+        for grid_val in tors_grid:
+            ene = scan_energy([[tors_name], [grid_val]])
+            if ene is not None:
+                enes.append(ene)
+            else:
+                enes.append(10.)
+                print('ERROR: missing grid value for torsional potential of {}'
+                      .format(ich))
+        enes = numpy.subtract(enes, min_ene)
+        pots.append(list(enes*phycon.EH2KCAL))
+
+    # Build the potential lists from only successful calculations
+    return _hrpot_spline_fits(pots)
+
+
+def _scan_energy_reader(scn_save_fs):
+    """ a reader for the saved energies of a scan (None for a missing point)
+    """
+    def _read(locs):
+        ene = None
+        if scn_save_fs.leaf.exists(locs):
+            ene = scn_save_fs.leaf.file.energy.read(locs)
+        return ene
+    return _read
+
+
+def _hrpot_spline_fits(pots, thresh=-0.05):
+    """ Get physical hindered rotor potentials for a set of rotors
+
+    The potentials are not modified; the cleaned potentials are memoized on
+    the raw ones, and those sharing a set of successful points are fit
+    together.
+    """
+    keys = [(tuple(pot), thresh) for pot in pots]
+    new_keys = [key for key in set(keys) if key not in _HRPOT_CACHE]
 
     # Build a potential list from only successful calculations
-    lpot = len(pot)+1
-    idx_success = []
-    pot_success = []
-    pot.append(0.)
-    for idx in range(lpot):
-        if pot[idx] < 600.:
-            idx_success.append(idx)
-            pot_success.append(pot[idx])
-    idx_success.append(lpot)
-    pot_success.append(pot[0])
-    pot_spl = interp1d(
-        numpy.array(idx_success), numpy.array(pot_success), kind='cubic')
-    for idx in range(lpot):
-        pot[idx] = pot_spl(idx)
-
-    # Do second spline fit of only positive values if any negative values found
-    if any(val < thresh for val in pot):
+    spl_dct = {}
+    for key in new_keys:
+        pot = numpy.append(key[0], 0.)
+        idx_success = tuple(numpy.flatnonzero(pot < 600.))
+        spl_dct.setdefault(idx_success, []).append(key)
+    for idx_success, spl_keys in spl_dct.items():
+        lpot = len(spl_keys[0][0]) + 1
+        pot_success = numpy.array(
+            [numpy.append(key[0], 0.)[list(idx_success)].tolist() + [key[0][0]]
+             for key in spl_keys])
+        pot_spl = interp1d(
+            numpy.array(idx_success + (lpot,)), pot_success, kind='cubic')
+        for key, pot in zip(spl_keys, pot_spl(numpy.arange(lpot))):
+            _HRPOT_CACHE[key] = tuple(_hrpot_positive_fit(pot, thresh)[:-1])
+
+    return [list(_HRPOT_CACHE[key]) for key in keys]
+
+
+def _hrpot_positive_fit(pot, thresh):
+    """ Refit a splined potential through its points at or above thresh,
+    linearly interpolating any points that are still below it
+    """
+    final_potential = pot
+    if numpy.any(pot < thresh):
         print('Found pot vals below {0} kcal. Refit w/ positives'.format(thresh))
-        print('Potential before spline:', pot)
-        x_pos = numpy.array([i for i in range(lpot)
-                             if pot[i] >= thresh])
-        y_pos = numpy.array([pot[i] for i in range(lpot)
-                             if pot[i] >= thresh])
-        pos_pot_spl = interp1d(x_pos, y_pos, kind='cubic')
-        pot_pos_fit = []
-        for idx in range(lpot):
-            pot_pos_fit.append(pos_pot_spl(idx))
-
-        print('Potential after spline:', pot_pos_fit)
+        print('Potential before spline:', pot.tolist())
+        idxs = numpy.arange(len(pot))
+        pos = pot >= thresh
+        pos_pot_spl = interp1d(idxs[pos], pot[pos], kind='cubic')
+        pot_pos_fit = pos_pot_spl(idxs)
+        print('Potential after spline:', pot_pos_fit.tolist())
+
         # Perform second check to see if negative potentials have been fixed
-        if any(val < thresh for val in pot_pos_fit):
+        neg = pot_pos_fit < thresh
+        if numpy.any(neg):
             print('Found values below {0} kcal again. Trying linear interp of positive vals'
                   .format(thresh))
-            neg_idxs = [i for i in range(lpot) if pot_pos_fit[i] < thresh]
-            clean_pot = []
-            for i in range(lpot):
-                if i in neg_idxs:
-                    # Find the indices for positive vals around negative value
-                    idx_0 = i - 1
-                    while idx_0 in neg_idxs:
-                        idx_0 = idx_0 - 1
-                    for j in range(i, lpot):
-                        if pot_pos_fit[j] >= thresh:
-                            idx_1 = j
-                            break
-                    # Get a new value for this point on the potential by
-                    # doing a linear interp of positives
-                    interp_val = (
-                        pot_pos_fit[idx_0] * (1.0 - ((i - idx_0) / (idx_1 - idx_0))) +
-                        pot_pos_fit[idx_1] * ((i - idx_0) / (idx_1 - idx_0))
-                    )
-                    clean_pot.append(interp_val)
-                else:
-                    clean_pot.append(pot[i])
-            final_potential = clean_pot.copy()
-
+            # Find the indices for positive vals around each negative value
+            pos_idxs = numpy.flatnonzero(~neg)
+            neg_idxs = idxs[neg]
+            upr = numpy.searchsorted(pos_idxs, neg_idxs)
+            idx_0 = numpy.where(upr > 0, pos_idxs[upr - 1], -1)
+            idx_1 = pos_idxs[upr]
+            wgt = (neg_idxs - idx_0) / (idx_1 - idx_0)
+            final_potential = pot.copy()
+            final_potential[neg] = (
+                pot_pos_fit[idx_0] * (1.0 - wgt) + pot_pos_fit[idx_1] * wgt)
         else:
-            final_potential = pot_pos_fit.copy()
-
-    else:
-        final_potential = pot.copy()
-
-    print('Final potential in spline fittere:', final_potential)
-    final_potential = final_potential[:-1]
+            final_potential = pot_pos_fit
 
-    return final_potential
+    print('Final potential in spline fittere:', final_potential.tolist())
+    return [float(val) for val in final_potential]
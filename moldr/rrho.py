@@ -0,0 +1,219 @@
+""" in-process rigid-rotor/harmonic-oscillator partition functions
+
+A fast path for messpf when a species is described by a rigid-rotor core,
+harmonic frequencies and electronic levels only. The partition functions of
+many species are evaluated over a whole temperature grid at once.
+"""
+import re
+import numpy
+from qcelemental import periodictable as ptab
+
+# physical constants (SI, CODATA 2018)
+PLANCK = 6.62607015e-34
+BOLTZMANN = 1.380649e-23
+LIGHT = 2.99792458e10    # (cm/s, for wavenumbers)
+AMU = 1.66053906660e-27
+ANG = 1.e-10
+NAVO = 6.02214076e23
+GAS_CONST = BOLTZMANN * NAVO / 4.184    # cal/(mol K)
+PRESSURE = 101325.    # standard state pressure, Pa
+
+# wavenumber to kelvin
+WAVEN2K = PLANCK * LIGHT / BOLTZMANN
+
+# linear geometries have a vanishing principal moment (amu angstrom^2)
+LINEAR_THRESH = 1.e-3
+
+# species block keywords covered by this model
+_KEYWORDS = (
+    'RRHO', 'Atom', 'Core', 'RigidRotor', 'SymmetryFactor',
+    'Geometry[angstrom]', 'Frequencies[1/cm]', 'ElectronicLevels[1/cm]',
+    'ZeroEnergy[kcal/mol]', 'Mass[amu]', 'End')
+
+
+def species_data(spc_str):
+    """ read a messpf species block, if it is a rigid-rotor/harmonic-oscillator
+    species
+
+    :param spc_str: the species block (as returned by moldr.pf.species_block)
+    :type spc_str: str
+    :returns: a dictionary with keys 'mass' (amu), 'moms' (principal
+        moments, amu angstrom^2, empty for atoms), 'sym_factor', 'freqs'
+        (1/cm) and 'elec_levels' ((1/cm, degeneracy) pairs); or None if the
+        block uses anything else (rotors, anharmonicities, etc.)
+    :rtype: dict
+    """
+    toks = spc_str.split()
+    words = [tok for tok in toks if re.match(r'^[A-Za-z]', tok)]
+    is_geo_atom = [_is_element_symbol(tok) for tok in words]
+    if not toks or not all(
+            word in _KEYWORDS or is_sym
+            for word, is_sym in zip(words, is_geo_atom)):
+        return None
+
+    dat = {'mass': None, 'moms': (), 'sym_factor': 1., 'freqs': (),
+           'elec_levels': ((0., 1),)}
+    pos = 0
+    while pos < len(toks):
+        tok = toks[pos]
+        if tok == 'SymmetryFactor':
+            dat['sym_factor'] = float(toks[pos+1])
+            pos += 2
+        elif tok == 'Mass[amu]':
+            dat['mass'] = float(toks[pos+1])
+            pos += 2
+        elif tok == 'Geometry[angstrom]':
+            natms = int(toks[pos+1])
+            rows = [toks[pos+2+4*i:pos+6+4*i] for i in range(natms)]
+            syms = [row[0] for row in rows]
+            xyzs = numpy.array([list(map(float, row[1:])) for row in rows])
+            dat['mass'], dat['moms'] = _mass_and_moments(syms, xyzs)
+            pos += 2 + 4 * natms
+        elif tok == 'Frequencies[1/cm]':
+            nfreqs = int(toks[pos+1])
+            dat['freqs'] = tuple(map(float, toks[pos+2:pos+2+nfreqs]))
+            pos += 2 + nfreqs
+        elif tok == 'ElectronicLevels[1/cm]':
+            nlevs = int(toks[pos+1])
+            vals = list(map(float, toks[pos+2:pos+2+2*nlevs]))
+            dat['elec_levels'] = tuple(zip(vals[0::2], vals[1::2]))
+            pos += 2 + 2 * nlevs
+        else:
+            pos += 1
+
+    return dat if dat['mass'] is not None else None
+
+
+def log_partition_functions(temps, spc_dat_lst):
+    """ ln Q and its first two temperature derivatives for a set of species
+
+    Q is per unit volume (1/cm^3), measured from the ground level.
+
+    :param temps: temperatures (K)
+    :param spc_dat_lst: species data, as returned by `species_data()`
+    :returns: three arrays of shape (number of species, number of
+        temperatures): ln Q, d ln Q / dT, d^2 ln Q / dT^2
+    """
+    temps = numpy.asarray(temps, dtype=float)
+    nspc = len(spc_dat_lst)
+
+    # translations: Q = (2 pi m k T / h^2)^(3/2) per cm^3
+    masses = numpy.array([dat['mass'] for dat in spc_dat_lst]) * AMU
+    lnq = (1.5 * numpy.log(
+        2. * numpy.pi * masses[:, None] * BOLTZMANN * temps[None, :] /
+        PLANCK**2) + numpy.log(1.e-6))
+    dlnq = numpy.tile(1.5 / temps, (nspc, 1))
+    d2lnq = numpy.tile(-1.5 / temps**2, (nspc, 1))
+
+    # rotations (classical rigid rotor)
+    for idx, dat in enumerate(spc_dat_lst):
+        moms = numpy.array(dat['moms']) * AMU * ANG**2
+        if moms.size:
+            if moms[0] < LINEAR_THRESH * AMU * ANG**2:
+                nrot = 1.
+                lnq_rot = numpy.log(
+                    8. * numpy.pi**2 * moms[-1] * BOLTZMANN * temps /
+                    PLANCK**2)
+            else:
+                nrot = 1.5
+                lnq_rot = (
+                    0.5 * numpy.log(numpy.pi * numpy.prod(moms)) +
+                    1.5 * numpy.log(
+                        8. * numpy.pi**2 * BOLTZMANN * temps / PLANCK**2))
+            lnq[idx] += lnq_rot - numpy.log(dat['sym_factor'])
+            dlnq[idx] += nrot / temps
+            d2lnq[idx] += -nrot / temps**2
+
+    # vibrations, padded to a common number of modes
+    thetas = _padded([dat['freqs'] for dat in spc_dat_lst]) * WAVEN2K
+    thetas[~(thetas > 0.)] = numpy.nan
+    xvals = thetas[:, :, None] / temps[None, None, :]
+    with numpy.errstate(invalid='ignore'):
+        emx = numpy.exp(-xvals)
+        lnq += numpy.nansum(-numpy.log1p(-emx), axis=1)
+        occ = 1. / numpy.expm1(xvals)
+        dlnq += numpy.nansum(xvals * occ, axis=1) / temps
+        d2lnq += numpy.nansum(
+            -2. * xvals * occ + xvals**2 * occ * (1. + occ), axis=1) / temps**2
+
+    # electronic levels
+    levs = _padded([[lev[0] for lev in dat['elec_levels']]
+                    for dat in spc_dat_lst]) * WAVEN2K
+    degs = numpy.nan_to_num(_padded([[lev[1] for lev in dat['elec_levels']]
+                                     for dat in spc_dat_lst]))
+    levs = levs - numpy.nanmin(levs, axis=1)[:, None]
+    levs = numpy.nan_to_num(levs)
+    wgts = degs[:, :, None] * numpy.exp(-levs[:, :, None] / temps[None, None, :])
+    qel = wgts.sum(axis=1)
+    avg = (wgts * levs[:, :, None]).sum(axis=1) / qel
+    avg2 = (wgts * levs[:, :, None]**2).sum(axis=1) / qel
+    lnq += numpy.log(qel)
+    dlnq += avg / temps**2
+    d2lnq += (avg2 - avg**2) / temps**4 - 2. * avg / temps**3
+
+    return lnq, dlnq, d2lnq
+
+
+def thermo_functions(temps, lnq, dlnq, d2lnq):
+    """ ideal-gas thermochemistry from ln Q and its derivatives
+
+    :returns: H(T) - H(0) (kcal/mol), S (cal/mol/K) and Cp (cal/mol/K), at
+        the standard pressure
+    """
+    temps = numpy.asarray(temps, dtype=float)
+    ene = GAS_CONST * (temps**2 * dlnq + temps)
+    vol = BOLTZMANN * temps / PRESSURE * 1.e6    # cm^3 per molecule
+    ent = GAS_CONST * (lnq + numpy.log(vol) + 1. + temps * dlnq)
+    cap = GAS_CONST * (2. * temps * dlnq + temps**2 * d2lnq + 1.)
+    return ene / 1000., ent, cap
+
+
+def pf_dat_string(name, temps, lnq, dlnq, d2lnq):
+    """ the pf.dat string, in messpf's layout, for one species
+
+    (temperature, ln Q, d ln Q / dT and d^2 ln Q / dT^2, followed by the
+    entropy and heat capacity)
+    """
+    _, ent, cap = thermo_functions(temps, lnq, dlnq, d2lnq)
+    lines = ['Natural log of the partition function, its derivatives, '
+             'entropy, and thermal capacity:',
+             'T, K{:>16s}'.format(name),
+             '{:>8s}{:>16s}{:>16s}{:>16s}{:>16s}{:>16s}'.format(
+                 '', 'Z_0', 'Z_1', 'Z_2', 'S, cal/mol/K', 'C, cal/mol/K')]
+    for row in zip(temps, lnq, dlnq, d2lnq, ent, cap):
+        lines.append('{:>8g}{:>16.8g}{:>16.8g}{:>16.8g}{:>16.8g}{:>16.8g}'
+                     .format(*row))
+    return '\n'.join(lines) + '\n'
+
+
+def temperatures(temp_step, ntemps):
+    """ the temperature grid of a messpf global header
+    """
+    return temp_step * numpy.arange(1, ntemps + 1)
+
+
+def _mass_and_moments(syms, xyzs):
+    """ total mass (amu) and principal moments (amu angstrom^2)
+    """
+    masses = numpy.array([ptab.to_mass(sym) for sym in syms])
+    xyzs = xyzs - masses @ xyzs / masses.sum()
+    inert = (numpy.sum(masses * numpy.sum(xyzs**2, axis=1)) * numpy.eye(3) -
+             (masses[:, None] * xyzs).T @ xyzs)
+    moms = numpy.linalg.eigvalsh(inert) if len(syms) > 1 else ()
+    return masses.sum(), tuple(moms)
+
+
+def _padded(seqs):
+    """ stack sequences of different lengths, padded with nan
+    """
+    nmax = max([len(seq) for seq in seqs] + [1])
+    arr = numpy.full((len(seqs), nmax), numpy.nan)
+    for idx, seq in enumerate(seqs):
+        arr[idx, :len(seq)] = seq
+    return arr
+
+
+def _is_element_symbol(tok):
+    """ could this token be the atomic symbol on a geometry line?
+    """
+    return re.match(r'^[A-Z][a-z]?$', tok) is not None
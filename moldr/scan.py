@@ -1,5 +1,6 @@
 """ drivers for coordinate scans
 """
+import os
 import numpy
 import automol
 import elstruct
@@ -11,8 +12,13 @@ from elstruct.reader._molpro2015.molecule import hess_geometry
 def hindered_rotor_scans(
         spc_info, thy_level, cnf_run_fs, cnf_save_fs, script_str, overwrite,
         scan_increment=30., saddle=False, tors_names='', frm_bnd_key=[],
-        brk_bnd_key=[], **opt_kwargs):
+        brk_bnd_key=[], executor=None, **opt_kwargs):
     """ Perform 1d scans over each of the torsional coordinates
+
+    With an executor (moldr.executor.JobExecutor), the scans over different
+    torsions run concurrently, each as its own sequence of optimizations,
+    and the points that failed are then repaired here (see
+    `_repair_1d_scan()`).
     """
     min_cnf_locs = moldr.util.min_energy_conformer_locators(cnf_save_fs)
     if min_cnf_locs:
@@ -33,6 +39,7 @@ def hindered_rotor_scans(
                 numpy.linspace(*linspace) + val_dct[name]
                 for name, linspace in zip(tors_names, tors_linspaces)]
 
+            futs = []
             for tors_name, tors_grid in zip(tors_names, tors_grids):
                 save_scan(
                     scn_run_fs=scn_run_fs,
@@ -40,7 +47,7 @@ def hindered_rotor_scans(
                     coo_names=[tors_name],
                 )
 
-                run_scan(
+                scn_futs = run_scan(
                     zma=zma,
                     spc_info=spc_info,
                     thy_level=thy_level,
@@ -50,22 +57,62 @@ def hindered_rotor_scans(
                     script_str=script_str,
                     overwrite=overwrite,
                     saddle=saddle,
+                    executor=executor,
                     **opt_kwargs,
                 )
 
-                save_scan(
-                    scn_run_fs=scn_run_fs,
-                    scn_save_fs=scn_save_fs,
-                    coo_names=[tors_name],
-                )
+                if executor is None:
+                    save_scan(
+                        scn_run_fs=scn_run_fs,
+                        scn_save_fs=scn_save_fs,
+                        coo_names=[tors_name],
+                    )
+                else:
+                    futs.extend(scn_futs)
+
+            if executor is not None:
+                # the torsions were scanned concurrently; save them at the end
+                moldr.executor.gather(futs)
+                for tors_name, tors_grid in zip(tors_names, tors_grids):
+                    save_scan(
+                        scn_run_fs=scn_run_fs,
+                        scn_save_fs=scn_save_fs,
+                        coo_names=[tors_name],
+                    )
+                    if _repair_1d_scan(
+                            zma=zma,
+                            spc_info=spc_info,
+                            thy_level=thy_level,
+                            coo_name=tors_name,
+                            grid_vals=tors_grid,
+                            scn_run_fs=scn_run_fs,
+                            scn_save_fs=scn_save_fs,
+                            script_str=script_str,
+                            overwrite=overwrite,
+                            saddle=saddle,
+                            **opt_kwargs):
+                        save_scan(
+                            scn_run_fs=scn_run_fs,
+                            scn_save_fs=scn_save_fs,
+                            coo_names=[tors_name],
+                        )
 
 
 def run_scan(
         zma, spc_info, thy_level, grid_dct, scn_run_fs, scn_save_fs,
         script_str, overwrite, update_guess=True,
-        reverse_sweep=True, fix_failures=True, saddle=False,
+        reverse_sweep=True, fix_failures=True, saddle=False, executor=None,
         **kwargs):
     """ run constrained optimization scan
+
+    With an executor (moldr.executor.JobExecutor), a 1d scan is submitted as
+    two concurrent chains of optimizations, one sweeping forward from the
+    start of the grid and one sweeping backward from its end, which meet in
+    the middle. Each chain still updates its own guess point by point. The
+    futures for the chains are returned, and once they are done and saved,
+    `_repair_1d_scan()` retries the failed points from their other side;
+    otherwise the scan runs here and None is returned. A 2d scan always runs here, but with an executor the
+    points on each anti-diagonal of the grid are optimized concurrently.
     """
 
     vma = automol.zmatrix.var_(zma)
@@ -88,45 +135,64 @@ def run_scan(
     for coo_grid_vals in grid_vals:
         npoint *= len(coo_grid_vals)
     grid_idxs = tuple(range(npoint))
+    ret = None
     if len(grid_vals) == 1:
         for grid_val in grid_vals[0]:
             scn_run_fs.leaf.create([coo_names, [grid_val]])
         run_prefixes = tuple(scn_run_fs.leaf.path([coo_names, [grid_val]])
                              for grid_val in grid_vals[0])
-        _run_1d_scan(
+        scn_kwargs = dict(
             script_str=script_str,
-            run_prefixes=run_prefixes,
-            scn_save_fs=scn_save_fs,
-            guess_zma=zma,
             coo_name=coo_names[0],
-            grid_idxs=grid_idxs,
-            grid_vals=grid_vals[0],
             spc_info=spc_info,
             thy_level=thy_level,
             overwrite=overwrite,
             update_guess=update_guess,
             saddle=saddle,
-            retry_failed=fix_failures,
             **kwargs
         )
-
-        if reverse_sweep:
+        if executor is not None:
+            nfwd = (npoint + 1) // 2 if reverse_sweep else npoint
+            ret = [executor.submit(
+                _run_1d_scan_chain,
+                scn_save_prefix=scn_save_fs.trunk.prefix,
+                run_prefixes=run_prefixes[:nfwd],
+                guess_zma=zma,
+                grid_idxs=grid_idxs[:nfwd],
+                grid_vals=list(grid_vals[0][:nfwd]),
+                retry_failed=fix_failures,
+                **scn_kwargs)]
+            if reverse_sweep:
+                ret.append(executor.submit(
+                    _run_1d_scan_chain,
+                    scn_save_prefix=scn_save_fs.trunk.prefix,
+                    run_prefixes=list(reversed(run_prefixes[nfwd:])),
+                    guess_zma=zma,
+                    grid_idxs=list(reversed(grid_idxs[nfwd:])),
+                    grid_vals=list(reversed(grid_vals[0][nfwd:])),
+                    retry_failed=fix_failures,
+                    **scn_kwargs))
+        else:
             _run_1d_scan(
-                script_str=script_str,
-                run_prefixes=list(reversed(run_prefixes)),
+                run_prefixes=run_prefixes,
                 scn_save_fs=scn_save_fs,
                 guess_zma=zma,
-                coo_name=coo_names[0],
-                grid_idxs=list(reversed(grid_idxs)),
-                grid_vals=list(reversed(grid_vals[0])),
-                spc_info=spc_info,
-                thy_level=thy_level,
-                overwrite=overwrite,
-                update_guess=update_guess,
-                saddle=saddle,
-                **kwargs
+                grid_idxs=grid_idxs,
+                grid_vals=grid_vals[0],
+                retry_failed=fix_failures,
+                **scn_kwargs
             )
 
+            if reverse_sweep:
+                _run_1d_scan(
+                    run_prefixes=list(reversed(run_prefixes)),
+                    scn_save_fs=scn_save_fs,
+                    guess_zma=zma,
+                    grid_idxs=list(reversed(grid_idxs)),
+                    grid_vals=list(reversed(grid_vals[0])),
+                    **scn_kwargs
+                )
+
     elif len(grid_vals) == 2:
         run_prefixes = []
         for grid_val_i in grid_vals[0]:
@@ -149,6 +215,7 @@ def run_scan(
             update_guess=update_guess,
             saddle=saddle,
             retry_failed=fix_failures,
+            executor=executor,
             **kwargs
         )
 
@@ -171,9 +238,12 @@ def run_scan(
                 overwrite=overwrite,
                 update_guess=update_guess,
                 saddle=saddle,
+                executor=executor,
                 **kwargs
             )
 
+    return ret
+
 
 def run_multiref_rscan(
         formula, high_mul, zma, spc_info, multi_level, dist_name, grid1, grid2,
@@ -438,16 +508,108 @@ def _run_1d_scan(
                     ret = moldr.driver.read_job(job=elstruct.Job.HESSIAN, run_fs=run_fs)
 
 
+def _run_1d_scan_chain(scn_save_prefix, **kwargs):
+    """ run a chain of 1d scan points in a worker process
+
+    (the scan filesystem is rebuilt from its prefix, since it can't be sent)
+    """
+    _run_1d_scan(scn_save_fs=autofile.fs.scan(scn_save_prefix), **kwargs)
+
+
+def _repair_1d_scan(
+        zma, spc_info, thy_level, coo_name, grid_vals, scn_run_fs,
+        scn_save_fs, script_str, overwrite, reverse_sweep=True, saddle=False,
+        **kwargs):
+    """ rerun the points of a 1d scan that was run as two half chains (see
+    `run_scan()`) and that are not saved, each from a saved neighbour
+
+    (this stands in for the full reverse sweep of a serial scan, which
+    retries the points that failed going one way from the guess of the
+    other: each point is seeded from its neighbour on the side its chain did
+    not come from, if that one is saved)
+
+    :returns: whether any point was rerun
+    :rtype: bool
+    """
+    npoint = len(grid_vals)
+    nfwd = (npoint + 1) // 2 if reverse_sweep else npoint
+    opt_zmas = {}
+    for idx, grid_val in enumerate(grid_vals):
+        locs = [[coo_name], [grid_val]]
+        if scn_save_fs.leaf.file.zmatrix.exists(locs):
+            opt_zmas[idx] = scn_save_fs.leaf.file.zmatrix.read(locs)
+
+    rerun = False
+    for idx, grid_val in enumerate(grid_vals):
+        if idx in opt_zmas:
+            continue
+        rerun = True
+        nbr_idxs = [idx+1, idx-1] if idx < nfwd else [idx-1, idx+1]
+        nbr_idxs = [nbr_idx for nbr_idx in nbr_idxs if nbr_idx in opt_zmas]
+        guess_zma = opt_zmas[nbr_idxs[0]] if nbr_idxs else zma
+        print("Repairing scan point {}/{}".format(idx+1, npoint))
+        run_prefix = scn_run_fs.leaf.path([[coo_name], [grid_val]])
+        _run_1d_scan(
+            script_str=script_str,
+            run_prefixes=[run_prefix],
+            scn_save_fs=scn_save_fs,
+            guess_zma=guess_zma,
+            coo_name=coo_name,
+            grid_idxs=[idx],
+            grid_vals=[grid_val],
+            spc_info=spc_info,
+            thy_level=thy_level,
+            overwrite=overwrite,
+            retry_failed=True,
+            saddle=saddle,
+            **kwargs
+        )
+
+        # (a repaired point seeds the ones after it)
+        ret = moldr.driver.read_job(
+            job=elstruct.Job.OPTIMIZATION, run_fs=autofile.fs.run(run_prefix))
+        if ret is not None:
+            inf_obj, _, out_str = ret
+            opt_zmas[idx] = elstruct.reader.opt_zmatrix(inf_obj.prog, out_str)
+    return rerun
+
+
 def _run_2d_scan(
         script_str, run_prefixes, scn_save_fs, guess_zma, coo_names, grid_idxs, grid_vals,
         spc_info, thy_level, overwrite, errors=(),
-        options_mat=(), retry_failed=True, update_guess=True, saddle=False, **kwargs):
+        options_mat=(), retry_failed=True, update_guess=True, saddle=False,
+        executor=None, **kwargs):
     """ run 2-dimensional scan with constrained optimization
+
+    With an executor, the grid is run as a wavefront (see
+    `_run_2d_scan_wavefront`).
     """
 
     npoints = len(grid_idxs)
     assert len(grid_vals[0]) * len(grid_vals[1]) == len(run_prefixes) == npoints
 
+    if executor is not None:
+        _run_2d_scan_wavefront(
+            executor=executor,
+            script_str=script_str,
+            run_prefixes=run_prefixes,
+            scn_save_fs=scn_save_fs,
+            guess_zma=guess_zma,
+            coo_names=coo_names,
+            grid_idxs=grid_idxs,
+            grid_vals=grid_vals,
+            spc_info=spc_info,
+            thy_level=thy_level,
+            overwrite=overwrite,
+            errors=errors,
+            options_mat=options_mat,
+            retry_failed=retry_failed,
+            update_guess=update_guess,
+            saddle=saddle,
+            **kwargs
+        )
+        return
+
     idx = 0
     for grid_val_i in grid_vals[0]:
         for grid_val_j in grid_vals[1]:
@@ -484,20 +646,124 @@ def _run_2d_scan(
                     guess_zma = elstruct.reader.opt_zmatrix(prog, out_str)
 
 
+def _run_2d_scan_wavefront(
+        executor, script_str, run_prefixes, scn_save_fs, guess_zma, coo_names,
+        grid_idxs, grid_vals, spc_info, thy_level, overwrite, errors=(),
+        options_mat=(), retry_failed=True, update_guess=True, saddle=False,
+        **kwargs):
+    """ run a 2-dimensional scan as a wavefront over the grid
+
+    Point (i, j) is submitted as soon as its predecessors (i-1, j) and
+    (i, j-1) in the sweep direction have finished, and is seeded from the
+    optimized geometry of (i, j-1), or else of (i-1, j) (the saved one, for
+    a point that is already saved). All points on an anti-diagonal can
+    therefore run at once. Grid values are taken in the order given, so a
+    reverse sweep passes in reversed grids. A point whose job raises is
+    reported and counts as finished, without a geometry to seed from, so the
+    rest of the grid still runs.
+    """
+    nvals_i = len(grid_vals[0])
+    nvals_j = len(grid_vals[1])
+    npoints = len(grid_idxs)
+
+    opt_zmas = {}
+    running = {}
+    waiting = [(i, j) for i in range(nvals_i) for j in range(nvals_j)]
+    finished = set()
+    while waiting or running:
+        # submit every point whose predecessors have finished
+        for pnt in [pnt for pnt in waiting
+                    if all(prev in finished for prev in _predecessors(pnt))]:
+            waiting.remove(pnt)
+            i, j = pnt
+            idx = i * nvals_j + j
+            grid_val_i = grid_vals[0][i]
+            grid_val_j = grid_vals[1][j]
+            print("Point {}/{}".format(grid_idxs[idx]+1, npoints))
+            if not scn_save_fs.leaf.file.geometry.exists(
+                    [coo_names, [grid_val_i, grid_val_j]]) or overwrite:
+                seed_zma = guess_zma
+                if update_guess:
+                    seed_zmas = [opt_zmas[prev] for prev in _predecessors(pnt)
+                                 if opt_zmas.get(prev) is not None]
+                    seed_zma = seed_zmas[0] if seed_zmas else guess_zma
+                zma = automol.zmatrix.set_values(
+                    seed_zma,
+                    {coo_names[0]: grid_val_i, coo_names[1]: grid_val_j})
+                running[moldr.driver.run_job(
+                    job=elstruct.Job.OPTIMIZATION,
+                    script_str=script_str,
+                    run_fs=autofile.fs.run(run_prefixes[idx]),
+                    geom=zma,
+                    spc_info=spc_info,
+                    thy_level=thy_level,
+                    overwrite=overwrite,
+                    frozen_coordinates=coo_names,
+                    errors=errors,
+                    options_mat=options_mat,
+                    retry_failed=retry_failed,
+                    saddle=saddle,
+                    executor=executor,
+                    **kwargs
+                )] = pnt
+            else:
+                locs = [coo_names, [grid_val_i, grid_val_j]]
+                if scn_save_fs.leaf.file.zmatrix.exists(locs):
+                    opt_zmas[pnt] = scn_save_fs.leaf.file.zmatrix.read(locs)
+                finished.add(pnt)
+
+        for fut in moldr.executor.first_completed(running):
+            pnt = running.pop(fut)
+            finished.add(pnt)
+            try:
+                fut.result()
+            except Exception as err:
+                print('Scan point {} failed: {}'.format(pnt, err))
+                continue
+            i, j = pnt
+            run_fs = autofile.fs.run(run_prefixes[i * nvals_j + j])
+            ret = moldr.driver.read_job(
+                job=elstruct.Job.OPTIMIZATION, run_fs=run_fs)
+            if ret is not None:
+                inf_obj, _, out_str = ret
+                opt_zmas[pnt] = elstruct.reader.opt_zmatrix(
+                    inf_obj.prog, out_str)
+
+
+def _predecessors(pnt):
+    """ the neighbours of a 2d grid point that come before it in a sweep
+
+    (ordered by preference as a starting guess)
+    """
+    i, j = pnt
+    return tuple(prev for prev in ((i, j-1), (i-1, j)) if min(prev) >= 0)
+
+
 def save_scan(scn_run_fs, scn_save_fs, coo_names, gradient=False, hessian=False):
     """ save the scans that have been run so far
+
+    Points whose saved files are newer than their optimization output are
+    not parsed again, and the trajectory is assembled from the values parsed
+    here rather than re-read from the save files.
     """
     if not scn_run_fs.branch.exists([coo_names]):
         print("No scan to save. Skipping...")
     else:
-        locs_lst = []
+        traj_dct = {}
         for locs in scn_run_fs.leaf.existing([coo_names]):
             if not isinstance(locs[1][0], float):
                 continue
             run_path = scn_run_fs.leaf.path(locs)
             run_fs = autofile.fs.run(run_path)
-            print("Reading from scan run at {}".format(run_path))
 
+            if _scan_point_is_saved(run_fs, scn_save_fs, locs,
+                                    gradient=gradient, hessian=hessian):
+                traj_dct[tuple(locs[-1])] = (
+                    scn_save_fs.leaf.file.energy.read(locs),
+                    scn_save_fs.leaf.file.geometry.read(locs))
+                continue
+
+            print("Reading from scan run at {}".format(run_path))
             ret = moldr.driver.read_job(job=elstruct.Job.OPTIMIZATION, run_fs=run_fs)
             if ret:
                 inf_obj, inp_str, out_str = ret
@@ -516,9 +782,6 @@ def save_scan(scn_run_fs, scn_save_fs, coo_names, gradient=False, hessian=False)
                 scn_save_fs.leaf.file.geometry_input.write(inp_str, locs)
                 scn_save_fs.leaf.file.energy.write(ene, locs)
                 scn_save_fs.leaf.file.geometry.write(geo, locs)
-                scn_save_fs.leaf.file.zmatrix.write(zma, locs)
-
-                locs_lst.append(locs)
 
                 if gradient:
                     ret = moldr.driver.read_job(job=elstruct.Job.GRADIENT, run_fs=run_fs)
@@ -541,16 +804,16 @@ def save_scan(scn_run_fs, scn_save_fs, coo_names, gradient=False, hessian=False)
                             geo = hess_geometry(out_str)
                             scn_save_fs.leaf.file.geometry.write(geo, locs)
 
-        if locs_lst:
-            idxs_lst = [locs[-1] for locs in locs_lst]
-            enes = [scn_save_fs.leaf.file.energy.read(locs)
-                    for locs in locs_lst]
-            geos = [scn_save_fs.leaf.file.geometry.read(locs)
-                    for locs in locs_lst]
+                # the z-matrix goes last, marking the point as saved
+                scn_save_fs.leaf.file.zmatrix.write(zma, locs)
+
+                traj_dct[tuple(locs[-1])] = (ene, geo)
 
+        if traj_dct:
             traj = []
-            for idxs, ene, geo in zip(idxs_lst, enes, geos):
-                comment = 'energy: {:>15.10f}, grid idxs: {}'.format(ene, idxs)
+            for idxs, (ene, geo) in traj_dct.items():
+                comment = 'energy: {:>15.10f}, grid idxs: {}'.format(
+                    ene, list(idxs))
                 traj.append((comment, geo))
 
             traj_path = scn_save_fs.branch.file.trajectory.path([coo_names])
@@ -558,6 +821,25 @@ def save_scan(scn_run_fs, scn_save_fs, coo_names, gradient=False, hessian=False)
             scn_save_fs.branch.file.trajectory.write(traj, [coo_names])
 
 
+def _scan_point_is_saved(run_fs, scn_save_fs, locs, gradient=False,
+                         hessian=False):
+    """ have the results of this scan point been saved since it last ran?
+    """
+    job = elstruct.Job.OPTIMIZATION
+    saved = (run_fs.leaf.file.output.exists([job]) and
+             scn_save_fs.leaf.file.zmatrix.exists(locs) and
+             scn_save_fs.leaf.file.energy.exists(locs) and
+             scn_save_fs.leaf.file.geometry.exists(locs))
+    if saved and gradient:
+        saved = scn_save_fs.leaf.file.gradient.exists(locs)
+    if saved and hessian:
+        saved = scn_save_fs.leaf.file.hessian.exists(locs)
+    if saved:
+        saved = (os.path.getmtime(scn_save_fs.leaf.file.zmatrix.path(locs)) >
+                 os.path.getmtime(run_fs.leaf.file.output.path([job])))
+    return saved
+
+
 def infinite_separation_energy(
         spc_1_info, spc_2_info, ts_info, high_mul, ref_zma, ini_thy_info, thy_info,
         multi_info, run_prefix, save_prefix, scn_run_fs, scn_save_fs, locs, overwrite=False,
@@ -1,12 +1,18 @@
 """ utilites
 """
 import os
+import copy
+import json
+import fcntl
 import stat
+import shutil
+import hashlib
 import subprocess
 import warnings
 import autofile
 import automol
 import elstruct
+import projrot_io
 
 
 def run_qchem_par(prog, method, saddle=False):
@@ -256,16 +262,133 @@ def geometry_dictionary(geom_path):
 
 def min_energy_conformer_locators(cnf_save_fs):
     """ locators for minimum energy conformer """
-    cnf_locs_lst = cnf_save_fs.leaf.existing()
-    if cnf_locs_lst:
-        cnf_enes = [cnf_save_fs.leaf.file.energy.read(locs)
-                    for locs in cnf_locs_lst]
-        min_cnf_locs = cnf_locs_lst[cnf_enes.index(min(cnf_enes))]
+    idx = autofile.system.index.lookup(cnf_save_fs.trunk.path())
+    if idx is not None:
+        # answered from the attached index, without reading every leaf
+        min_cnf = idx.min_value_child(
+            cnf_save_fs.trunk.path(),
+            cnf_save_fs.leaf.file.energy.file.name)
+        min_cnf_locs = (None if min_cnf is None else
+                        cnf_save_fs.leaf.loc_dfile.read(min_cnf[0]))
     else:
-        min_cnf_locs = None
+        cnf_locs_lst = cnf_save_fs.leaf.existing()
+        if cnf_locs_lst:
+            cnf_enes = [cnf_save_fs.leaf.file.energy.read(locs)
+                        for locs in cnf_locs_lst]
+            min_cnf_locs = cnf_locs_lst[cnf_enes.index(min(cnf_enes))]
+        else:
+            min_cnf_locs = None
     return min_cnf_locs
 
 
+_LEVEL_SNAPSHOTS = {}
+
+
+class LevelSnapshot():
+    """ the minimum-energy conformer of a species at one theory level
+
+    The conformer search is done once, and the files read through this
+    object and the scan energies are cached. Each cached value is checked
+    against the modification time of its file, so it is reread after a
+    change, and missing scan points are looked for again on every call.
+    """
+
+    def __init__(self, spc_info, thy_level, save_prefix, saddle=False):
+        orb_restr = orbital_restriction(spc_info, thy_level)
+        thy_levelp = thy_level[0:3]
+        thy_levelp.append(orb_restr)
+        thy_save_fs = autofile.fs.theory(save_prefix)
+        self.save_path = thy_save_fs.leaf.path(thy_levelp[1:4])
+        if saddle:
+            ts_save_fs = autofile.fs.ts(self.save_path)
+            ts_save_fs.trunk.create()
+            self.save_path = ts_save_fs.trunk.path()
+
+        self.cnf_save_fs = autofile.fs.conformer(self.save_path)
+        # (the conformer trunk directory changes when a conformer is added)
+        self.stamp = autofile.system.model.modification_time(
+            self.cnf_save_fs.trunk.path())
+        self.min_cnf_locs = min_energy_conformer_locators(self.cnf_save_fs)
+        self.cnf_save_path = (
+            self.cnf_save_fs.leaf.path(self.min_cnf_locs)
+            if self.min_cnf_locs else None)
+        self._scn_save_fs = None
+        self._files = {}
+        self._scan_enes = {}
+
+    def is_current(self):
+        """ is the conformer search still valid for the save tree?
+        """
+        stamp = autofile.system.model.modification_time(
+            self.cnf_save_fs.trunk.path())
+        return (stamp == self.stamp and
+                (stamp is None or autofile.system.model.is_settled(stamp)))
+
+    def geometry(self):
+        """ the geometry of the minimum-energy conformer """
+        return self._read('geometry')
+
+    def energy(self):
+        """ the energy of the minimum-energy conformer """
+        return self._read('energy')
+
+    def hessian(self):
+        """ the hessian of the minimum-energy conformer """
+        return self._read('hessian')
+
+    def zmatrix(self):
+        """ the z-matrix of the minimum-energy conformer """
+        return self._read('zmatrix')
+
+    def scan_energy(self, locs):
+        """ the energy of a scan point on the minimum-energy conformer, or
+        None if it was not saved
+        """
+        if self._scn_save_fs is None:
+            self._scn_save_fs = autofile.fs.scan(self.cnf_save_path)
+        dfile = self._scn_save_fs.leaf.file.energy
+        ene = None
+        if self._scn_save_fs.leaf.exists(locs):
+            ene = _cached_read(
+                self._scan_enes, (tuple(locs[0]), tuple(locs[1])),
+                dfile.path(locs), lambda: dfile.read(locs))
+        return ene
+
+    def _read(self, name):
+        dfile = getattr(self.cnf_save_fs.leaf.file, name)
+        return copy.deepcopy(_cached_read(
+            self._files, name, dfile.path(self.min_cnf_locs),
+            lambda: dfile.read(self.min_cnf_locs)))
+
+
+def level_snapshot(spc_info, thy_level, save_prefix, saddle=False):
+    """ the (shared) level snapshot of a species' save tree
+
+    (a new one is made if conformers were added or removed since the last)
+
+    :rtype: LevelSnapshot
+    """
+    key = (tuple(spc_info), tuple(thy_level[0:4]),
+           os.path.abspath(save_prefix), saddle)
+    if key not in _LEVEL_SNAPSHOTS or not _LEVEL_SNAPSHOTS[key].is_current():
+        _LEVEL_SNAPSHOTS[key] = LevelSnapshot(
+            spc_info, thy_level, save_prefix, saddle=saddle)
+    return _LEVEL_SNAPSHOTS[key]
+
+
+def _cached_read(cache, key, pth, read):
+    """ read a file through a cache checked against its modification time
+    """
+    stamp = autofile.system.model.modification_time(pth)
+    if key in cache and cache[key][0] == stamp:
+        val = cache[key][1]
+    else:
+        val = read()
+        if stamp is not None and autofile.system.model.is_settled(stamp):
+            cache[key] = (stamp, val)
+    return val
+
+
 def min_dist_conformer_zma(dist_name, cnf_save_fs):
     """ locators for minimum energy conformer """
     cnf_locs_lst = cnf_save_fs.leaf.existing()
@@ -437,6 +560,134 @@ def run_script(script_str, run_dir):
             warnings.warn("run failed in {}".format(run_dir))
 
 
+PROJROT_CACHE_NAME = 'RPHt_cache.json'
+_PROJROT_CACHE = {}
+
+
+def run_projrot(script_str, inp_str, run_dir):
+    """ run ProjRot on an input string, unless it has been run on it before
+
+    Results are cached by a hash of the script and input strings, in memory
+    and in a record file in the run directory, so a repeated call returns
+    without writing the input or running the program again. Only outputs
+    written by this run are read, and a run that wrote no RTproj_freq.dat
+    (i.e. that failed) is not recorded.
+
+    Processes may share the run directory (e.g. PESs run side by side with
+    species in common), so ProjRot runs in a scratch directory of its own,
+    and its files and the record are moved into place in one step each.
+
+    :returns: the parsed RTproj_freq.dat and hrproj_freq.dat outputs, each
+        as a (frequencies, imaginary frequencies) pair, or None if ProjRot
+        did not write that file
+    :rtype: (tuple, tuple)
+    """
+    key = hashlib.sha256(
+        '\n'.join([script_str, inp_str]).encode()).hexdigest()
+    if key not in _PROJROT_CACHE:
+        rec_path = os.path.join(run_dir, PROJROT_CACHE_NAME)
+        rec_dct = _read_projrot_record(rec_path)
+
+        if key not in rec_dct:
+            scr_dir = os.path.join(
+                run_dir, 'projrot_{:d}'.format(os.getpid()))
+            if os.path.exists(scr_dir):
+                shutil.rmtree(scr_dir)
+            os.makedirs(scr_dir)
+            proj_file_path = os.path.join(scr_dir, 'RPHt_input_data.dat')
+            with open(proj_file_path, 'w') as proj_file:
+                proj_file.write(inp_str)
+
+            run_script(script_str, scr_dir)
+
+            out_names = ('RTproj_freq.dat', 'hrproj_freq.dat')
+            outs = [
+                (projrot_io.reader.rpht_output(os.path.join(scr_dir, name))
+                 if os.path.exists(os.path.join(scr_dir, name)) else None)
+                for name in out_names]
+            # (the input and outputs are kept in the run directory, as before)
+            for name in ('RPHt_input_data.dat',) + out_names:
+                if os.path.exists(os.path.join(scr_dir, name)):
+                    os.replace(os.path.join(scr_dir, name),
+                               os.path.join(run_dir, name))
+                elif os.path.exists(os.path.join(run_dir, name)):
+                    os.remove(os.path.join(run_dir, name))
+            shutil.rmtree(scr_dir)
+            # (round trip through JSON, so that fresh and recorded results
+            # have the same types)
+            outs = json.loads(json.dumps(outs, default=list))
+            if outs[0] is None:
+                print('ProjRot failed in {}; not recording it'.format(run_dir))
+                return tuple(None if out is None else tuple(out)
+                             for out in outs)
+
+            # (re-read under a lock, to keep what other processes recorded)
+            with open(rec_path + '.lock', 'w') as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                rec_dct = _read_projrot_record(rec_path)
+                rec_dct[key] = outs
+                tmp_path = '{}.{:d}.tmp'.format(rec_path, os.getpid())
+                with open(tmp_path, 'w') as rec_file:
+                    json.dump(rec_dct, rec_file)
+                os.replace(tmp_path, rec_path)
+
+        _PROJROT_CACHE[key] = tuple(
+            None if out is None else tuple(out) for out in rec_dct[key])
+
+    return copy.deepcopy(_PROJROT_CACHE[key])
+
+
+def _read_projrot_record(rec_path):
+    """ the ProjRot results recorded in a run directory, by input hash
+    """
+    rec_dct = {}
+    if os.path.exists(rec_path):
+        with open(rec_path, 'r') as rec_file:
+            rec_dct = json.load(rec_file)
+    return rec_dct
+
+
+MESSPF_DAT_NAME = 'pf.dat'
+
+
+def run_messpf(script_str, run_dir):
+    """ run messpf on the pf.inp in a run directory, unless it has been run
+    on the same input before
+
+    The pf.dat of each run is kept beside it as pf_<hash>.dat, named by a
+    hash of the script and input strings, and a repeated run copies it back
+    to pf.dat instead of running messpf again. A run that wrote no pf.dat
+    (i.e. that failed) is not recorded.
+
+    :returns: whether pf.dat was written
+    :rtype: bool
+    """
+    dat_path = os.path.join(run_dir, MESSPF_DAT_NAME)
+    with open(os.path.join(run_dir, 'pf.inp'), 'r') as pf_file:
+        inp_str = pf_file.read()
+    key = hashlib.sha256(
+        '\n'.join([script_str, inp_str]).encode()).hexdigest()
+    rec_path = os.path.join(run_dir, 'pf_{}.dat'.format(key))
+    tmp_path = '{}.{:d}.tmp'.format(dat_path, os.getpid())
+
+    if os.path.exists(rec_path):
+        shutil.copyfile(rec_path, tmp_path)
+        os.replace(tmp_path, dat_path)
+    else:
+        if os.path.exists(dat_path):
+            os.remove(dat_path)
+
+        run_script(script_str, run_dir)
+
+        if not os.path.exists(dat_path):
+            print('messpf failed in {}; not recording it'.format(run_dir))
+            return False
+        shutil.copyfile(dat_path, tmp_path)
+        os.replace(tmp_path, rec_path)
+
+    return True
+
+
 class _EnterDirectory():
 
     def __init__(self, directory):
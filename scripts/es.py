@@ -1146,7 +1146,7 @@ def find_ts(
             elif rad_rad_ts.lower() == 'vrctst':
 
                 # Set paths and build dirs for VRC-TST calculation is run
-                vrc_path = os.path.join(os.getcwd(), 'vrc')
+                vrc_path = os.path.join(rxn_run_path, 'vrc')
                 scr_path = os.path.join(vrc_path, 'scratch')
                 os.makedirs(vrc_path, exist_ok=True)
                 os.makedirs(scr_path, exist_ok=True)
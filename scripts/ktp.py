@@ -3,6 +3,7 @@
 
 import os
 import copy
+import concurrent.futures
 import numpy
 import thermo
 import automol
@@ -15,6 +16,13 @@ import scripts
 from datalibs import phycon
 from submission import substr
 
+RATES_CACHE_NAME = 'rate.npz'
+RATES_CACHE_VERSION = 2
+_RATES_CACHE = {}
+
+# gas constant (kcal/(mol K)), for the activation energies, as in ratefit
+RC = 1.98720425864083e-3
+
 
 def pf_headers(
         rct_ichs, temps, press, exp_factor, exp_power, exp_cutoff, eps1, eps2,
@@ -396,8 +404,14 @@ def make_channel_pfs(
 
 def run_rates(
         header_str, energy_trans_str, well_str, bim_str, ts_str, tsdct,
-        thy_info, rxn_save_path):
+        thy_info, rxn_save_path, executor=None, build_graph=None):
     """ Generate k(T,P) by first compiling all the MESS strings and then running MESS
+
+    With an executor (moldr.executor.JobExecutor), MESS is submitted to one of
+    its slots and a future for the MESS path is returned instead, so that
+    several PESs can run at once; see `wait_for_rates()`. With a build graph
+    (moldr.build.BuildGraph), MESS is not rerun if its rates were recorded
+    (by `record_rates()`) for the same input.
     """
     ts_info = (tsdct['ich'], tsdct['chg'], tsdct['mul'])
     orb_restr = moldr.util.orbital_restriction(ts_info, thy_info)
@@ -420,7 +434,57 @@ def run_rates(
     print(mess_path)
     with open(os.path.join(mess_path, 'mess.inp'), 'w') as mess_file:
         mess_file.write(mess_inp_str)
-    moldr.util.run_script(substr.MESSRATE, mess_path)
+    if (build_graph is not None and
+            os.path.exists(os.path.join(mess_path, 'rate.out')) and
+            build_graph.is_current((mess_path, 'rates'),
+                                   moldr.build.input_hash(mess_inp_str))):
+        print('MESS rates are current, skipping the MESS run')
+        ret = (mess_path if executor is None else
+               moldr.executor.completed_future(mess_path))
+    elif executor is None:
+        moldr.util.run_script(substr.MESSRATE, mess_path)
+        ret = mess_path
+    else:
+        ret = executor.submit(_run_mess, mess_path)
+    return ret
+
+
+def record_rates(mess_path, build_graph):
+    """ record a finished MESS run in a build graph, by its input
+    """
+    with open(os.path.join(mess_path, 'mess.inp'), 'r') as mess_file:
+        mess_inp_str = mess_file.read()
+    build_graph.record((mess_path, 'rates'),
+                       moldr.build.input_hash(mess_inp_str))
+
+
+def wait_for_rates(mess_fut_dct, poll_interval=30.):
+    """ Wait for MESS runs submitted by `run_rates()`, yielding each MESS path
+        as its run finishes (in order of completion)
+
+    :param mess_fut_dct: the futures, each mapped to a value that is yielded
+        back with its MESS path
+    A run that ends without writing rate.out is reported and skipped.
+    """
+    pending = set(mess_fut_dct)
+    while pending:
+        done, pending = concurrent.futures.wait(
+            pending, timeout=poll_interval,
+            return_when=concurrent.futures.FIRST_COMPLETED)
+        if not done:
+            print('Waiting on {} MESS run(s)'.format(len(pending)))
+        for fut in done:
+            mess_path = fut.result()
+            if os.path.exists(os.path.join(mess_path, 'rate.out')):
+                yield mess_path, mess_fut_dct[fut]
+            else:
+                print('ERROR: MESS did not write rate.out in {}'.format(mess_path))
+
+
+def _run_mess(mess_path):
+    """ run MESS in a job executor slot
+    """
+    moldr.util.run_script(substr.MESSRATE_POOL, mess_path)
     return mess_path
 
 
@@ -437,30 +501,17 @@ def read_rates(rct_lab, prd_lab, mess_path, assess_pdep_temps,
     valid_calc_tk_dct = {}
     ktp_dct = {}
 
-    # Read the MESS output file into a string
-    with open(mess_path+'/rate.out', 'r') as mess_file:
-        output_string = mess_file.read()
-    # with open(mess_path+'/mess.inp', 'r') as mess_file:
-    #     input_string = mess_file.read()
-
-    # Read the temperatures and pressures out of the MESS output
-    mess_temps, _ = mess_io.reader.rates.get_temperatures(
-        output_string)
-    mess_pressures, punit = mess_io.reader.rates.get_pressures(
-        output_string)
-    # mess_pressures, punit = mess_io.reader.rates.get_pressures_input(
-    #     input_string)
+    # Read the temperatures, pressures and k(T) tables out of the MESS output
+    # (parsed once per output; see rate_tables())
+    mess_temps, mess_pressures, rate_ks_dct = rate_tables(mess_path)
 
     # Loop over the pressures obtained from the MESS output
     for pressure in mess_pressures:
 
         # Read the rate constants
-        if pressure == 'high':
-            rate_ks = mess_io.reader.highp_ks(
-                output_string, rct_lab, prd_lab)
-        else:
-            rate_ks = mess_io.reader.pdep_ks(
-                output_string, rct_lab, prd_lab, pressure, punit)
+        rate_ks = rate_ks_dct.get(
+            _rate_table_key(rct_lab + '->' + prd_lab, pressure),
+            numpy.array([]))
 
         # Store in a dictionary
         calc_k_dct[pressure] = rate_ks
@@ -494,6 +545,145 @@ def read_rates(rct_lab, prd_lab, mess_path, assess_pdep_temps,
     return ktp_dct
 
 
+def rate_tables(mess_path):
+    """ Read all of the k(T) tables in the rate.out of a MESS run
+
+    The output is parsed in one pass and the tables are kept in memory and
+    in RATES_CACHE_NAME beside rate.out, so reading the rates of further
+    channels does not rescan it. (Both are invalidated when rate.out
+    changes, or the parser does, by RATES_CACHE_VERSION.) Undefined rate
+    constants (***) are read as nan, and pressures are in atm.
+
+    :returns: the temperatures, the pressures (with 'high' for the
+        high-pressure limit), and the rate constants by `_rate_table_key()`
+    :rtype: (numpy.ndarray, list, dict)
+    """
+    out_path = os.path.join(mess_path, 'rate.out')
+    npz_path = os.path.join(mess_path, RATES_CACHE_NAME)
+    out_stat = os.stat(out_path)
+    stamp = numpy.array([out_stat.st_size, out_stat.st_mtime_ns,
+                         RATES_CACHE_VERSION])
+    key = os.path.abspath(mess_path)
+    if key not in _RATES_CACHE or not numpy.array_equal(
+            _RATES_CACHE[key][0], stamp):
+        tables = None
+        if os.path.exists(npz_path):
+            with numpy.load(npz_path) as npz:
+                if numpy.array_equal(npz['stamp'], stamp):
+                    pressures = [
+                        'high' if pressure == 'high' else float(pressure)
+                        for pressure in npz['pressures']]
+                    rate_ks_dct = {name[2:]: npz[name] for name in npz.files
+                                   if name.startswith('k:')}
+                    tables = (npz['temps'], pressures, rate_ks_dct)
+        if tables is None:
+            with open(out_path, 'r') as mess_file:
+                tables = _parse_rate_tables(mess_file)
+            temps, pressures, rate_ks_dct = tables
+            arrs = {'k:' + name: ks for name, ks in rate_ks_dct.items()}
+            numpy.savez(npz_path, stamp=stamp, temps=temps,
+                        pressures=numpy.array(pressures, dtype=str), **arrs)
+        _RATES_CACHE[key] = (stamp, tables)
+    return _RATES_CACHE[key][1]
+
+
+def _rate_table_key(reaction, pressure):
+    """ the key of a k(T) table, e.g. 'W1->P1@1.0' or 'W1->P1@high'
+    """
+    pressure = pressure if pressure == 'high' else float(pressure)
+    return '{}@{}'.format(reaction, pressure)
+
+
+def _parse_rate_tables(lines):
+    """ Parse the Temperature-Species rate tables of a MESS output, line by
+        line
+
+    The tables are those under the 'Temperature-Species Rate Tables:'
+    header, one per 'Pressure = <value> <unit>' line, and the one under the
+    'High Pressure Rate Coefficients (Temperature-Species Rate Tables):'
+    header. Each table is a 'T(K)' header row of reactions followed by one
+    row per temperature; a line of any other kind ends the section.
+    Pressures are converted to atm, and every table must have the same
+    temperatures.
+    """
+    temps = None
+    pressures = []
+    rate_ks_dct = {}
+    section = None
+    pressure = None
+    reactions = []
+    table_temps = []
+
+    def _end_table():
+        nonlocal temps
+        if reactions:
+            if temps is None:
+                temps = list(table_temps)
+            elif table_temps != temps:
+                raise ValueError(
+                    'MESS rate table at pressure {} has temperatures {}, '
+                    'not {}'.format(pressure, table_temps, temps))
+
+    for line in lines:
+        toks = line.split()
+        if 'Temperature-Species Rate Tables' in line:
+            _end_table()
+            section = 'high' if 'High Pressure' in line else 'pdep'
+            pressure = 'high' if section == 'high' else None
+            if section == 'high':
+                pressures.append('high')
+            reactions = []
+        elif not section or not toks:
+            continue
+        elif section == 'pdep' and toks[0] == 'Pressure' and '=' in toks:
+            _end_table()
+            pressure = _pressure_in_atm(*line.split('=')[1].split()[:2])
+            pressures.append(pressure)
+            reactions = []
+        elif toks[0] == 'T(K)' and any('->' in tok for tok in toks):
+            _end_table()
+            reactions = [tok for tok in toks if '->' in tok]
+            table_temps = []
+        elif reactions and _is_number(toks[0]):
+            if len(toks) != len(reactions) + 1:
+                raise ValueError(
+                    'MESS rate table row does not match its header: '
+                    '{}'.format(line))
+            table_temps.append(float(toks[0]))
+            for reaction, val in zip(reactions, toks[1:]):
+                rate_ks_dct.setdefault(
+                    _rate_table_key(reaction, pressure), []).append(
+                        float(val) if _is_number(val) else numpy.nan)
+        else:
+            _end_table()
+            section = None
+            reactions = []
+    _end_table()
+
+    rate_ks_dct = {name: numpy.array(ks) for name, ks in rate_ks_dct.items()}
+    return numpy.array(temps or []), pressures, rate_ks_dct
+
+
+def _pressure_in_atm(val, unit):
+    """ a pressure from a MESS output, in atm
+    """
+    unit_convs = {'atm': 1., 'bar': 1. / 1.01325, 'torr': 1. / 760.}
+    if unit.lower() not in unit_convs:
+        raise ValueError('unknown pressure unit {} in MESS output'.format(unit))
+    return float(val) * unit_convs[unit.lower()]
+
+
+def _is_number(tok):
+    """ can this token be read as a float?
+    """
+    try:
+        float(tok)
+        ret = True
+    except ValueError:
+        ret = False
+    return ret
+
+
 def mod_arr_fit(ktp_dct, mess_path, fit_type='single', fit_method='dsarrfit',
                 t_ref=1.0, a_conv_factor=1.0):
     """
@@ -501,10 +691,18 @@ def mod_arr_fit(ktp_dct, mess_path, fit_type='single', fit_method='dsarrfit',
         (1) Grab high-pressure and pressure-dependent rate constants
             from a MESS output file
         (2) Fit rate constants to an Arrhenius expression
+
+    With fit_method='python', the fits are done in process by
+    `mod_arr_fits()`.
     """
 
     assert fit_type in ('single', 'double')
 
+    if fit_method == 'python':
+        return mod_arr_fits(
+            [ktp_dct], fit_type=fit_type, t_ref=t_ref,
+            a_conv_factors=[a_conv_factor])[0]
+
     # Dictionaries to store info; indexed by pressure (given in fit_ps)
     fit_param_dct = {}
     fit_temp_dct = {}
@@ -538,50 +736,200 @@ def mod_arr_fit(ktp_dct, mess_path, fit_type='single', fit_method='dsarrfit',
     return fit_param_dct, fit_temp_dct, fit_success
 
 
+def mod_arr_fits(ktp_dct_lst, fit_type='single', t_ref=1.0,
+                 a_conv_factors=None):
+    """ Fit the rate constants of many reactions, at all of their pressures,
+        to Arrhenius expressions in one batch
+
+    Single fits are a least-squares fit of ln k; double fits minimize the
+    error in ln k by Levenberg-Marquardt, started from single fits to the
+    low- and high-temperature halves of the data.
+
+    :returns: (fit_param_dct, fit_temp_dct, fit_success) for each reaction,
+        as from `mod_arr_fit()`
+    :rtype: list
+    """
+
+    assert fit_type in ('single', 'double')
+    if a_conv_factors is None:
+        a_conv_factors = [1.0] * len(ktp_dct_lst)
+
+    keys = [(idx, pressure) for idx, ktp_dct in enumerate(ktp_dct_lst)
+            for pressure in ktp_dct]
+    temps, lnks, mask = _stacked_tk(
+        [ktp_dct_lst[idx][pressure] for idx, pressure in keys],
+        [a_conv_factors[idx] for idx, _ in keys])
+
+    if fit_type == 'single':
+        params, success = _single_arrhenius_fits(temps, lnks, mask, t_ref)
+    else:
+        params, success = _double_arrhenius_fits(temps, lnks, mask, t_ref)
+
+    ret = [({}, {}, True) for _ in ktp_dct_lst]
+    for (idx, pressure), fit_params, fit_ok, fit_temps, fit_mask in zip(
+            keys, params, success, temps, mask):
+        fit_param_dct, fit_temp_dct, _ = ret[idx]
+        fit_param_dct[pressure] = (
+            [float(val) for val in fit_params] if fit_ok else [])
+        fit_temp_dct[pressure] = [min(fit_temps[fit_mask]),
+                                  max(fit_temps[fit_mask])]
+        ret[idx] = (fit_param_dct, fit_temp_dct,
+                    ret[idx][2] and bool(fit_ok))
+
+    return ret
+
+
 def assess_arr_fit_err(fit_param_dct, ktp_dct, fit_type='single',
                        t_ref=1.0, a_conv_factor=1.0):
     """ Determine the errors in the rate constants that arise
         from the Arrhenius fitting procedure
     """
+    return assess_arr_fit_errs(
+        [fit_param_dct], [ktp_dct], fit_type=fit_type, t_ref=t_ref,
+        a_conv_factors=[a_conv_factor])[0]
 
-    fit_k_dct = {}
-    fit_err_dct = {}
 
-    assert fit_type in ('single', 'double')
+def assess_arr_fit_errs(fit_param_dct_lst, ktp_dct_lst, fit_type='single',
+                        t_ref=1.0, a_conv_factors=None):
+    """ Determine the Arrhenius fitting errors of many reactions in one batch
 
-    # Calculate fitted rate constants using the fitted parameters
-    for pressure, params in fit_param_dct.items():
+    :returns: a dictionary of [mean, max] percent errors, by pressure, for
+        each reaction
+    :rtype: list
+    """
 
-        # Set the temperatures
-        temps = ktp_dct[pressure][0]
+    assert fit_type in ('single', 'double')
+    if a_conv_factors is None:
+        a_conv_factors = [1.0] * len(ktp_dct_lst)
+
+    keys = [(idx, pressure) for idx, fit_param_dct
+            in enumerate(fit_param_dct_lst) for pressure in fit_param_dct]
+    temps, lnks, mask = _stacked_tk(
+        [ktp_dct_lst[idx][pressure] for idx, pressure in keys],
+        [a_conv_factors[idx] for idx, _ in keys])
+    nparams = 3 if fit_type == 'single' else 6
+    params = numpy.array(
+        [fit_param_dct_lst[idx][pressure] or [numpy.nan] * nparams
+         for idx, pressure in keys], dtype=float).reshape(len(keys), nparams)
 
-        # Calculate fitted rate constants, based on fit type
-        if fit_type == 'single':
-            fit_ks = ratefit.fxns.single_arrhenius(
-                params[0], params[1], params[2],
-                t_ref, temps)
-        elif fit_type == 'double':
-            fit_ks = ratefit.fxns.double_arrhenius(
-                params[0], params[1], params[2],
-                params[3], params[4], params[5],
-                t_ref, temps)
+    # Calculute the error between the calc and fit ks
+    with numpy.errstate(invalid='ignore', divide='ignore'):
+        fit_lnks = _arrhenius_lnks(params, temps, t_ref)
+        abs_errs = numpy.abs(1. - numpy.exp(fit_lnks - lnks))
+    abs_errs = numpy.where(mask, abs_errs, 0.)
+    mean_avg_errs = 100. * abs_errs.sum(axis=1) / mask.sum(axis=1)
+    max_avg_errs = 100. * abs_errs.max(axis=1)
 
-        # Store the fitting parameters in a dictionary
-        fit_k_dct[pressure] = fit_ks / a_conv_factor
+    ret = [{} for _ in fit_param_dct_lst]
+    for (idx, pressure), mean_err, max_err in zip(
+            keys, mean_avg_errs, max_avg_errs):
+        ret[idx][pressure] = [float(mean_err), float(max_err)]
 
-    # Calculute the error between the calc and fit ks
-    for pressure, fit_ks in fit_k_dct.items():
+    return ret
 
-        # if pressure == 'high' and not rxn_is_pdependent:
-        #     pressure = premap
-        # calc_ks = valid_calc_tk_dct[pressure][1]
-        calc_ks = ktp_dct[pressure][1]
-        mean_avg_err, max_avg_err = ratefit.err.calc_sse_and_mae(
-            calc_ks, fit_ks)
 
-        # Store in a dictionary
-        fit_err_dct[pressure] = [mean_avg_err, max_avg_err]
+def _stacked_tk(tk_arr_lst, a_conv_factors):
+    """ stack (T, k) arrays of different lengths, padded and masked, with the
+        rate constants converted and logged
+    """
+    ntemps = max([len(tk_arr[0]) for tk_arr in tk_arr_lst] + [1])
+    temps = numpy.ones((len(tk_arr_lst), ntemps))
+    lnks = numpy.zeros((len(tk_arr_lst), ntemps))
+    mask = numpy.zeros((len(tk_arr_lst), ntemps), dtype=bool)
+    for idx, (tk_arr, a_conv_factor) in enumerate(
+            zip(tk_arr_lst, a_conv_factors)):
+        npts = len(tk_arr[0])
+        temps[idx, :npts] = tk_arr[0]
+        lnks[idx, :npts] = numpy.log(
+            numpy.asarray(tk_arr[1], dtype=float) * a_conv_factor)
+        mask[idx, :npts] = True
+    return temps, lnks, mask
+
+
+def _arrhenius_lnks(params, temps, t_ref):
+    """ ln k of stacked single (A, n, Ea) or double Arrhenius parameters
+    """
+    lnts = numpy.log(temps / t_ref)
+    invts = 1. / (RC * temps)
+    terms = [numpy.log(params[:, idx, None]) + params[:, idx+1, None] * lnts -
+             params[:, idx+2, None] * invts
+             for idx in range(0, params.shape[1], 3)]
+    return numpy.logaddexp.reduce(terms, axis=0)
 
-    return fit_err_dct
+
+def _single_arrhenius_fits(temps, lnks, mask, t_ref):
+    """ least-squares fits of ln k = ln A + n ln(T/T_ref) - Ea/RT, in one
+        batched pseudo-inverse
+    """
+    xmat = numpy.stack(
+        [numpy.ones_like(temps), numpy.log(temps / t_ref), -1. / (RC * temps)],
+        axis=-1) * mask[..., None]
+    theta = (numpy.linalg.pinv(xmat) @ (lnks * mask)[..., None])[..., 0]
+    params = numpy.column_stack(
+        [numpy.exp(theta[:, 0]), theta[:, 1], theta[:, 2]])
+    success = (mask.sum(axis=1) >= 3) & numpy.all(numpy.isfinite(params), axis=1)
+    return params, success
+
+
+def _double_arrhenius_fits(temps, lnks, mask, t_ref, max_iter=200, tol=1e-10):
+    """ batched Levenberg-Marquardt fits of ln k to a double Arrhenius form
+    """
+    # start from single fits to the lower and upper halves of the temperatures
+    npts = mask.sum(axis=1)
+    ranks = numpy.arange(mask.shape[1])[None, :]
+    low_mask = mask & (ranks < (npts[:, None] + 1) // 2)
+    high_mask = mask & (ranks >= npts[:, None] // 2)
+    low_params, _ = _single_arrhenius_fits(temps, lnks, low_mask, t_ref)
+    high_params, _ = _single_arrhenius_fits(temps, lnks, high_mask, t_ref)
+    pvals = numpy.column_stack([
+        numpy.log(low_params[:, 0] / 2.), low_params[:, 1], low_params[:, 2],
+        numpy.log(high_params[:, 0] / 2.), high_params[:, 1], high_params[:, 2]])
+
+    lnts = numpy.log(temps / t_ref)
+    invts = 1. / (RC * temps)
+
+    def _residuals_and_jacobian(pvals):
+        lnterms = [pvals[:, idx, None] + pvals[:, idx+1, None] * lnts -
+                   pvals[:, idx+2, None] * invts for idx in (0, 3)]
+        fit_lnks = numpy.logaddexp(*lnterms)
+        wgt = numpy.exp(lnterms[0] - fit_lnks)
+        jac = numpy.stack(
+            [wgt, wgt * lnts, -wgt * invts,
+             1. - wgt, (1. - wgt) * lnts, -(1. - wgt) * invts], axis=-1)
+        return (fit_lnks - lnks) * mask, jac * mask[..., None]
+
+    with numpy.errstate(over='ignore', invalid='ignore'):
+        resid, jac = _residuals_and_jacobian(pvals)
+        cost = numpy.sum(resid**2, axis=1)
+        lam = numpy.full(len(pvals), 1e-3)
+        active = numpy.isfinite(cost)
+        for _ in range(max_iter):
+            if not numpy.any(active):
+                break
+            jtj = numpy.einsum('ftp,ftq->fpq', jac, jac)
+            jtr = numpy.einsum('ftp,ft->fp', jac, resid)
+            damp = lam[:, None] * numpy.diagonal(jtj, axis1=1, axis2=2)
+            amat = jtj + damp[:, :, None] * numpy.eye(6) + 1e-12 * numpy.eye(6)
+            step = -(numpy.linalg.pinv(amat) @ jtr[..., None])[..., 0]
+
+            new_pvals = numpy.where(active[:, None], pvals + step, pvals)
+            new_resid, new_jac = _residuals_and_jacobian(new_pvals)
+            new_cost = numpy.sum(new_resid**2, axis=1)
+            better = active & numpy.isfinite(new_cost) & (new_cost < cost)
+
+            converged = better & (cost - new_cost <= tol * (1. + cost))
+            pvals[better] = new_pvals[better]
+            resid[better] = new_resid[better]
+            jac[better] = new_jac[better]
+            cost[better] = new_cost[better]
+            lam = numpy.where(better, lam / 10., lam * 10.)
+            active &= ~converged & (lam < 1e12)
+
+    params = numpy.column_stack([
+        numpy.exp(pvals[:, 0]), pvals[:, 1], pvals[:, 2],
+        numpy.exp(pvals[:, 3]), pvals[:, 4], pvals[:, 5]])
+    success = ((npts >= 6) & numpy.isfinite(cost) &
+               numpy.all(numpy.isfinite(params), axis=1))
+    return params, success
 
 
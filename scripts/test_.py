@@ -0,0 +1,159 @@
+""" test the scripts.ktp rate constant reading and fitting
+"""
+import os
+import tempfile
+import numpy
+import pytest
+import scripts.ktp
+
+PREFIX = tempfile.mkdtemp()
+print(PREFIX)
+
+TEMPS = numpy.arange(500., 2050., 100.)
+
+# a MESS rate.out with two pressures (one in torr), the high-pressure
+# limit, and undefined rate constants
+RATE_OUT_STR = """
+Pressure-Species Rate Tables:
+
+Temperature = 500 K
+       P(atm)        W1->P1        P1->W1
+          0.1      2.50e+02      1.10e-14
+
+Temperature-Species Rate Tables:
+
+Pressure = 0.1 atm
+         T(K)        W1->W1        W1->P1        P1->W1
+          500           ***      2.50e+02      1.10e-14
+         1000           ***      7.00e+05      3.20e-12
+         1500           ***      1.90e+07           ***
+
+Pressure = 760 torr
+         T(K)        W1->W1        W1->P1        P1->W1
+          500           ***      2.60e+02      1.20e-14
+         1000           ***      8.00e+05      3.30e-12
+         1500           ***      2.00e+07      9.90e-11
+
+High Pressure Rate Coefficients (Temperature-Species Rate Tables):
+         T(K)        W1->P1        P1->W1
+          500      2.70e+02      1.30e-14
+         1000      9.00e+05      3.40e-12
+         1500      2.10e+07      1.00e-10
+
+Capture/Escape Rate Coefficients:
+         T(K)        W1->P1
+          500      1.00e+00
+"""
+
+
+def _arrhenius_ks(temps, a_fac, n_fac, ea_fac):
+    return a_fac * temps**n_fac * numpy.exp(-ea_fac / (scripts.ktp.RC * temps))
+
+
+def test__rate_tables():
+    """ test scripts.ktp.rate_tables
+    """
+    mess_path = os.path.join(PREFIX, 'rate_tables')
+    os.mkdir(mess_path)
+    with open(os.path.join(mess_path, 'rate.out'), 'w') as mess_file:
+        mess_file.write(RATE_OUT_STR)
+
+    temps, pressures, rate_ks_dct = scripts.ktp.rate_tables(mess_path)
+    assert numpy.array_equal(temps, [500., 1000., 1500.])
+    assert pressures == [0.1, 1.0, 'high']
+    assert sorted(rate_ks_dct) == [
+        'P1->W1@0.1', 'P1->W1@1.0', 'P1->W1@high', 'W1->P1@0.1',
+        'W1->P1@1.0', 'W1->P1@high', 'W1->W1@0.1', 'W1->W1@1.0']
+    assert numpy.allclose(rate_ks_dct['W1->P1@1.0'], [2.6e2, 8.0e5, 2.0e7])
+    assert numpy.allclose(rate_ks_dct['P1->W1@high'],
+                          [1.3e-14, 3.4e-12, 1.0e-10])
+    assert numpy.all(numpy.isnan(rate_ks_dct['W1->W1@0.1']))
+    assert numpy.isnan(rate_ks_dct['P1->W1@0.1'][2])
+
+    # the tables are read back from the cache beside rate.out
+    assert os.path.exists(
+        os.path.join(mess_path, scripts.ktp.RATES_CACHE_NAME))
+    scripts.ktp._RATES_CACHE.clear()
+    npz_temps, npz_pressures, npz_rate_ks_dct = scripts.ktp.rate_tables(
+        mess_path)
+    assert numpy.array_equal(npz_temps, temps)
+    assert npz_pressures == pressures
+    assert all(numpy.array_equal(npz_rate_ks_dct[name], ks, equal_nan=True)
+               for name, ks in rate_ks_dct.items())
+
+
+def test__rate_tables__mismatched_temperatures():
+    """ test scripts.ktp.rate_tables on tables with different temperatures
+    """
+    mess_path = os.path.join(PREFIX, 'rate_tables_bad')
+    os.mkdir(mess_path)
+    with open(os.path.join(mess_path, 'rate.out'), 'w') as mess_file:
+        mess_file.write(RATE_OUT_STR.replace(
+            '         1000           ***      8.00e+05',
+            '         1100           ***      8.00e+05'))
+
+    with pytest.raises(ValueError):
+        scripts.ktp.rate_tables(mess_path)
+
+
+def test__mod_arr_fits__single():
+    """ test scripts.ktp.mod_arr_fits for single Arrhenius fits
+    """
+    ref_params_lst = [[1.5e10, 0.5, 12.], [3.0e5, 2.25, 4.5]]
+    ktp_dct_lst = [
+        {'high': numpy.array([TEMPS, _arrhenius_ks(TEMPS, *ref_params_lst[0])]),
+         1.0: numpy.array(
+             [TEMPS[:5], _arrhenius_ks(TEMPS[:5], *ref_params_lst[1])])},
+        # (too few temperatures for a fit)
+        {'high': numpy.array(
+            [TEMPS[:2], _arrhenius_ks(TEMPS[:2], *ref_params_lst[0])])},
+    ]
+    fits = scripts.ktp.mod_arr_fits(ktp_dct_lst, fit_type='single')
+
+    fit_param_dct, fit_temp_dct, fit_success = fits[0]
+    assert fit_success
+    assert numpy.allclose(fit_param_dct['high'], ref_params_lst[0], rtol=1e-6)
+    assert numpy.allclose(fit_param_dct[1.0], ref_params_lst[1], rtol=1e-6)
+    assert fit_temp_dct['high'] == [500., 2000.]
+    assert fit_temp_dct[1.0] == [500., 900.]
+
+    fit_param_dct, _, fit_success = fits[1]
+    assert not fit_success
+    assert fit_param_dct['high'] == []
+
+    err_dcts = scripts.ktp.assess_arr_fit_errs(
+        [fit[0] for fit in fits], ktp_dct_lst, fit_type='single')
+    assert all(err < 1e-4 for err in err_dcts[0]['high'])
+    assert all(err < 1e-4 for err in err_dcts[0][1.0])
+    # (a failed fit has no errors to compare with a threshold)
+    assert all(numpy.isnan(err) for err in err_dcts[1]['high'])
+
+
+def test__mod_arr_fits__double():
+    """ test scripts.ktp.mod_arr_fits for double Arrhenius fits
+    """
+    ref_params = [2.0e8, 1.0, 5., 4.0e12, 0.2, 25.]
+    ktp_dct = {'high': numpy.array(
+        [TEMPS, (_arrhenius_ks(TEMPS, *ref_params[:3]) +
+                 _arrhenius_ks(TEMPS, *ref_params[3:]))])}
+
+    [(fit_param_dct, _, fit_success)] = scripts.ktp.mod_arr_fits(
+        [ktp_dct], fit_type='double')
+    assert fit_success
+    assert len(fit_param_dct['high']) == 6
+
+    [err_dct] = scripts.ktp.assess_arr_fit_errs(
+        [fit_param_dct], [ktp_dct], fit_type='double')
+    assert err_dct['high'][1] < 0.1
+
+    # the same parameters give the same rate constants
+    params = numpy.array([fit_param_dct['high']])
+    lnks = scripts.ktp._arrhenius_lnks(params, TEMPS[None, :], 1.0)[0]
+    assert numpy.allclose(numpy.exp(lnks), ktp_dct['high'][1], rtol=1e-3)
+
+
+if __name__ == '__main__':
+    test__rate_tables()
+    test__rate_tables__mismatched_temperatures()
+    test__mod_arr_fits__single()
+    test__mod_arr_fits__double()
@@ -170,9 +170,30 @@ def write_pf_input(pf_inp_str, pf_path):
 
 
 def run_pf(pf_path, pf_script_str=substr.MESSPF):
-    """ run messpf
+    """ run messpf (reusing the pf.dat of an earlier run on the same input)
     """
-    moldr.util.run_script(pf_script_str, pf_path)
+    moldr.util.run_messpf(pf_script_str, pf_path)
+
+
+def run_rrho_pfs(spc_lst, spc_str_lst, pf_path_lst, temp_step, ntemps):
+    """ write pf.dat in process for the species that are plain
+    rigid-rotor/harmonic-oscillator species, skipping messpf for them
+
+    :returns: the species that were handled; the rest still need messpf
+    :rtype: list
+    """
+    spc_dat_lst = [moldr.rrho.species_data(spc_str) for spc_str in spc_str_lst]
+    idxs = [idx for idx, dat in enumerate(spc_dat_lst) if dat is not None]
+    if idxs:
+        temps = moldr.rrho.temperatures(temp_step, ntemps)
+        lnq, dlnq, d2lnq = moldr.rrho.log_partition_functions(
+            temps, [spc_dat_lst[idx] for idx in idxs])
+        for row, idx in enumerate(idxs):
+            pf_dat_str = moldr.rrho.pf_dat_string(
+                spc_lst[idx], temps, lnq[row], dlnq[row], d2lnq[row])
+            with open(os.path.join(pf_path_lst[idx], 'pf.dat'), 'w') as pf_file:
+                pf_file.write(pf_dat_str)
+    return [spc_lst[idx] for idx in idxs]
 
 
 def go_to_path(path):
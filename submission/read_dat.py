@@ -62,6 +62,12 @@ PARAMS = {
     'SIG1': 6.,
     'SIG2': 6.,
     'MASS1': 15.0,
+    'ES_NSLOTS': 1,
+    'PES_NSLOTS': 1,
+    'BUILD_GRAPH': False,
+    'SAVE_INDEX': False,
+    'MESS_NCORES_TOT': 10,
+    'MESS_NCORES': 10,
     'RUN_PREFIX': '/lcrc/project/PACC/run',
     'SAVE_PREFIX': '/lcrc/project/PACC/save'
 }
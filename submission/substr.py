@@ -13,6 +13,9 @@ MESSPF = ("#!/usr/bin/env bash\n"
 MESSRATE = ("#!/usr/bin/env bash\n"
             "export OMP_NUM_THREADS=10\n"
             "mess mess.inp rate.out >> stdout.log &> stderr.log")
+# (for MESS run on a job executor slot, which sets OMP_NUM_THREADS)
+MESSRATE_POOL = ("#!/usr/bin/env bash\n"
+                 "mess mess.inp rate.out >> stdout.log &> stderr.log")
 
 # VaReCoF
 VARECOF = ("#!/usr/bin/env bash\n"
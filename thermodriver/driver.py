@@ -7,6 +7,8 @@ import scripts.es
 import thermo.heatform
 import esdriver.driver
 import autofile.fs
+import moldr.executor
+import moldr.build
 from datalibs import phycon
 
 
@@ -17,8 +19,13 @@ REF_CALLS = {"basic": "get_basic",
 
 
 def run(tsk_info_lst, es_dct, spcdct, spc_queue, ref, run_prefix, save_prefix, ene_coeff=[1.],
-        options=[True, True, True, False]):
+        options=[True, True, True, False], nslots=1, build_graph=None):
     """ main driver for thermo run
+
+    With nslots > 1, the partition function input for the species (ZPE and
+    species block) and the messpf runs are spread over that many worker
+    processes. With a build graph (moldr.build.BuildGraph), the electronic
+    structure tasks and partition functions that are current are not redone.
     """
 
     # Determine options
@@ -49,7 +56,8 @@ def run(tsk_info_lst, es_dct, spcdct, spc_queue, ref, run_prefix, save_prefix, e
     # Run ESDriver
     if runes:
         runspecies = [{'species': full_queue, 'reacs': [], 'prods': []}]
-        esdriver.driver.run(tsk_info_lst, es_dct, runspecies, spcdct, run_prefix, save_prefix)
+        esdriver.driver.run(tsk_info_lst, es_dct, runspecies, spcdct, run_prefix, save_prefix,
+                            nslots=nslots, build_graph=build_graph)
 
     if runmess:
         geo_lvl = ''
@@ -125,17 +133,13 @@ def run(tsk_info_lst, es_dct, spcdct, spc_queue, ref, run_prefix, save_prefix, e
 
         #Collect the PF input for each species
         # Initialize the ene for each of the species
-        for spc in full_queue:
-            spc_info = scripts.es.get_spc_info(spcdct[spc])
-            spc_save_fs = autofile.fs.species(save_prefix)
-            spc_save_fs.leaf.create(spc_info)
-            spc_save_path = spc_save_fs.leaf.path(spc_info)
-
-            zpe, zpe_str, ncons = scripts.thermo.get_zpe(
-                spc, spcdct[spc], spc_save_path, pf_levels, spc_model)
-            spc_str = scripts.thermo.get_spc_input(
-                spc, spcdct[spc], spc_info, spc_save_path, pf_levels, spc_model)
-
+        pf_data_lst = moldr.executor.map_jobs(
+            species_pf_data,
+            [(spc, spcdct[spc], save_prefix, pf_levels, spc_model)
+             for spc in full_queue],
+            nslots=nslots)
+        for spc, pf_data in zip(full_queue, pf_data_lst):
+            spc_info, spc_save_path, zpe, zpe_str, ncons, spc_str = pf_data
             spcdct[spc]['spc_info'] = spc_info
             spcdct[spc]['spc_save_path'] = spc_save_path
             spcdct[spc]['zpe'] = zpe
@@ -160,7 +164,42 @@ def run(tsk_info_lst, es_dct, spcdct, spc_queue, ref, run_prefix, save_prefix, e
             spcdct[spc]['nasa_path'] = nasa_path
 
             scripts.thermo.write_pf_input(pf_input, pf_path)
-            scripts.thermo.run_pf(pf_path)
+            spcdct[spc]['pf_node'] = (
+                '{}_{}_{}'.format(*spc_info), '/'.join(map(str, harm_thy_info)),
+                'pf')
+            spcdct[spc]['pf_hash'] = moldr.build.input_hash(pf_input)
+
+        # only the partition functions that are missing or stale are run
+        pf_queue = [
+            spc for spc in spc_queue
+            if build_graph is None or not os.path.exists(
+                os.path.join(spcdct[spc]['pf_path'], 'pf.dat')) or
+            not build_graph.is_current(
+                spcdct[spc]['pf_node'], spcdct[spc]['pf_hash'])]
+        for spc in pf_queue:
+            pf_dat_path = os.path.join(spcdct[spc]['pf_path'], 'pf.dat')
+            if os.path.exists(pf_dat_path):
+                os.remove(pf_dat_path)
+
+        # rigid-rotor/harmonic-oscillator species are evaluated in process
+        rrho_spcs = []
+        if spc_model == ['RIGID', 'HARM', '']:
+            rrho_spcs = scripts.thermo.run_rrho_pfs(
+                pf_queue,
+                [spcdct[spc]['spc_str'] for spc in pf_queue],
+                [spcdct[spc]['pf_path'] for spc in pf_queue],
+                temp_step, ntemps)
+        moldr.executor.map_jobs(
+            scripts.thermo.run_pf,
+            [(spcdct[spc]['pf_path'],) for spc in pf_queue
+             if spc not in rrho_spcs],
+            nslots=nslots)
+        if build_graph is not None:
+            for spc in pf_queue:
+                if os.path.exists(
+                        os.path.join(spcdct[spc]['pf_path'], 'pf.dat')):
+                    build_graph.record(
+                        spcdct[spc]['pf_node'], spcdct[spc]['pf_hash'])
 
         # Compute Hf0K
         ene_strl = []
@@ -236,6 +275,25 @@ def run(tsk_info_lst, es_dct, spcdct, spc_queue, ref, run_prefix, save_prefix, e
             nasa_file.write(chemkin_set_str)
 
 
+def species_pf_data(spc, spc_dct_i, save_prefix, pf_levels, spc_model):
+    """ the zero-point energy and partition function input for one species
+
+    (independent of the other species, so this can run in a worker process)
+
+    :returns: spc_info, spc_save_path, zpe, zpe_str, ncons, spc_str
+    """
+    spc_info = scripts.es.get_spc_info(spc_dct_i)
+    spc_save_fs = autofile.fs.species(save_prefix)
+    spc_save_fs.leaf.create(spc_info)
+    spc_save_path = spc_save_fs.leaf.path(spc_info)
+
+    zpe, zpe_str, ncons = scripts.thermo.get_zpe(
+        spc, spc_dct_i, spc_save_path, pf_levels, spc_model)
+    spc_str = scripts.thermo.get_spc_input(
+        spc, spc_dct_i, spc_info, spc_save_path, pf_levels, spc_model)
+    return spc_info, spc_save_path, zpe, zpe_str, ncons, spc_str
+
+
 def is_scheme(entry):
     """ Check whether this is a basis set scheme
     """